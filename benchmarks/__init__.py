@@ -0,0 +1 @@
+"""Bancos de pruebas de rendimiento de Senderos de Luz."""
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tiempo de arranque de la versión de consola.
+
+Mide dos cosas en procesos nuevos, como en un quiosco recién encendido:
+
+* ``importacion``: tiempo acumulado de ``import senderos_de_luz`` según
+  ``python -X importtime``, con los módulos que más pesan.
+* ``primer_mensaje``: desde lanzar el juego como lo lanza un jugador
+  (``python3 senderos.py``) hasta que aparece la pregunta del nombre,
+  descontando el arranque del intérprete vacío. Incluye compilar el script
+  lanzado, que no tiene bytecode en caché.
+
+    python3 benchmarks/bench_arranque.py
+    python3 benchmarks/bench_arranque.py --presupuesto 25 --repeticiones 20
+
+Termina con código 1 si el tiempo hasta la primera pregunta supera el
+presupuesto.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+JUEGO = RAIZ / "senderos.py"
+
+# Milisegundos hasta la primera pregunta, más allá del intérprete vacío,
+# permitidos en esta máquina: el doble de los ~12 ms medidos, para que la
+# carga de la máquina no haga fallar la medición.
+PRESUPUESTO_MS = 25.0
+
+PRIMERA_PREGUNTA = "¿Cómo te llamas?".encode("utf-8")
+
+
+def _entorno() -> dict[str, str]:
+    return {**os.environ, "PYTHONPATH": str(RAIZ)}
+
+
+def importacion(repeticiones: int = 10) -> tuple[float, list[tuple[float, str]]]:
+    """Mejor tiempo acumulado (s) y los módulos más costosos de esa corrida."""
+    mejor = float("inf")
+    detalle: list[tuple[float, str]] = []
+    for _ in range(repeticiones):
+        proceso = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                                  "import senderos_de_luz"],
+                                 capture_output=True, text=True, env=_entorno(), check=True)
+        modulos = []
+        for linea in proceso.stderr.splitlines():
+            # import time: propio | acumulado | módulo
+            partes = linea.removeprefix("import time:").split("|")
+            if len(partes) == 3 and partes[1].strip().isdigit():
+                modulos.append((int(partes[1]) / 1e6, partes[2].rstrip()))
+        total = next(segundos for segundos, nombre in modulos
+                     if nombre.strip() == "senderos_de_luz")
+        if total < mejor:
+            mejor = total
+            detalle = sorted((medida for medida in modulos
+                              if medida[1].strip() != "senderos_de_luz"), reverse=True)
+    return mejor, detalle
+
+
+def _cronometrar(argumentos: list[str], esperar: bytes | None) -> float:
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(argumentos, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, env=_entorno())
+    try:
+        if esperar is None:
+            proceso.wait()
+        else:
+            leido = b""
+            while esperar not in leido:
+                trozo = proceso.stdout.read1(4096)
+                if not trozo:
+                    raise RuntimeError("El juego terminó sin mostrar la primera pregunta.")
+                leido += trozo
+        return time.perf_counter() - inicio
+    finally:
+        proceso.kill()
+        proceso.wait()
+        proceso.stdin.close()
+        proceso.stdout.close()
+
+
+def primer_mensaje(repeticiones: int = 10) -> tuple[float, float]:
+    """Mejor tiempo (s) hasta la primera pregunta y el del intérprete vacío."""
+    interprete = min(_cronometrar([sys.executable, "-c", "pass"], None)
+                     for _ in range(repeticiones))
+    juego = min(_cronometrar([sys.executable, str(JUEGO)], PRIMERA_PREGUNTA)
+                for _ in range(repeticiones))
+    return juego, interprete
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presupuesto", type=float, default=PRESUPUESTO_MS,
+                        help=f"ms permitidos hasta la primera pregunta, más allá del "
+                             f"intérprete vacío (por defecto {PRESUPUESTO_MS:g})")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--detalle", type=int, default=8, help="módulos más costosos a listar")
+    args = parser.parse_args()
+
+    total, detalle = importacion(args.repeticiones)
+    juego, interprete = primer_mensaje(args.repeticiones)
+    print(f"import senderos_de_luz: {total * 1000:.1f} ms")
+    for segundos, nombre in detalle[:args.detalle]:
+        print(f"  {segundos * 1000:7.1f} ms  {nombre}")
+    print(f"Hasta la primera pregunta: {juego * 1000:.1f} ms "
+          f"({(juego - interprete) * 1000:.1f} ms más que el intérprete vacío; "
+          f"presupuesto {args.presupuesto:g} ms)")
+    if (juego - interprete) * 1000 > args.presupuesto:
+        print("Presupuesto de arranque superado.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Rendimiento y memoria al exportar un Árbol de Testimonios muy grande.
+
+Los testimonios se generan al vuelo, así que la memoria medida es solo la
+de la cadena de exportación: debe ser la misma con mil entradas que con un
+millón.
+
+    python3 benchmarks/bench_exportar.py --testimonios 1000000 --ancho 72
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from senderos_de_luz import CAMINOS, Testimonio, id_capitulo  # noqa: E402
+from senderos_exportar import FORMATOS, escribir, filas  # noqa: E402
+
+TEXTOS = [
+    "Hoy aprendí a confiar un poco más.",
+    "Mi abuela nos contó cómo la fe la sostuvo en tiempos difíciles, y todos "
+    "quisimos escribir algo para recordarlo.",
+    "Compartimos pan con los vecinos & rezamos juntos <en la plaza>.",
+]
+
+
+def testimonios_generados(cantidad: int) -> Iterator[Testimonio]:
+    capitulos = [id_capitulo(camino.nombre, capitulo.titulo)
+                 for camino in CAMINOS for capitulo in camino.capitulos]
+    fecha = 739_000
+    for indice in range(cantidad):
+        # Los testimonios llegan agrupados por capítulo, como en un árbol real.
+        capitulo = capitulos[indice * len(capitulos) // cantidad]
+        yield Testimonio(capitulo, TEXTOS[indice % len(TEXTOS)], fecha + indice // 1000)
+
+
+def medir(formato: str, cantidad: int, ancho: int | None,
+          memoria: bool = False) -> tuple[float, int, int]:
+    """Segundos, caracteres escritos y pico de memoria (0 si no se mide)."""
+    with open(os.devnull, "w", encoding="utf-8") as nulo:
+        if memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        caracteres = escribir(FORMATOS[formato](filas(testimonios_generados(cantidad), ancho)),
+                              nulo)
+        segundos = time.perf_counter() - inicio
+        pico = 0
+        if memoria:
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return segundos, caracteres, pico
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--testimonios", type=int, default=1_000_000)
+    parser.add_argument("--ancho", type=int, default=None)
+    parser.add_argument("--memoria", action="store_true",
+                        help="mide también el pico de memoria (más lento)")
+    args = parser.parse_args()
+
+    for formato in FORMATOS:
+        segundos, caracteres, pico = medir(formato, args.testimonios, args.ancho, args.memoria)
+        linea = (f"{formato:<5} {args.testimonios / segundos:>10,.0f} testimonios/s  "
+                 f"{caracteres / segundos / 1e6:6.1f} M caracteres/s")
+        if args.memoria:
+            linea += f"  pico {pico / 1024:,.0f} KiB"
+        print(linea)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Bytes por jugador residente: representación anterior frente a la compacta.
+
+La representación anterior (dataclass con ``__dict__``, copia del
+diccionario de virtudes y un diccionario por testimonio) se reproduce aquí
+solo como referencia.
+
+    python3 benchmarks/bench_memoria.py --jugadores 20000 --testimonios 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from senderos_de_luz import CAMINOS, MODO_CUENTO, VIRTUDES_BASE, Jugador  # noqa: E402
+
+
+@dataclass
+class JugadorAnterior:
+    nombre: str
+    grupo_edad: str
+    modo: str
+    gemas: int = 0
+    virtudes: dict[str, int] = field(default_factory=lambda: VIRTUDES_BASE.copy())
+    testimonios: list[dict[str, str]] = field(default_factory=list)
+
+    def registrar_testimonio(self, camino: str, capitulo: str, texto: str) -> None:
+        self.testimonios.append({"camino": camino, "capitulo": capitulo, "texto": texto.strip()})
+
+
+def _capitulos() -> list[tuple[str, str]]:
+    # Como en el juego, los nombres llegan ya construidos en el catálogo.
+    return [(camino.nombre, capitulo.titulo)
+            for camino in CAMINOS for capitulo in camino.capitulos]
+
+
+def bytes_por_jugador(crear: Callable[[str], object], jugadores: int, testimonios: int) -> float:
+    capitulos = _capitulos()
+    textos = [f"Testimonio {numero}" for numero in range(testimonios)]
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    residentes = []
+    for numero in range(jugadores):
+        jugador = crear(f"Peregrino {numero}")
+        for indice in range(testimonios):
+            camino, capitulo = capitulos[indice % len(capitulos)]
+            jugador.registrar_testimonio(camino, capitulo, textos[indice])
+        residentes.append(jugador)
+    usado = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+    return usado / jugadores
+
+
+def medir(jugadores: int, testimonios: int) -> dict[str, float]:
+    return {
+        "anterior": bytes_por_jugador(
+            lambda nombre: JugadorAnterior(nombre, "Adulto", MODO_CUENTO), jugadores, testimonios),
+        "compacto": bytes_por_jugador(
+            lambda nombre: Jugador(nombre, "Adulto", MODO_CUENTO), jugadores, testimonios),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jugadores", type=int, default=20_000)
+    parser.add_argument("--testimonios", type=int, default=8)
+    args = parser.parse_args()
+
+    resultado = medir(args.jugadores, args.testimonios)
+    for nombre, valor in resultado.items():
+        print(f"{nombre:>9}: {valor:8.0f} bytes por jugador")
+    print(f"  ahorro: {1 - resultado['compacto'] / resultado['anterior']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
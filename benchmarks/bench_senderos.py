@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""Banco de pruebas de rendimiento de los caminos calientes del juego.
+
+Mide la construcción del catálogo, ``envolver``, un ``recorrer_camino``
+completo con respuestas guionadas, los reintentos de la Puerta de
+Sabiduría, la entrega de recompensas, las escrituras por pantalla, el
+pozo de virtudes de los equipos, la búsqueda en las lecturas, abrir un
+Cofre de Recuerdos, la exportación del Árbol de Testimonios, el sorteo
+de misiones en un conjunto grande, el tablero de gemas con un millón de
+jugadores, la memoria por jugador y el arranque en frío (ver
+``bench_arranque.py``). Todas las métricas son "menor es mejor"
+(segundos por operación o bytes).
+
+    python3 benchmarks/bench_senderos.py --salida resultados.json
+    python3 benchmarks/bench_senderos.py --comparar base.json --tolerancia 0.15
+    python3 -m benchmarks.bench_senderos --solo libro
+
+Con ``--comparar`` el programa termina con código 1 si alguna métrica
+empeora más que la tolerancia respecto a la base.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import senderos_de_luz as sl  # noqa: E402
+from senderos_busqueda import IndiceLecturas  # noqa: E402
+from senderos_equipos import PozoVirtudes  # noqa: E402
+from senderos_libro import GEMAS, LibroRecompensas, cuenta_de  # noqa: E402
+from senderos_recuerdos import CofreRecuerdos, empaquetar  # noqa: E402
+from senderos_misiones import Mision, PlanificadorMisiones  # noqa: E402
+from senderos_pantalla import Pantalla  # noqa: E402
+from senderos_tablero import TableroGemas  # noqa: E402
+from benchmarks.bench_arranque import importacion, primer_mensaje  # noqa: E402
+from benchmarks.bench_exportar import medir as medir_exportacion  # noqa: E402
+from benchmarks.bench_memoria import bytes_por_jugador  # noqa: E402
+
+Bench = Callable[[], None]
+
+
+def cronometrar(funcion: Bench, repeticiones: int = 5, minimo: float = 0.05) -> float:
+    """Mejor tiempo por llamada de ``funcion`` entre varias repeticiones."""
+    llamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        if time.perf_counter() - inicio >= minimo:
+            break
+        llamadas *= 2
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) / llamadas)
+    return mejor
+
+
+def mediana(medir: Callable[[], float], repeticiones: int = 5) -> float:
+    """Mediana de ``medir()`` para lo que no se puede repetir en bucle.
+
+    Cada llamada debe preparar su propio estado (un libro vacío, una caché
+    fría); una sola medida varía demasiado para compararla con la base.
+    """
+    return statistics.median(medir() for _ in range(repeticiones))
+
+
+def _agotar(flujo: sl.Flujo, respuestas: list[str]) -> sl.MotorSesion:
+    motor = sl.MotorSesion(flujo)
+    motor.iniciar()
+    for respuesta in respuestas:
+        motor.enviar(respuesta)
+    assert motor.terminado, "el guion no completó el flujo"
+    return motor
+
+
+def _letra_incorrecta(capitulo: sl.Capitulo) -> str:
+    return next(opcion[:1] for opcion in capitulo.opciones
+                if opcion[:1].upper() != capitulo.respuesta.upper())
+
+
+def bench_catalogo() -> float:
+    return cronometrar(lambda: [sl.crear_camino_patriarcas(), sl.crear_camino_profetas(),
+                                sl.crear_camino_evangelios(), sl.crear_camino_comunidad()])
+
+
+def _textos() -> list[str]:
+    return [relato for camino in sl.CAMINOS for capitulo in camino.capitulos
+            for relato in capitulo.narrativa.values()]
+
+
+def bench_envolver_sin_cache() -> float:
+    textos = _textos()
+    envolver = sl.envolver.__wrapped__
+    return cronometrar(lambda: [envolver(texto) for texto in textos]) / len(textos)
+
+
+def bench_envolver_con_cache() -> float:
+    textos = _textos()
+    return cronometrar(lambda: [sl.envolver(texto) for texto in textos]) / len(textos)
+
+
+def bench_recorrer_camino() -> float:
+    camino = sl.CAMINOS[0]
+    respuestas = [paso for capitulo in camino.capitulos
+                  for paso in (capitulo.respuesta, "Un testimonio breve.")]
+
+    def recorrer() -> None:
+        jugador = sl.Jugador("Banco", "Adulto", sl.MODO_ESTRATEGIA)
+        _agotar(sl.recorrer_camino(jugador, camino), respuestas)
+
+    return cronometrar(recorrer)
+
+
+def bench_puerta_reintentos() -> float:
+    capitulo = sl.CAMINOS[1].capitulos[1]
+    incorrecta = _letra_incorrecta(capitulo)
+    # Dos fallos, rechaza la ayuda, falla otra vez, usa Discernimiento y acierta.
+    respuestas = [incorrecta, incorrecta, "n", incorrecta, "s", "Discernimiento",
+                  capitulo.respuesta]
+
+    def puerta() -> None:
+        jugador = sl.Jugador("Banco", "Adulto", sl.MODO_CUENTO)
+        _agotar(sl.aplicar_puerta_de_sabiduria(jugador, capitulo), respuestas)
+
+    return cronometrar(puerta)
+
+
+def _recorrer_en_pantalla(redibujar: bool) -> Pantalla:
+    camino = sl.CAMINOS[0]
+    respuestas = [paso for capitulo in camino.capitulos
+                  for paso in (capitulo.respuesta, "Un testimonio breve.")]
+    with open(os.devnull, "w", encoding="utf-8") as nulo:
+        pantalla = Pantalla(nulo, redibujar=redibujar, alto=40)
+        jugador = sl.Jugador("Banco", "Adulto", sl.MODO_ESTRATEGIA)
+        motor = sl.MotorSesion(sl.recorrer_camino(jugador, camino))
+        salida = motor.iniciar()
+        for respuesta in respuestas:
+            pantalla.dibujar(salida, motor.solicitud.mensaje)
+            salida = motor.enviar(respuesta)
+        pantalla.dibujar(salida)
+    return pantalla
+
+
+def bench_pantalla_escrituras() -> dict[str, float]:
+    """Llamadas al sistema por pantalla al recorrer un camino."""
+    medidas = {}
+    for nombre, redibujar in (("continua", False), ("redibujar", True)):
+        pantalla = _recorrer_en_pantalla(redibujar)
+        medidas[f"pantalla_{nombre}_escrituras"] = pantalla.escrituras / pantalla.cuadros
+    return medidas
+
+
+def bench_pantalla_bytes() -> dict[str, float]:
+    """Bytes enviados por pantalla, dibujando todo o solo lo que cambia."""
+    medidas = {}
+    for nombre, redibujar in (("continua", False), ("redibujar", True)):
+        pantalla = _recorrer_en_pantalla(redibujar)
+        medidas[f"pantalla_{nombre}_bytes"] = pantalla.bytes_escritos / pantalla.cuadros
+    return medidas
+
+
+def bench_recompensas() -> float:
+    capitulos = [capitulo for camino in sl.CAMINOS for capitulo in camino.capitulos]
+    jugador = sl.Jugador("Banco", "Adulto", sl.MODO_CUENTO)
+
+    def entregar() -> None:
+        for capitulo in capitulos:
+            for _ in sl.entregar_recompensas(jugador, capitulo):
+                pass
+
+    return cronometrar(entregar) / len(capitulos)
+
+
+def bench_equipos() -> float:
+    """Segundos por virtud ganada o gastada en el pozo SQLite de un equipo."""
+    operaciones = 1000
+    with tempfile.TemporaryDirectory() as carpeta:
+        pozo = PozoVirtudes(Path(carpeta) / "equipos.db")
+        # Existencias para gastar en la base: una virtud ganada y aún no
+        # escrita se gastaría en memoria, sin medir la base.
+        pozo.ganar("Banco", "Paciencia", 1_000_000)
+        pozo.vaciar()
+
+        def ganar_y_usar() -> None:
+            for _ in range(operaciones // 2):
+                pozo.ganar("Banco", "Servicio")
+                pozo.usar("Banco", "Paciencia")
+            pozo.vaciar()
+
+        try:
+            return cronometrar(ganar_y_usar) / operaciones
+        finally:
+            pozo.cerrar()
+
+
+def bench_libro() -> dict[str, float]:
+    """Segundos por asiento confirmado y por reconstruir los saldos de una cuenta."""
+    asientos = 20_000
+    jugadores = [sl.Jugador(f"Peregrino {indice}", "Adulto", sl.MODO_CUENTO)
+                 for indice in range(100)]
+
+    def anotar(libro: LibroRecompensas) -> float:
+        inicio = time.perf_counter()
+        for indice in range(asientos):
+            libro.anotar(jugadores[indice % len(jugadores)], "gemas", "", 3, "bench")
+        libro.vaciar()
+        return (time.perf_counter() - inicio) / asientos
+
+    def libro_nuevo() -> float:
+        with tempfile.TemporaryDirectory() as carpeta:
+            libro = LibroRecompensas(Path(carpeta) / "recompensas.db")
+            try:
+                return anotar(libro)
+            finally:
+                libro.cerrar()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        libro = LibroRecompensas(Path(carpeta) / "recompensas.db")
+        try:
+            anotar(libro)
+            cuenta = cuenta_de(jugadores[7], GEMAS)
+            return {"libro_asiento": mediana(libro_nuevo),
+                    "libro_saldo_cuenta": cronometrar(lambda: libro.saldos(cuenta))}
+        finally:
+            libro.cerrar()
+
+
+def bench_busqueda() -> float:
+    """Segundos por consulta en un catálogo con miles de capítulos."""
+    indice = IndiceLecturas.construir(list(sl.CAMINOS) * 500)
+    consultas = ["pastor", "Miqueas 6:8", "promesa confianza", "esper", "p", "fe"]
+    return cronometrar(lambda: [indice.buscar(consulta) for consulta in consultas]) / len(consultas)
+
+
+def bench_recuerdos() -> dict[str, float]:
+    """Abrir un cofre con su archivo: la primera vez (desde el paquete) y las siguientes."""
+    recuerdo = sl.CAMINOS[0].capitulos[0].recompensa.recuerdo
+    with tempfile.TemporaryDirectory() as carpeta:
+        carpeta = Path(carpeta)
+        archivo = carpeta / "recuerdo.ogg"
+        archivo.write_bytes(random.Random(0).randbytes(4 * 1024 * 1024))
+        empaquetar({recuerdo: archivo}, carpeta / "recuerdos.sdlr")
+
+        def abrir_primera() -> float:
+            # Cada medida empieza con una caché vacía.
+            cofre = CofreRecuerdos(carpeta / "recuerdos.sdlr",
+                                   Path(tempfile.mkdtemp(dir=carpeta)))
+            inicio = time.perf_counter()
+            cofre.abrir(recuerdo)
+            return time.perf_counter() - inicio
+
+        cofre = CofreRecuerdos(carpeta / "recuerdos.sdlr", carpeta / "cache")
+        cofre.abrir(recuerdo)
+        return {"recuerdo_abrir_primera": mediana(abrir_primera),
+                "recuerdo_abrir_en_cache": cronometrar(lambda: cofre.abrir(recuerdo))}
+
+
+def bench_misiones() -> float:
+    misiones = [Mision(f"Misión {indice}", peso=1 + indice % 5,
+                       grupos_edad=("Niño",) if indice % 3 == 0 else ())
+                for indice in range(10_000)]
+    planificador = PlanificadorMisiones(misiones, random.Random(0))
+    jugador = sl.Jugador("Banco", "Adulto", sl.MODO_CUENTO)
+    planificador.tabla(jugador.grupo_edad, jugador.modo)
+    sorteos = 1000
+
+    def elegir() -> None:
+        jugador.misiones_vistas = 0
+        for _ in range(sorteos):
+            planificador.elegir(jugador)
+
+    return cronometrar(elegir) / sorteos
+
+
+def _tablero_grande(jugadores: int = 1_000_000) -> tuple[TableroGemas, list[sl.Jugador]]:
+    azar = random.Random(0)
+    grupos = ("Niño", "Adulto", "Anciano")
+    tablero = TableroGemas()
+    todos = []
+    for indice in range(jugadores):
+        jugador = sl.Jugador(f"J{indice}", grupos[indice % 3], sl.MODO_CUENTO,
+                             gemas=azar.randrange(2000))
+        tablero.actualizar(jugador)
+        todos.append(jugador)
+    return tablero, todos
+
+
+def bench_tablero() -> dict[str, float]:
+    tablero, jugadores = _tablero_grande()
+    azar = random.Random(1)
+    muestra = azar.sample(jugadores, 1000)
+
+    def actualizar() -> None:
+        for jugador in muestra:
+            jugador.gemas += 1
+            tablero.actualizar(jugador)
+
+    def posicion() -> None:
+        for jugador in muestra:
+            tablero.posicion(jugador, jugador.grupo_edad)
+
+    return {
+        "tablero_actualizar": cronometrar(actualizar) / len(muestra),
+        "tablero_posicion": cronometrar(posicion) / len(muestra),
+        "tablero_primeros_10": cronometrar(lambda: tablero.primeros(10)),
+    }
+
+
+def bench_exportar() -> dict[str, float]:
+    """Segundos por testimonio exportado en cada formato (ver ``bench_exportar.py``)."""
+    cantidad = 50_000
+    return {f"exportar_{formato}": medir_exportacion(formato, cantidad, 72)[0] / cantidad
+            for formato in ("csv", "md", "html")}
+
+
+def bench_memoria_jugador() -> float:
+    return bytes_por_jugador(lambda nombre: sl.Jugador(nombre, "Adulto", sl.MODO_CUENTO),
+                             jugadores=5000, testimonios=8)
+
+
+def bench_arranque_importacion() -> float:
+    return importacion()[0]
+
+
+def bench_arranque_primer_mensaje() -> float:
+    juego, interprete = primer_mensaje()
+    return juego - interprete
+
+
+# Una prueba puede devolver varias métricas que comparten la misma preparación.
+BENCHS: dict[str, tuple[Callable[[], float | dict[str, float]], str]] = {
+    "catalogo_crear_caminos": (bench_catalogo, "s"),
+    "envolver_sin_cache": (bench_envolver_sin_cache, "s"),
+    "envolver_con_cache": (bench_envolver_con_cache, "s"),
+    "recorrer_camino_guionado": (bench_recorrer_camino, "s"),
+    "puerta_sabiduria_reintentos": (bench_puerta_reintentos, "s"),
+    "entregar_recompensas": (bench_recompensas, "s"),
+    "pantalla_escrituras": (bench_pantalla_escrituras, "escrituras"),
+    "pantalla_bytes": (bench_pantalla_bytes, "bytes"),
+    "mision_elegir": (bench_misiones, "s"),
+    "equipos_ganar_usar": (bench_equipos, "s"),
+    "libro": (bench_libro, "s"),
+    "busqueda_consulta": (bench_busqueda, "s"),
+    "recuerdos": (bench_recuerdos, "s"),
+    "tablero": (bench_tablero, "s"),
+    "exportar": (bench_exportar, "s"),
+    "memoria_por_jugador": (bench_memoria_jugador, "bytes"),
+    "arranque_importacion": (bench_arranque_importacion, "s"),
+    "arranque_primer_mensaje": (bench_arranque_primer_mensaje, "s"),
+}
+
+
+def ejecutar(filtro: str | None = None) -> dict:
+    resultados = {}
+    for nombre, (bench, unidad) in BENCHS.items():
+        if filtro and filtro not in nombre:
+            continue
+        valor = bench()
+        medidas = valor if isinstance(valor, dict) else {nombre: valor}
+        for metrica, medida in medidas.items():
+            resultados[metrica] = {"valor": medida, "unidad": unidad}
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> list[str]:
+    """Devuelve las métricas que empeoraron más que ``tolerancia``."""
+    regresiones = []
+    for nombre, medida in actual["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if not anterior or not anterior["valor"]:
+            continue
+        cambio = medida["valor"] / anterior["valor"] - 1
+        marca = "REGRESIÓN" if cambio > tolerancia else "ok"
+        print(f"{nombre:<30} {anterior['valor']:.3e} -> {medida['valor']:.3e} "
+              f"{medida['unidad']:<5} {cambio:+7.1%}  {marca}")
+        if cambio > tolerancia:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--salida", help="escribe los resultados en este archivo JSON")
+    parser.add_argument("--comparar", metavar="BASE", help="resultados JSON de referencia")
+    parser.add_argument("--tolerancia", type=float, default=0.15,
+                        help="empeoramiento relativo permitido (por defecto 0.15)")
+    parser.add_argument("--solo", help="ejecuta solo las pruebas cuyo nombre contiene esto")
+    args = parser.parse_args()
+
+    actual = ejecutar(args.solo)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(actual, archivo, indent=2)
+
+    if not args.comparar:
+        for nombre, medida in actual["resultados"].items():
+            print(f"{nombre:<30} {medida['valor']:.3e} {medida['unidad']}")
+        return
+
+    with open(args.comparar, encoding="utf-8") as archivo:
+        base = json.load(archivo)
+    regresiones = comparar(actual, base, args.tolerancia)
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones: {', '.join(regresiones)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
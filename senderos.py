@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""Lanza la versión de consola de Senderos de Luz.
+
+Un script se compila entero cada vez que se ejecuta; un módulo importado
+usa su bytecode en caché. Este lanzador solo importa ``senderos_de_luz``,
+así que el juego arranca sin recompilar sus más de mil líneas.
+
+    python3 senderos.py [opciones]    # las mismas opciones que senderos_de_luz.py
+"""
+
+from senderos_de_luz import ejecutar
+
+ejecutar()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Bitácora de eventos del juego y análisis de bitácoras grandes.
+
+Con la bitácora activa, cada intento de respuesta, uso de virtud,
+recompensa, misión y testimonio se añade como una línea JSON::
+
+    {"t": 1760000000.0, "tipo": "respuesta", "jugador": "Ana",
+     "capitulo": "Miqueas y la justicia", "respuesta": "A", "correcta": false,
+     "intento": 1}
+
+El análisis recorre archivos de varios gigabytes con una cadena de
+generadores (líneas → eventos → acumuladores) en memoria constante: el
+archivo se divide en tramos alineados a líneas y cada proceso resume uno.
+
+    python3 senderos_bitacora.py eventos.jsonl [otro.jsonl ...] --procesos 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import senderos_de_luz
+from senderos_de_luz import VIRTUDES, Jugador
+
+# Eventos que se acumulan en memoria antes de escribirse al archivo.
+EVENTOS_POR_ESCRITURA = 256
+
+
+class Bitacora:
+    """Escribe eventos al final de un archivo JSONL.
+
+    Cada tanda se escribe con una sola llamada ``write`` sobre un
+    descriptor abierto con ``O_APPEND``, así varios procesos pueden
+    compartir el archivo sin mezclar líneas.
+    """
+
+    def __init__(self, ruta: str | Path) -> None:
+        self.ruta = Path(ruta)
+        self._descriptor = os.open(self.ruta, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._pendientes: list[str] = []
+
+    def anotar(self, tipo: str, jugador: Jugador, datos: dict[str, Any]) -> None:
+        evento = {"t": round(time.time(), 3), "tipo": tipo, "jugador": jugador.nombre, **datos}
+        self._pendientes.append(json.dumps(evento, ensure_ascii=False))
+        if len(self._pendientes) >= EVENTOS_POR_ESCRITURA:
+            self.vaciar()
+
+    def vaciar(self) -> None:
+        if self._pendientes:
+            os.write(self._descriptor, ("\n".join(self._pendientes) + "\n").encode("utf-8"))
+            self._pendientes.clear()
+
+    def cerrar(self) -> None:
+        if self._descriptor >= 0:
+            self.vaciar()
+            os.close(self._descriptor)
+            self._descriptor = -1
+
+
+def activar(ruta: str | Path) -> Bitacora:
+    bitacora = Bitacora(ruta)
+    senderos_de_luz.BITACORA = bitacora
+    return bitacora
+
+
+def desactivar() -> None:
+    if senderos_de_luz.BITACORA is not None:
+        senderos_de_luz.BITACORA.cerrar()
+    senderos_de_luz.BITACORA = None
+
+
+# --- Análisis -------------------------------------------------------------
+
+def tramos(ruta: Path, cantidad: int) -> list[tuple[str, int, int]]:
+    """Divide un archivo en ``cantidad`` tramos de bytes de tamaño parecido."""
+    tamano = ruta.stat().st_size
+    paso = max(1, -(-tamano // cantidad))
+    return [(str(ruta), inicio, min(inicio + paso, tamano))
+            for inicio in range(0, tamano, paso)]
+
+
+def leer_lineas(ruta: str, inicio: int, fin: int) -> Iterator[bytes]:
+    """Líneas que empiezan dentro de ``[inicio, fin)``.
+
+    Un tramo que empieza a mitad de línea la salta: la leerá el tramo
+    anterior, que continúa hasta terminar la última línea empezada.
+    """
+    with open(ruta, "rb") as archivo:
+        posicion = inicio
+        if inicio:
+            archivo.seek(inicio - 1)
+            posicion += len(archivo.readline()) - 1
+        while posicion < fin:
+            linea = archivo.readline()
+            if not linea:
+                break
+            posicion += len(linea)
+            yield linea
+
+
+def eventos(lineas: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    for linea in lineas:
+        try:
+            evento = json.loads(linea)
+        except ValueError:
+            continue
+        if isinstance(evento, dict):
+            yield evento
+
+
+class Resumen:
+    """Acumuladores de tamaño acotado por el catálogo, no por la bitácora."""
+
+    def __init__(self) -> None:
+        self.eventos = 0
+        # Los capítulos se identifican por ``(camino, capitulo)``.
+        self.intentos: Counter[tuple[str, str]] = Counter()
+        self.fallos: Counter[tuple[str, str]] = Counter()
+        self.distractores: Counter[tuple[str, str, str]] = Counter()
+        self.virtudes_usadas: Counter[str] = Counter()
+        self.virtudes_negadas: Counter[str] = Counter()
+        self.gemas = 0
+        self.misiones: Counter[bool] = Counter()
+        self.testimonios = 0
+
+    def agregar(self, evento: dict[str, Any]) -> None:
+        self.eventos += 1
+        tipo = evento.get("tipo")
+        if tipo == "respuesta":
+            capitulo = (str(evento.get("camino", "?")), str(evento.get("capitulo", "?")))
+            self.intentos[capitulo] += 1
+            if not evento.get("correcta"):
+                self.fallos[capitulo] += 1
+                # Solo las letras de una opción: lo demás que se escriba no
+                # debe hacer crecer el resumen.
+                letra = evento.get("respuesta")
+                if isinstance(letra, str) and len(letra) == 1 and "A" <= letra <= "Z":
+                    self.distractores[(*capitulo, letra)] += 1
+        elif tipo == "virtud":
+            virtud = evento.get("virtud")
+            # Una virtud mal escrita no es una virtud sin existencias.
+            if virtud in VIRTUDES:
+                destino = self.virtudes_usadas if evento.get("usada") else self.virtudes_negadas
+                destino[virtud] += 1
+        elif tipo == "recompensa":
+            self.gemas += evento.get("gemas") or 0
+        elif tipo == "mision":
+            self.misiones[bool(evento.get("aceptada"))] += 1
+            self.gemas += 2 if evento.get("aceptada") else 0
+        elif tipo == "testimonio":
+            self.testimonios += 1
+
+    def unir(self, otro: Resumen) -> Resumen:
+        self.eventos += otro.eventos
+        self.intentos += otro.intentos
+        self.fallos += otro.fallos
+        self.distractores += otro.distractores
+        self.virtudes_usadas += otro.virtudes_usadas
+        self.virtudes_negadas += otro.virtudes_negadas
+        self.gemas += otro.gemas
+        self.misiones += otro.misiones
+        self.testimonios += otro.testimonios
+        return self
+
+
+def resumir_tramo(tramo: tuple[str, int, int]) -> Resumen:
+    resumen = Resumen()
+    for evento in eventos(leer_lineas(*tramo)):
+        resumen.agregar(evento)
+    return resumen
+
+
+def analizar(rutas: Iterable[str | Path], procesos: int | None = None) -> Resumen:
+    procesos = procesos or os.cpu_count() or 1
+    todos = [tramo for ruta in rutas for tramo in tramos(Path(ruta), procesos)]
+    total = Resumen()
+    if procesos == 1:
+        for tramo in todos:
+            total.unir(resumir_tramo(tramo))
+        return total
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        for parcial in grupo.map(resumir_tramo, todos):
+            total.unir(parcial)
+    return total
+
+
+def _nombre(camino: str, capitulo: str) -> str:
+    return f"{camino} / {capitulo}"
+
+
+def informe(resumen: Resumen, limite: int = 5) -> str:
+    lineas = [f"Eventos analizados: {resumen.eventos}"]
+    lineas.append("\nPreguntas más difíciles (porcentaje de intentos fallidos):")
+    dificultad = sorted(resumen.intentos,
+                        key=lambda capitulo: resumen.fallos[capitulo] / resumen.intentos[capitulo],
+                        reverse=True)
+    for capitulo in dificultad[:limite]:
+        tasa = resumen.fallos[capitulo] / resumen.intentos[capitulo]
+        lineas.append(f"  {tasa:6.1%}  {_nombre(*capitulo)} "
+                      f"({resumen.intentos[capitulo]} intentos)")
+    lineas.append("\nOpciones incorrectas más elegidas:")
+    for (camino, capitulo, letra), cuenta in resumen.distractores.most_common(limite):
+        lineas.append(f"  {cuenta:8d}  {_nombre(camino, capitulo)}: {letra}")
+    lineas.append("\nVirtudes gastadas para pedir ayuda:")
+    for virtud in sorted(resumen.virtudes_usadas.keys() | resumen.virtudes_negadas.keys()):
+        lineas.append(f"  {virtud}: {resumen.virtudes_usadas[virtud]} usadas, "
+                      f"{resumen.virtudes_negadas[virtud]} sin existencias")
+    aceptadas, rechazadas = resumen.misiones[True], resumen.misiones[False]
+    lineas.append(f"\nMisiones: {aceptadas} aceptadas, {rechazadas} rechazadas")
+    lineas.append(f"Testimonios: {resumen.testimonios} | Gemas entregadas: {resumen.gemas}")
+    return "\n".join(lineas)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analiza bitácoras de eventos JSONL.")
+    parser.add_argument("rutas", nargs="+")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="procesos de trabajo (por defecto, uno por núcleo)")
+    parser.add_argument("--limite", type=int, default=5, help="filas por tabla")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resumen = analizar(args.rutas, args.procesos)
+    print(informe(resumen, args.limite))
+    print(f"\n({time.perf_counter() - inicio:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""Búsqueda en las lecturas de todos los caminos.
+
+``IndiceLecturas`` es un índice invertido de los textos de cada capítulo
+(título, narrativas, pregunta, explicación, pista, reflexión y obstáculo):
+
+* las palabras se comparan sin tildes ni mayúsculas, y se omiten las más
+  comunes ("el", "de", "que"...);
+* las citas bíblicas se reconocen como un término propio: "Miqueas 6:8"
+  genera ``@miqueas``, ``@miqueas 6`` y ``@miqueas 6:8``, así que buscar
+  "Miqueas 6" encuentra también los capítulos que citan el versículo;
+* cada entrada de la lista de un término lleva ya su puntaje BM25 (los
+  títulos y las preguntas pesan más) y las listas están ordenadas de mayor
+  a menor puntaje: una consulta suma solo las ``PROFUNDIDAD`` primeras
+  entradas de cada término (o de todas las palabras en que se completa un
+  prefijo, juntas) y elige las mejores con un montículo, así que cuesta
+  lo mismo con cien capítulos que con cien mil.
+
+El índice se construye una vez por versión del catálogo y se guarda en la
+caché de ``senderos_catalogo``; las listas se leen del archivo como bytes
+y se convierten a ``array`` solo cuando una consulta usa ese término.
+
+    python3 senderos_busqueda.py pastor
+    python3 senderos_busqueda.py "Miqueas 6:8" --catalogo caminos.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import json
+import marshal
+import math
+import os
+import re
+import weakref
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from contextlib import suppress
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+from senderos_testimonios import normalizar, tokenizar
+
+# Cambia cuando se modifica la forma del índice; invalida los guardados.
+VERSION_INDICE = 1
+
+# Peso de cada campo al contar las apariciones de un término.
+PESOS_CAMPO = {"titulo": 3.0, "pregunta": 2.0, "explicacion": 1.5, "narrativa": 1.0,
+               "pista": 1.0, "reflexion": 1.0, "obstaculo": 1.0}
+
+# Parámetros de BM25.
+K1 = 1.2
+B = 0.75
+
+# Entradas de cada lista que suma una consulta. Con un solo término el
+# resultado es exacto; con varios, un capítulo que no esté entre los
+# primeros de ningún término puede quedar fuera.
+PROFUNDIDAD = 256
+
+# Palabras desconocidas que se completan como prefijo, como mucho, y letras
+# que necesita un prefijo: "p" o "pr" coincidirían con medio índice.
+EXPANSION_PREFIJO = 32
+MINIMO_PREFIJO = 3
+
+PALABRAS_VACIAS = frozenset(normalizar(palabra) for palabra in """
+    a al algo ante como con contra cual cuando de del desde donde durante e el ella ellos
+    en entre era es esa ese eso esta este esto fue ha han hasta la las le les lo los mas
+    me mi muy ni no nos o os para pero por que se segun ser si sin sobre son su sus te
+    tu un una unas uno unos y ya
+""".split())
+
+LIBROS = (
+    "Génesis", "Éxodo", "Levítico", "Números", "Deuteronomio", "Josué", "Jueces", "Rut",
+    "1 Samuel", "2 Samuel", "1 Reyes", "2 Reyes", "1 Crónicas", "2 Crónicas", "Esdras",
+    "Nehemías", "Tobías", "Judit", "Ester", "1 Macabeos", "2 Macabeos", "Job", "Salmos",
+    "Salmo", "Proverbios", "Eclesiastés", "Cantar de los Cantares", "Sabiduría",
+    "Eclesiástico", "Isaías", "Jeremías", "Lamentaciones", "Baruc", "Ezequiel", "Daniel",
+    "Oseas", "Joel", "Amós", "Abdías", "Jonás", "Miqueas", "Nahúm", "Habacuc", "Sofonías",
+    "Ageo", "Zacarías", "Malaquías", "Mateo", "Marcos", "Lucas", "Juan", "Hechos",
+    "Romanos", "1 Corintios", "2 Corintios", "Gálatas", "Efesios", "Filipenses",
+    "Colosenses", "1 Tesalonicenses", "2 Tesalonicenses", "1 Timoteo", "2 Timoteo", "Tito",
+    "Filemón", "Hebreos", "Santiago", "1 Pedro", "2 Pedro", "1 Juan", "2 Juan", "3 Juan",
+    "Judas", "Apocalipsis",
+)
+
+# Sobre texto normalizado: libro, capítulo y, si lo hay, versículo.
+_CITA = re.compile(
+    r"\b(" + "|".join(re.escape(normalizar(libro)).replace(r"\ ", r"\s+")
+                      for libro in sorted(LIBROS, key=len, reverse=True))
+    + r")\s+(\d{1,3})(?:\s*[:,.]\s*(\d{1,3}))?\b")
+
+
+def citas(texto: str) -> list[str]:
+    """Términos de las citas de ``texto`` (ya normalizado)."""
+    terminos = []
+    for cita in _CITA.finditer(texto):
+        libro = "@" + " ".join(cita[1].split())
+        terminos += [libro, f"{libro} {cita[2]}"]
+        if cita[3]:
+            terminos.append(f"{libro} {cita[2]}:{cita[3]}")
+    return terminos
+
+
+def terminos(texto: str) -> list[str]:
+    """Palabras (sin las vacías) y citas de ``texto``."""
+    normal = normalizar(texto)
+    return [palabra for palabra in tokenizar(normal)
+            if palabra not in PALABRAS_VACIAS] + citas(normal)
+
+
+def _terminos_consulta(consulta: str) -> tuple[list[str], list[str]]:
+    """Citas (la más precisa de cada una) y palabras sueltas de la consulta."""
+    normal = normalizar(consulta)
+    referencias = []
+    for cita in _CITA.finditer(normal):
+        libro = "@" + " ".join(cita[1].split())
+        referencias.append(f"{libro} {cita[2]}:{cita[3]}" if cita[3] else f"{libro} {cita[2]}")
+    resto = _CITA.sub(" ", normal)
+    palabras = [palabra for palabra in dict.fromkeys(tokenizar(resto))
+                if palabra not in PALABRAS_VACIAS]
+    return referencias, palabras
+
+
+def textos_capitulos(caminos: Sequence) -> Iterator[tuple[int, int, list[tuple[str, str]]]]:
+    """``(camino, capítulo, [(campo, texto), ...])`` de cada capítulo del catálogo."""
+    if hasattr(caminos, "textos_capitulos"):
+        yield from caminos.textos_capitulos()
+        return
+    for posicion, camino in enumerate(caminos):
+        for numero, capitulo in enumerate(camino.capitulos):
+            yield posicion, numero, [
+                ("titulo", capitulo.titulo), ("pregunta", capitulo.pregunta),
+                *(("narrativa", relato) for relato in capitulo.narrativa.values()),
+                ("explicacion", capitulo.explicacion), ("pista", capitulo.pista),
+                ("reflexion", capitulo.reflexion), ("obstaculo", capitulo.obstaculo)]
+
+
+def version_catalogo(caminos: Sequence) -> str:
+    """Identifica el contenido del catálogo para guardar su índice."""
+    ruta = getattr(caminos, "ruta", None)
+    if ruta is not None:
+        # Los catálogos compilados ya se nombran por el hash de su contenido.
+        return Path(ruta).stem
+    from senderos_catalogo import caminos_a_datos
+
+    datos = json.dumps(caminos_a_datos(caminos), ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(datos.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass(slots=True)
+class Resultado:
+    camino: int
+    capitulo: int
+    puntaje: float
+
+
+class IndiceLecturas:
+    """Índice invertido con puntajes BM25 precalculados."""
+
+    def __init__(self, documentos: tuple[array, array],
+                 listas: dict[str, tuple[bytes, bytes]]) -> None:
+        # Documento i = capítulo ``capitulos[i]`` del camino ``caminos[i]``.
+        self.caminos, self.capitulos = documentos
+        self._crudas = listas
+        # ``construir`` guarda los términos en orden alfabético.
+        self._palabras = list(listas)
+        self._listas: dict[str, tuple[array, array]] = {}
+
+    @classmethod
+    def construir(cls, caminos: Sequence) -> IndiceLecturas:
+        documentos = (array("I"), array("I"))
+        frecuencias: dict[str, dict[int, float]] = {}
+        longitudes: list[float] = []
+        for posicion, numero, campos in textos_capitulos(caminos):
+            documento = len(longitudes)
+            documentos[0].append(posicion)
+            documentos[1].append(numero)
+            longitud = 0.0
+            for campo, texto in campos:
+                peso = PESOS_CAMPO[campo]
+                for termino in terminos(texto):
+                    apariciones = frecuencias.setdefault(termino, {})
+                    apariciones[documento] = apariciones.get(documento, 0.0) + peso
+                    longitud += peso
+            longitudes.append(longitud)
+
+        total = len(longitudes)
+        promedio = sum(longitudes) / total if total else 1.0
+        listas = {}
+        for termino in sorted(frecuencias):
+            apariciones = frecuencias[termino]
+            idf = math.log(1 + (total - len(apariciones) + 0.5) / (len(apariciones) + 0.5))
+            puntuados = sorted(
+                ((idf * frecuencia * (K1 + 1)
+                  / (frecuencia + K1 * (1 - B + B * longitudes[documento] / (promedio or 1.0))),
+                  documento)
+                 for documento, frecuencia in apariciones.items()),
+                key=lambda par: (-par[0], par[1]))
+            ids = array("I", (documento for _, documento in puntuados))
+            puntajes = array("f", (puntaje for puntaje, _ in puntuados))
+            listas[termino] = (ids.tobytes(), puntajes.tobytes())
+        return cls(documentos, listas)
+
+    def guardar(self, ruta: Path) -> None:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_suffix(".tmp")
+        temporal.write_bytes(marshal.dumps(
+            (VERSION_INDICE, self.caminos.tobytes(), self.capitulos.tobytes(), self._crudas)))
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def abrir(cls, ruta: Path) -> IndiceLecturas | None:
+        """Carga un índice guardado; ``None`` si falta o es de otra versión."""
+        try:
+            version, caminos, capitulos, listas = marshal.loads(ruta.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != VERSION_INDICE:
+            return None
+        documentos = (array("I"), array("I"))
+        documentos[0].frombytes(caminos)
+        documentos[1].frombytes(capitulos)
+        return cls(documentos, listas)
+
+    def __len__(self) -> int:
+        return len(self.caminos)
+
+    def _lista(self, termino: str) -> tuple[array, array] | None:
+        lista = self._listas.get(termino)
+        if lista is None:
+            crudas = self._crudas.get(termino)
+            if crudas is None:
+                return None
+            ids, puntajes = array("I"), array("f")
+            ids.frombytes(crudas[0])
+            puntajes.frombytes(crudas[1])
+            lista = self._listas[termino] = (ids, puntajes)
+        return lista
+
+    def _expandir(self, palabra: str) -> list[str]:
+        """La palabra si está en el índice; si no, las que empiezan por ella."""
+        if palabra in self._crudas:
+            return [palabra]
+        if len(palabra) < MINIMO_PREFIJO:
+            return []
+        encontradas = []
+        indice = bisect_left(self._palabras, palabra)
+        while (indice < len(self._palabras) and len(encontradas) < EXPANSION_PREFIJO
+               and self._palabras[indice].startswith(palabra)):
+            encontradas.append(self._palabras[indice])
+            indice += 1
+        return encontradas
+
+    def buscar(self, consulta: str, limite: int = 10) -> list[Resultado]:
+        """Los ``limite`` capítulos con mayor puntaje para la consulta."""
+        referencias, palabras = _terminos_consulta(consulta)
+        puntajes: dict[int, float] = {}
+        grupos = [[referencia] for referencia in referencias]
+        grupos += [self._expandir(palabra) for palabra in palabras]
+        for grupo in grupos:
+            listas = [zip(*lista) for termino in grupo
+                      if (lista := self._lista(termino)) is not None]
+            # Las variantes de un mismo prefijo no se suman entre sí y, entre
+            # todas, aportan solo sus ``PROFUNDIDAD`` mejores entradas.
+            entradas = (listas[0] if len(listas) == 1
+                        else heapq.merge(*listas, key=lambda entrada: -entrada[1]))
+            mejores: dict[int, float] = {}
+            for documento, puntaje in islice(entradas, PROFUNDIDAD):
+                if puntaje > mejores.get(documento, 0.0):
+                    mejores[documento] = puntaje
+            for documento, puntaje in mejores.items():
+                puntajes[documento] = puntajes.get(documento, 0.0) + puntaje
+        mejores_documentos = heapq.nlargest(limite, puntajes.items(),
+                                            key=lambda par: (par[1], -par[0]))
+        return [Resultado(self.caminos[documento], self.capitulos[documento], puntaje)
+                for documento, puntaje in mejores_documentos]
+
+
+# Índices ya abiertos por catálogo; se liberan junto con el catálogo.
+_INDICES: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_INDICE_INCLUIDO: dict[str, IndiceLecturas] = {}
+
+
+def indice_lecturas(caminos: Sequence, cache: Path | None = None) -> IndiceLecturas:
+    """Índice de ``caminos``: de memoria, del disco o construido y guardado."""
+    with suppress(KeyError, TypeError):
+        return _INDICES[caminos]
+    from senderos_catalogo import directorio_cache
+
+    version = version_catalogo(caminos)
+    if version in _INDICE_INCLUIDO:
+        return _INDICE_INCLUIDO[version]
+    ruta = (cache or directorio_cache()) / f"{version}.v{VERSION_INDICE}.idx"
+    indice = IndiceLecturas.abrir(ruta)
+    if indice is None:
+        indice = IndiceLecturas.construir(caminos)
+        indice.guardar(ruta)
+    try:
+        _INDICES[caminos] = indice
+    except TypeError:
+        # Las listas (como ``CAMINOS``) no admiten referencias débiles.
+        _INDICE_INCLUIDO[version] = indice
+    return indice
+
+
+def fragmento(capitulo, consulta: str, largo: int = 160) -> str:
+    """La primera oración del capítulo que contiene algún término de la consulta."""
+    referencias, palabras = _terminos_consulta(consulta)
+    buscados = set(palabras)
+    citas_buscadas = set(referencias)
+    textos = [capitulo.pregunta, *capitulo.narrativa.values(), capitulo.explicacion,
+              capitulo.pista, capitulo.reflexion, capitulo.obstaculo]
+    for texto in textos:
+        for oracion in re.split(r"(?<=[.!?])\s+", texto):
+            normal = normalizar(oracion)
+            if (citas_buscadas & set(citas(normal))
+                    or any(palabra.startswith(buscado) for palabra in tokenizar(normal)
+                           for buscado in buscados)):
+                return oracion if len(oracion) <= largo else oracion[:largo - 1] + "…"
+    return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("consulta")
+    parser.add_argument("--catalogo", nargs="+", metavar="RUTA",
+                        help="archivos o carpetas JSON con caminos (ver senderos_catalogo.py)")
+    parser.add_argument("--limite", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.catalogo:
+        from senderos_catalogo import ErrorCatalogo, cargar_catalogo
+        try:
+            caminos = cargar_catalogo(args.catalogo)
+        except ErrorCatalogo as error:
+            raise SystemExit(f"Catálogo inválido: {error}") from None
+    else:
+        from senderos_de_luz import CAMINOS
+        caminos = CAMINOS
+    resultados = indice_lecturas(caminos).buscar(args.consulta, args.limite)
+    if not resultados:
+        print("No se encontraron lecturas.")
+    for resultado in resultados:
+        camino = caminos[resultado.camino]
+        capitulo = camino.capitulos[resultado.capitulo]
+        print(f"{resultado.puntaje:6.2f}  {camino.nombre} — {capitulo.titulo}")
+        texto = fragmento(capitulo, args.consulta)
+        if texto:
+            print(f"        {texto}")
+
+
+if __name__ == "__main__":
+    main()
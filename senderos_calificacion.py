@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Calificación por lotes de hojas de respuestas de un salón de clase.
+
+Compara de una vez, con NumPy, las letras de todos los estudiantes contra
+``Capitulo.respuesta`` de cada capítulo de un camino. Devuelve el puntaje y
+las gemas y virtudes de cada estudiante según las ``Recompensa`` del
+camino, y el porcentaje de aciertos de cada pregunta.
+
+Requiere NumPy (``pip install numpy``).
+
+    python3 senderos_calificacion.py hojas.csv --camino Profetas --salida notas.csv
+    python3 senderos_calificacion.py --prueba 10000 --camino Profetas
+
+Cada fila de ``hojas.csv`` es ``estudiante,letra1,letra2,...`` (o
+``estudiante,ABCD...``), en el orden de los capítulos del camino. Si la
+primera fila es un encabezado, ``--encabezado`` la omite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from senderos_de_luz import CAMINOS, VIRTUDES, Camino, Capitulo
+
+# ``letra & _MAYUSCULAS`` pasa a mayúscula una letra ASCII.
+_MAYUSCULAS = 0xDF
+
+
+@dataclass(slots=True)
+class ResultadoLote:
+    correctas: np.ndarray           # (estudiantes, preguntas) de bool
+    puntajes: np.ndarray            # aciertos por estudiante
+    gemas: np.ndarray               # gemas ganadas por estudiante
+    virtudes: dict[str, np.ndarray]  # virtudes ganadas por estudiante
+    precision: np.ndarray           # fracción de aciertos por pregunta
+
+
+def matriz_respuestas(hojas: np.ndarray | Sequence[str], preguntas: int) -> np.ndarray:
+    """Convierte las hojas en una matriz ``uint8`` de códigos ASCII.
+
+    Acepta una matriz de letras (``dtype`` ``U1``, ``S1`` o ``uint8``) o una
+    lista con una cadena por estudiante; las cadenas cortas se completan
+    con espacios, que nunca coinciden con una respuesta.
+    """
+    if len(hojas) == 0:
+        return np.empty((0, preguntas), dtype=np.uint8)
+    if isinstance(hojas, np.ndarray):
+        if hojas.dtype.kind == "U":
+            hojas = np.char.encode(hojas, "ascii", "replace")
+        matriz = hojas.view(np.uint8) if hojas.dtype.kind == "S" else hojas.astype(np.uint8)
+        matriz = matriz.reshape(len(hojas), -1)
+    else:
+        texto = "".join(hoja.ljust(preguntas)[:preguntas] for hoja in hojas)
+        matriz = np.frombuffer(texto.encode("ascii", "replace"), dtype=np.uint8)
+        matriz = matriz.reshape(len(hojas), preguntas)
+    if matriz.shape[1] != preguntas:
+        raise ValueError(f"Se esperaban {preguntas} respuestas por hoja, "
+                         f"hay {matriz.shape[1]}.")
+    return matriz
+
+
+def calificar_lote(capitulos: Sequence[Capitulo],
+                   hojas: np.ndarray | Sequence[str]) -> ResultadoLote:
+    """Califica todas las hojas contra las respuestas de ``capitulos``."""
+    capitulos = list(capitulos)
+    clave = np.frombuffer("".join(capitulo.respuesta.upper() for capitulo in capitulos)
+                          .encode("ascii"), dtype=np.uint8)
+    gemas_por_pregunta = np.array([capitulo.recompensa.gemas for capitulo in capitulos],
+                                  dtype=np.int64)
+    correctas = (matriz_respuestas(hojas, len(capitulos)) & _MAYUSCULAS) == clave
+
+    virtudes = {}
+    for virtud in VIRTUDES:
+        columnas = [capitulo.recompensa.virtud == virtud for capitulo in capitulos]
+        virtudes[virtud] = correctas[:, columnas].sum(axis=1)
+    return ResultadoLote(
+        correctas=correctas,
+        puntajes=correctas.sum(axis=1),
+        gemas=correctas @ gemas_por_pregunta,
+        virtudes=virtudes,
+        precision=correctas.mean(axis=0) if len(correctas) else np.zeros(len(capitulos)),
+    )
+
+
+def calificar_camino(camino: Camino, hojas: np.ndarray | Sequence[str]) -> ResultadoLote:
+    return calificar_lote(camino.capitulos, hojas)
+
+
+def _buscar_camino(nombre: str) -> Camino:
+    for camino in CAMINOS:
+        if camino.nombre.casefold() == nombre.casefold():
+            return camino
+    disponibles = ", ".join(camino.nombre for camino in CAMINOS)
+    raise SystemExit(f"No existe el camino '{nombre}'. Caminos: {disponibles}.")
+
+
+def _leer_hojas(ruta: str, encabezado: bool = False) -> tuple[list[str], list[str]]:
+    estudiantes, hojas = [], []
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        filas = csv.reader(archivo)
+        if encabezado:
+            next(filas, None)
+        for fila in filas:
+            if fila:
+                estudiantes.append(fila[0])
+                # Una fila con solo el nombre es una hoja en blanco.
+                hojas.append("".join(letra.strip()[:1] or " " for letra in fila[1:])
+                             if len(fila) > 2 else "".join(fila[1:2]).strip())
+    return estudiantes, hojas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("hojas", nargs="?", help="CSV con las respuestas de cada estudiante")
+    parser.add_argument("--camino", required=True)
+    parser.add_argument("--encabezado", action="store_true",
+                        help="la primera fila del CSV es un encabezado, no un estudiante")
+    parser.add_argument("--salida", help="CSV con estudiante, puntaje y gemas")
+    parser.add_argument("--prueba", type=int, metavar="ESTUDIANTES",
+                        help="califica hojas aleatorias y mide el tiempo")
+    parser.add_argument("--preguntas", type=int, default=100,
+                        help="preguntas por hoja en --prueba (repite los capítulos)")
+    args = parser.parse_args()
+    camino = _buscar_camino(args.camino)
+
+    if args.prueba:
+        capitulos = [camino.capitulos[i % len(camino.capitulos)] for i in range(args.preguntas)]
+        azar = np.random.default_rng(0)
+        hojas = azar.choice(np.frombuffer(b"ABCD", dtype=np.uint8),
+                            size=(args.prueba, args.preguntas))
+        inicio = time.perf_counter()
+        resultado = calificar_lote(capitulos, hojas)
+        duracion = time.perf_counter() - inicio
+        print(f"{args.prueba} estudiantes × {args.preguntas} preguntas en "
+              f"{duracion * 1000:.1f} ms (puntaje medio {resultado.puntajes.mean():.1f})")
+        return
+
+    if not args.hojas:
+        parser.error("indica el archivo de hojas o usa --prueba")
+    estudiantes, hojas = _leer_hojas(args.hojas, args.encabezado)
+    resultado = calificar_camino(camino, hojas)
+    for capitulo, precision in zip(camino.capitulos, resultado.precision):
+        print(f"{precision:6.1%}  {capitulo.titulo}")
+    if args.salida:
+        with open(args.salida, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["estudiante", "puntaje", "gemas", *VIRTUDES])
+            for fila, estudiante in enumerate(estudiantes):
+                escritor.writerow([estudiante, resultado.puntajes[fila], resultado.gemas[fila],
+                                   *(resultado.virtudes[virtud][fila] for virtud in VIRTUDES)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Catálogo de caminos cargado desde archivos de datos.
+
+Los caminos se describen en archivos JSON externos. Se validan una sola
+vez y se compilan a un archivo binario en caché cuyo nombre es el hash del
+contenido; las cargas siguientes leen solo el índice y materializan cada
+``Camino`` y sus ``Capitulo`` de forma perezosa, al primer acceso.
+
+Formato de un archivo de datos::
+
+    {"caminos": [{"nombre": "...", "descripcion": "...",
+                  "capitulos": [{"titulo": "...", "narrativa": {"cuento": "..."},
+                                 "pregunta": "...", "opciones": ["A) ...", ...],
+                                 "respuesta": "A", "pista": "...",
+                                 "explicacion": "...", "obstaculo": "...",
+                                 "reflexion": "...",
+                                 "recompensa": {"gemas": 3, "virtud": null,
+                                                "recuerdo": null}}]}]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, overload
+
+from senderos_de_luz import (ANCHO_TEXTO, CAMINOS, MODO_CUENTO, MODOS_NARRATIVA, VIRTUDES_BASE,
+                             Camino, Capitulo, Recompensa, crear_capitulo, prerenderizar)
+
+# Cambia cuando se modifica la forma compilada; invalida las cachés viejas.
+VERSION_COMPILADO = 2
+# ``marshal`` cambia entre versiones de Python: cada una compila su caché.
+_VERSION_PYTHON = "py{}.{}".format(*sys.version_info[:2])
+_MAGICO = b"SDLC"
+_CABECERA = struct.Struct("<4sHQ")  # mágico, versión, longitud del índice
+
+_CAMPOS_TEXTO = ("titulo", "pregunta", "respuesta", "pista", "explicacion",
+                 "obstaculo", "reflexion")
+
+
+class ErrorCatalogo(ValueError):
+    """El archivo de datos no describe un catálogo válido."""
+
+
+def directorio_cache() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "senderos_de_luz"
+
+
+def _validar_capitulo(datos: Any, donde: str) -> tuple:
+    if not isinstance(datos, dict):
+        raise ErrorCatalogo(f"{donde}: se esperaba un objeto.")
+    for campo in _CAMPOS_TEXTO:
+        if not isinstance(datos.get(campo), str) or not datos[campo].strip():
+            raise ErrorCatalogo(f"{donde}: falta el texto '{campo}'.")
+    narrativa = datos.get("narrativa")
+    if not isinstance(narrativa, dict) or not isinstance(narrativa.get(MODO_CUENTO), str):
+        raise ErrorCatalogo(f"{donde}: la narrativa necesita al menos el modo '{MODO_CUENTO}'.")
+    if not all(isinstance(relato, str) for relato in narrativa.values()):
+        raise ErrorCatalogo(f"{donde}: cada narrativa debe ser texto.")
+    desconocidos = narrativa.keys() - set(MODOS_NARRATIVA)
+    if desconocidos:
+        raise ErrorCatalogo(f"{donde}: modos de narrativa desconocidos: "
+                            f"{', '.join(sorted(desconocidos))}.")
+    opciones = datos.get("opciones")
+    if not isinstance(opciones, list) or len(opciones) < 2 \
+            or not all(isinstance(opcion, str) and opcion for opcion in opciones):
+        raise ErrorCatalogo(f"{donde}: se necesitan al menos dos opciones.")
+    letras = {opcion[:1].upper() for opcion in opciones}
+    if datos["respuesta"].strip().upper() not in letras:
+        raise ErrorCatalogo(f"{donde}: la respuesta '{datos['respuesta']}' no es una opción.")
+    recompensa = datos.get("recompensa")
+    if recompensa is None:
+        recompensa = {}
+    elif not isinstance(recompensa, dict):
+        raise ErrorCatalogo(f"{donde}: la recompensa debe ser un objeto.")
+    gemas = recompensa.get("gemas", 0)
+    virtud = recompensa.get("virtud")
+    recuerdo = recompensa.get("recuerdo")
+    if not isinstance(gemas, int) or isinstance(gemas, bool) or gemas < 0:
+        raise ErrorCatalogo(f"{donde}: las gemas deben ser un entero no negativo.")
+    if virtud is not None and virtud not in VIRTUDES_BASE:
+        raise ErrorCatalogo(f"{donde}: virtud desconocida '{virtud}'.")
+    if recuerdo is not None and not isinstance(recuerdo, str):
+        raise ErrorCatalogo(f"{donde}: el recuerdo debe ser texto.")
+    return (datos["titulo"], dict(narrativa), datos["pregunta"], tuple(opciones),
+            datos["respuesta"].strip().upper(), datos["pista"], datos["explicacion"],
+            datos["obstaculo"], datos["reflexion"], gemas, virtud, recuerdo)
+
+
+def _validar(datos: Any, origen: str) -> list[tuple[str, str, list[tuple]]]:
+    if not isinstance(datos, dict) or not isinstance(datos.get("caminos"), list):
+        raise ErrorCatalogo(f"{origen}: se esperaba un objeto con la lista 'caminos'.")
+    caminos = []
+    for idx, camino in enumerate(datos["caminos"], start=1):
+        donde = f"{origen}, camino {idx}"
+        if not isinstance(camino, dict) or not isinstance(camino.get("nombre"), str):
+            raise ErrorCatalogo(f"{donde}: falta el nombre.")
+        capitulos = camino.get("capitulos")
+        if not isinstance(capitulos, list) or not capitulos:
+            raise ErrorCatalogo(f"{donde}: no tiene capítulos.")
+        caminos.append((
+            camino["nombre"],
+            str(camino.get("descripcion", "")),
+            [_validar_capitulo(capitulo, f"{donde}, capítulo {num}")
+             for num, capitulo in enumerate(capitulos, start=1)],
+        ))
+    return caminos
+
+
+def compilar(rutas: Iterable[Path], destino: Path) -> None:
+    """Valida los archivos de datos y escribe su forma binaria en ``destino``.
+
+    El archivo contiene una cabecera, un índice ``(nombre, descripcion,
+    total_capitulos, desplazamiento, longitud, titulos)`` y un bloque por
+    camino, de modo que cada camino puede leerse por separado.
+    """
+    bloques: list[bytes] = []
+    indice: list[tuple] = []
+    desplazamiento = 0
+    for ruta in rutas:
+        try:
+            with open(ruta, encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+        except json.JSONDecodeError as error:
+            raise ErrorCatalogo(f"{ruta}: JSON inválido ({error}).") from error
+        except OSError as error:
+            raise ErrorCatalogo(f"{ruta}: no se pudo leer ({error.strerror}).") from error
+        for nombre, descripcion, capitulos in _validar(datos, str(ruta)):
+            bloque = marshal.dumps(tuple(capitulos))
+            indice.append((nombre, descripcion, len(capitulos), desplazamiento, len(bloque),
+                           tuple(capitulo[0] for capitulo in capitulos)))
+            bloques.append(bloque)
+            desplazamiento += len(bloque)
+
+    datos_indice = marshal.dumps(tuple(indice))
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    # Un temporal propio: dos procesos pueden compilar el mismo catálogo a la vez.
+    with tempfile.NamedTemporaryFile(dir=destino.parent, prefix=destino.name,
+                                     suffix=".tmp", delete=False) as archivo:
+        try:
+            archivo.write(_CABECERA.pack(_MAGICO, VERSION_COMPILADO, len(datos_indice)))
+            archivo.write(datos_indice)
+            for bloque in bloques:
+                archivo.write(bloque)
+        except BaseException:
+            os.unlink(archivo.name)
+            raise
+    os.replace(archivo.name, destino)
+
+
+def hash_contenido(rutas: Sequence[Path]) -> str:
+    resumen = hashlib.sha256(f"v{VERSION_COMPILADO}-{_VERSION_PYTHON}".encode())
+    for ruta in rutas:
+        try:
+            resumen.update(ruta.read_bytes())
+        except OSError as error:
+            raise ErrorCatalogo(f"{ruta}: no se pudo leer ({error.strerror}).") from error
+    return resumen.hexdigest()
+
+
+def _expandir(rutas: Iterable[str | Path]) -> list[Path]:
+    archivos: list[Path] = []
+    for ruta in map(Path, rutas):
+        if not ruta.exists():
+            raise ErrorCatalogo(f"{ruta}: no existe.")
+        archivos.extend(sorted(ruta.glob("*.json")) if ruta.is_dir() else [ruta])
+    if not archivos:
+        raise ErrorCatalogo("No se encontraron archivos de datos del catálogo.")
+    return archivos
+
+
+class CapitulosPerezosos(Sequence):
+    """Capítulos de un camino que se leen del binario al primer acceso."""
+
+    def __init__(self, ruta: Path, inicio: int, longitud: int, total: int,
+                 ancho: int = ANCHO_TEXTO) -> None:
+        self.ancho = ancho
+        self._ruta = ruta
+        self._inicio = inicio
+        self._longitud = longitud
+        self._total = total
+        self._crudos: tuple | None = None
+        self._capitulos: list[Capitulo | None] = [None] * total
+
+    def __len__(self) -> int:
+        return self._total
+
+    @overload
+    def __getitem__(self, indice: int) -> Capitulo: ...
+    @overload
+    def __getitem__(self, indice: slice) -> list[Capitulo]: ...
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(self._total))]
+        if indice < 0:
+            indice += self._total
+        capitulo = self._capitulos[indice]
+        if capitulo is None:
+            capitulo = self._capitulos[indice] = self._materializar(indice)
+        return capitulo
+
+    def _materializar(self, indice: int) -> Capitulo:
+        if self._crudos is None:
+            with open(self._ruta, "rb") as archivo:
+                archivo.seek(self._inicio)
+                self._crudos = marshal.loads(archivo.read(self._longitud))
+        (titulo, narrativa, pregunta, opciones, respuesta, pista, explicacion,
+         obstaculo, reflexion, gemas, virtud, recuerdo) = self._crudos[indice]
+        capitulo = crear_capitulo(
+            titulo=titulo, narrativa=narrativa, pregunta=pregunta,
+            opciones=opciones, respuesta=respuesta, pista=pista,
+            explicacion=explicacion, obstaculo=obstaculo, reflexion=reflexion,
+            recompensa=Recompensa(gemas=gemas, virtud=virtud, recuerdo=recuerdo),
+        )
+        prerenderizar([capitulo], self.ancho)
+        return capitulo
+
+
+class Catalogo(Sequence):
+    """Secuencia de caminos respaldada por un catálogo compilado."""
+
+    def __init__(self, ruta: Path, ancho: int = ANCHO_TEXTO) -> None:
+        self.ruta = ruta
+        self.ancho = ancho
+        with open(ruta, "rb") as archivo:
+            magico, version, longitud = _CABECERA.unpack(archivo.read(_CABECERA.size))
+            if magico != _MAGICO or version != VERSION_COMPILADO:
+                raise ErrorCatalogo(f"{ruta}: catálogo compilado incompatible.")
+            self._indice = marshal.loads(archivo.read(longitud))
+        self._base = _CABECERA.size + longitud
+        self._caminos: list[Camino | None] = [None] * len(self._indice)
+
+    def __len__(self) -> int:
+        return len(self._indice)
+
+    @overload
+    def __getitem__(self, indice: int) -> Camino: ...
+    @overload
+    def __getitem__(self, indice: slice) -> list[Camino]: ...
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        camino = self._caminos[indice]
+        if camino is None:
+            nombre, descripcion, total, inicio, longitud, _ = self._indice[indice]
+            capitulos = CapitulosPerezosos(self.ruta, self._base + inicio, longitud, total,
+                                           self.ancho)
+            camino = self._caminos[indice] = Camino(
+                nombre=nombre, descripcion=descripcion, capitulos=capitulos)
+        return camino
+
+    def textos_capitulos(self) -> Iterator[tuple[int, int, list[tuple[str, str]]]]:
+        """``(camino, capítulo, [(campo, texto), ...])`` leídos sin materializar capítulos."""
+        with open(self.ruta, "rb") as archivo:
+            for posicion, (_, _, _, inicio, longitud, _) in enumerate(self._indice):
+                archivo.seek(self._base + inicio)
+                for numero, crudo in enumerate(marshal.loads(archivo.read(longitud))):
+                    (titulo, narrativa, pregunta, _, _, pista, explicacion,
+                     obstaculo, reflexion, *_) = crudo
+                    yield posicion, numero, [
+                        ("titulo", titulo), ("pregunta", pregunta),
+                        *(("narrativa", relato) for relato in narrativa.values()),
+                        ("explicacion", explicacion), ("pista", pista),
+                        ("reflexion", reflexion), ("obstaculo", obstaculo)]
+
+    def resumenes(self) -> list[tuple[str, str, tuple[str, ...]]]:
+        """Nombre, descripción y títulos de cada camino, sin leer los capítulos."""
+        return [(nombre, descripcion, titulos)
+                for nombre, descripcion, _, _, _, titulos in self._indice]
+
+
+def cargar_catalogo(rutas: Iterable[str | Path], cache: Path | None = None,
+                    ancho: int = ANCHO_TEXTO) -> Catalogo:
+    """Carga el catálogo descrito por ``rutas`` (archivos o directorios JSON).
+
+    Solo se valida y compila cuando el contenido cambió desde la última vez.
+    Los textos de cada capítulo se envuelven a ``ancho`` al materializarlo.
+    """
+    archivos = _expandir(rutas)
+    destino = (cache or directorio_cache()) / f"{hash_contenido(archivos)}.bin"
+    if not destino.exists():
+        compilar(archivos, destino)
+    return Catalogo(destino, ancho)
+
+
+def caminos_a_datos(caminos: Iterable[Camino]) -> dict[str, Any]:
+    """Convierte caminos en el formato de los archivos de datos."""
+    return {"caminos": [
+        {
+            "nombre": camino.nombre,
+            "descripcion": camino.descripcion,
+            "capitulos": [
+                {
+                    "titulo": capitulo.titulo,
+                    "narrativa": dict(capitulo.narrativa),
+                    "pregunta": capitulo.pregunta,
+                    "opciones": list(capitulo.opciones),
+                    "respuesta": capitulo.respuesta,
+                    "pista": capitulo.pista,
+                    "explicacion": capitulo.explicacion,
+                    "obstaculo": capitulo.obstaculo,
+                    "reflexion": capitulo.reflexion,
+                    "recompensa": {
+                        "gemas": capitulo.recompensa.gemas,
+                        "virtud": capitulo.recompensa.virtud,
+                        "recuerdo": capitulo.recompensa.recuerdo,
+                    },
+                }
+                for capitulo in camino.capitulos
+            ],
+        }
+        for camino in caminos
+    ]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Herramientas del catálogo de caminos.")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+    exportar = ordenes.add_parser("exportar", help="escribe el catálogo incluido como JSON")
+    exportar.add_argument("destino")
+    compilar_ = ordenes.add_parser("compilar", help="valida y compila archivos de datos")
+    compilar_.add_argument("rutas", nargs="+")
+    args = parser.parse_args()
+
+    if args.orden == "exportar":
+        with open(args.destino, "w", encoding="utf-8") as archivo:
+            json.dump(caminos_a_datos(CAMINOS), archivo, ensure_ascii=False, indent=2)
+        print(f"Catálogo escrito en {args.destino}.")
+    else:
+        try:
+            catalogo = cargar_catalogo(args.rutas)
+        except ErrorCatalogo as error:
+            raise SystemExit(f"Catálogo inválido: {error}") from None
+        print(f"{len(catalogo)} caminos compilados en {catalogo.ruta}.")
+
+
+if __name__ == "__main__":
+    main()
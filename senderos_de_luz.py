@@ -4,20 +4,57 @@
 El juego busca motivar a jugadores de cualquier edad a leer y reflexionar
 sobre la Biblia mediante rutas temáticas, preguntas interactivas y premios
 que desbloquean obstáculos llamados Puertas de Sabiduría.
+
+Para que el primer mensaje aparezca enseguida en equipos modestos, los
+caminos incorporados se construyen la primera vez que se consultan y los
+módulos que no hacen falta para registrar al jugador (``argparse``,
+``textwrap``, ``datetime``, los índices de testimonios, el planificador de
+misiones) se importan donde se usan.
 """
 
 from __future__ import annotations
 
-import random
+import atexit
+import os
 import sys
-from dataclasses import dataclass, field
-from textwrap import fill
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, Sequence
+from contextlib import AbstractContextManager, nullcontext
+from functools import lru_cache, wraps
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Generator, Optional, TypeVar, Union, overload
+
+if TYPE_CHECKING:
+    from senderos_misiones import PlanificadorMisiones
+    from senderos_pantalla import Pantalla
+    from senderos_testimonios import ArbolTestimonios
 
 # Constantes de modo para personalizar la narrativa según preferencia.
 MODO_CUENTO = "cuento"
 MODO_ESTRATEGIA = "estrategia"
 MODO_REFLEXION = "reflexion"
 
+# Orden de las narrativas de cada modo dentro de ``Capitulo.mensajes``.
+MODOS_NARRATIVA = (MODO_CUENTO, MODO_ESTRATEGIA, MODO_REFLEXION)
+
+# Idioma en que están escritos los capítulos; las traducciones a otros
+# idiomas se cargan de tablas aparte (ver ``senderos_idiomas``).
+IDIOMA_BASE = "es"
+
+# Ancho de texto por defecto y límites cuando se ajusta a la terminal.
+ANCHO_TEXTO = 78
+ANCHO_MINIMO = 40
+ANCHO_MAXIMO = 100
+
+# Testimonios por página en el Árbol de Testimonios.
+TAMANO_PAGINA = 10
+
+# Base SQLite del pozo de virtudes de los equipos (ver ``senderos_equipos``).
+POZO_PREDETERMINADO = "equipos.db"
+
+# Párrafos ya envueltos que se conservan en memoria.
+TAMANO_CACHE_TEXTO = 4096
+
 # Virtudes disponibles como cartas de apoyo.
 VIRTUDES_BASE = {
     "Paciencia": 1,
@@ -25,74 +62,498 @@ VIRTUDES_BASE = {
     "Servicio": 1,
 }
 
+# Orden fijo de las virtudes para los contadores compactos de ``Virtudes``.
+VIRTUDES = tuple(VIRTUDES_BASE)
+INDICE_VIRTUD = {virtud: indice for indice, virtud in enumerate(VIRTUDES)}
+_CUENTAS_BASE = array("i", VIRTUDES_BASE.values())
+
+
+# Las clases de datos de este módulo se escriben a mano, con ``__slots__``,
+# en lugar de con ``dataclasses``: importarlo (con ``inspect``, ``ast`` y
+# ``re``) costaba más que el resto del arranque.
+
+
+def _igual(uno: object, otro: object) -> bool:
+    """``==`` campo a campo para las clases con ``__slots__`` de este módulo."""
+    if type(uno) is not type(otro):
+        return NotImplemented
+    return all(getattr(uno, campo) == getattr(otro, campo) for campo in uno._campos)
+
+
+def _repr(objeto: object) -> str:
+    campos = ", ".join(f"{campo}={getattr(objeto, campo)!r}" for campo in objeto._campos)
+    return f"{type(objeto).__name__}({campos})"
+
+
+class Mostrar:
+    """Evento de salida: texto que la interfaz debe presentar.
+
+    Con ``ajustar`` el texto se envuelve al ancho de quien lo presenta, así
+    cada interfaz decide sus columnas y los párrafos repetidos se sirven
+    desde la caché de ``envolver``.
+    """
+
+    __slots__ = _campos = ("texto", "ajustar", "sangria")
+
+    def __init__(self, texto: str, ajustar: bool = False, sangria: str = "") -> None:
+        self.texto = texto
+        self.ajustar = ajustar
+        self.sangria = sangria
+
+    __eq__ = _igual
+    __repr__ = _repr
+
+
+class Solicitar:
+    """Evento de entrada: el juego espera una respuesta del jugador.
+
+    ``clave`` identifica el tipo de pregunta y ``opciones`` enumera las
+    respuestas válidas cuando son cerradas (vacío para texto libre).
+    """
+
+    __slots__ = _campos = ("mensaje", "clave", "opciones")
+
+    def __init__(self, mensaje: str, clave: str, opciones: tuple[str, ...] = ()) -> None:
+        self.mensaje = mensaje
+        self.clave = clave
+        self.opciones = opciones
+
+    __eq__ = _igual
+    __repr__ = _repr
+
+
+T = TypeVar("T")
+
+# Cada paso del juego es un generador que emite eventos ``Mostrar`` o
+# ``Solicitar`` y recibe, con ``send``, la respuesta a cada solicitud.
+Flujo = Generator[Union[Mostrar, Solicitar], Optional[str], T]
+
+
+# Bitácora opcional de eventos del juego (ver ``senderos_bitacora.activar``).
+BITACORA = None
+
+
+def anotar(tipo: str, jugador: Jugador, **datos: Any) -> None:
+    """Registra un evento en la bitácora, si hay una activa."""
+    if BITACORA is not None:
+        BITACORA.anotar(tipo, jugador, datos)
+
+
+# Tablero opcional de gemas de todos los jugadores (ver ``senderos_tablero.activar``).
+TABLERO = None
+
+
+# Pozo de virtudes de los equipos cooperativos (ver ``senderos_equipos.activar``).
+POZO_EQUIPOS = None
+
+
+# Cofre con los archivos de los recuerdos (ver ``senderos_recuerdos.activar``).
+RECUERDOS = None
+
+
+# Libro con los asientos de cada recompensa (ver ``senderos_libro.activar``).
+LIBRO = None
 
-def envolver(texto: str) -> str:
-    """Devuelve el texto formateado en párrafos legibles para la consola."""
-    return "\n".join(fill(line.strip(), width=78) if line.strip() else ""
+
+def operacion_libro() -> AbstractContextManager:
+    """Agrupa los asientos de una recompensa para que se confirmen juntos."""
+    return LIBRO.operacion() if LIBRO is not None else nullcontext()
+
+
+# Medidor opcional de los pasos del juego (ver ``senderos_metricas.activar``).
+# Con ``None`` los pasos instrumentados devuelven su flujo sin envolverlo.
+MEDIDOR = None
+
+
+def instrumentado(paso: Callable[..., Flujo[T]]) -> Callable[..., Flujo[T]]:
+    """Permite medir un paso del juego cuyo primer argumento es el jugador."""
+    nombre = paso.__name__
+
+    @wraps(paso)
+    def envoltura(jugador: Jugador, *args: Any) -> Flujo[T]:
+        flujo = paso(jugador, *args)
+        if MEDIDOR is None:
+            return flujo
+        return MEDIDOR.medir(nombre, jugador, flujo)
+
+    return envoltura
+
+
+@lru_cache(maxsize=TAMANO_CACHE_TEXTO)
+def envolver(texto: str, ancho: int = ANCHO_TEXTO) -> str:
+    """Devuelve el texto formateado en párrafos legibles para la consola.
+
+    Los resultados se guardan en una caché LRU por ``(texto, ancho)``: las
+    narrativas de cada capítulo se repiten para todos los jugadores.
+    """
+    from textwrap import fill
+
+    return "\n".join(fill(line.strip(), width=ancho) if line.strip() else ""
                      for line in texto.splitlines())
 
 
-@dataclass
+def ancho_terminal() -> int:
+    """Columnas útiles de la terminal actual, dentro de límites legibles."""
+    # Igual que ``shutil.get_terminal_size``, sin importar ``shutil`` al arrancar.
+    try:
+        columnas = int(os.environ["COLUMNS"])
+    except (KeyError, ValueError):
+        try:
+            columnas = os.get_terminal_size(sys.__stdout__.fileno()).columns
+        except (AttributeError, ValueError, OSError):
+            columnas = 0
+    columnas = columnas or ANCHO_TEXTO + 2
+    return max(ANCHO_MINIMO, min(columnas - 2, ANCHO_MAXIMO))
+
+
+def prerenderizar(capitulos: Iterable[Capitulo], ancho: int = ANCHO_TEXTO) -> None:
+    """Llena la caché de ``envolver`` con los textos de los capítulos."""
+    for capitulo in capitulos:
+        for relato in capitulo.narrativa.values():
+            envolver(relato, ancho)
+        envolver(capitulo.pregunta, ancho)
+        envolver(capitulo.reflexion, ancho)
+        if capitulo.recompensa.recuerdo:
+            envolver(capitulo.recompensa.recuerdo, ancho)
+
+
 class Recompensa:
-    gemas: int = 0
-    virtud: str | None = None
-    recuerdo: str | None = None
+    __slots__ = _campos = ("gemas", "virtud", "recuerdo")
+
+    def __init__(self, gemas: int = 0, virtud: str | None = None,
+                 recuerdo: str | None = None) -> None:
+        self.gemas = gemas
+        self.virtud = virtud
+        self.recuerdo = recuerdo
+
+    __eq__ = _igual
+    __repr__ = _repr
+
+
+# Tabla de textos base: cada texto distinto de los capítulos se guarda una
+# sola vez y los capítulos lo referencian por su número de mensaje.
+_TEXTOS: list[str] = []
+_IDS_TEXTO: dict[str, int] = {}
+SIN_TEXTO = 0xFFFFFFFF
+
+
+def id_texto(texto: str | None) -> int:
+    if texto is None:
+        return SIN_TEXTO
+    identificador = _IDS_TEXTO.get(texto)
+    if identificador is None:
+        identificador = _IDS_TEXTO[texto] = len(_TEXTOS)
+        _TEXTOS.append(texto)
+    return identificador
+
+
+def texto_base(identificador: int) -> str:
+    return _TEXTOS[identificador]
+
+
+def traduccion(identificador: int, idioma: str) -> str | None:
+    """Texto de un mensaje en ``idioma``, o ``None`` si no está traducido."""
+    if idioma == IDIOMA_BASE:
+        return _TEXTOS[identificador]
+    from senderos_idiomas import traducir
+
+    return traducir(idioma, _TEXTOS[identificador])
+
+
+# Posición de cada texto en ``Capitulo.mensajes``; les siguen las narrativas
+# (en el orden de ``MODOS_NARRATIVA``) y luego las opciones.
+_CAMPOS = ("titulo", "pregunta", "pista", "explicacion", "obstaculo", "reflexion", "recuerdo")
+_POSICION_CAMPO = {campo: posicion for posicion, campo in enumerate(_CAMPOS)}
+_NARRATIVA = len(_CAMPOS)
+_OPCIONES = _NARRATIVA + len(MODOS_NARRATIVA)
+_CONJUNTO_MODOS = frozenset(MODOS_NARRATIVA)
 
 
-@dataclass
 class Capitulo:
-    titulo: str
-    narrativa: dict[str, str]
-    pregunta: str
-    opciones: list[str]
-    respuesta: str
-    pista: str
-    explicacion: str
-    obstaculo: str
-    reflexion: str
-    recompensa: Recompensa
-
-
-@dataclass
+    """Capítulo de un camino; sus textos son números de mensaje.
+
+    Las propiedades (``titulo``, ``narrativa``, ``opciones``...) devuelven
+    los textos en ``IDIOMA_BASE``; ``texto``, ``relato`` y ``opciones_en``
+    los buscan en otro idioma. Se construye con ``crear_capitulo``.
+    """
+
+    __slots__ = _campos = ("mensajes", "respuesta", "recompensa")
+
+    def __init__(self, mensajes: array, respuesta: str, recompensa: Recompensa) -> None:
+        self.mensajes = mensajes
+        self.respuesta = respuesta
+        self.recompensa = recompensa
+
+    __eq__ = _igual
+    __repr__ = _repr
+
+    def texto(self, campo: str, idioma: str = IDIOMA_BASE) -> str | None:
+        """Un texto del capítulo en ``idioma``; sin traducción, en el idioma base."""
+        identificador = self.mensajes[_POSICION_CAMPO[campo]]
+        if identificador == SIN_TEXTO:
+            return None
+        if idioma != IDIOMA_BASE:
+            return traduccion(identificador, idioma) or _TEXTOS[identificador]
+        return _TEXTOS[identificador]
+
+    def relato(self, modo: str, idioma: str = IDIOMA_BASE) -> str:
+        """Narrativa del ``modo``; si falta, la del modo cuento.
+
+        Se prefiere no cambiar de idioma: sin traducción de ese modo se usa
+        la del modo cuento en ``idioma`` antes que el texto base.
+        """
+        cuento = self.mensajes[_NARRATIVA]
+        propio = (self.mensajes[_NARRATIVA + MODOS_NARRATIVA.index(modo)]
+                  if modo in MODOS_NARRATIVA else SIN_TEXTO)
+        candidatos = (cuento,) if propio == SIN_TEXTO else (propio, cuento)
+        if idioma != IDIOMA_BASE:
+            for identificador in candidatos:
+                texto = traduccion(identificador, idioma)
+                if texto:
+                    return texto
+        return _TEXTOS[candidatos[0]]
+
+    def opciones_en(self, idioma: str) -> list[str]:
+        if idioma == IDIOMA_BASE:
+            return self.opciones
+        return [traduccion(identificador, idioma) or _TEXTOS[identificador]
+                for identificador in self.mensajes[_OPCIONES:]]
+
+    @property
+    def titulo(self) -> str:
+        return _TEXTOS[self.mensajes[0]]
+
+    @property
+    def pregunta(self) -> str:
+        return _TEXTOS[self.mensajes[1]]
+
+    @property
+    def pista(self) -> str:
+        return _TEXTOS[self.mensajes[2]]
+
+    @property
+    def explicacion(self) -> str:
+        return _TEXTOS[self.mensajes[3]]
+
+    @property
+    def obstaculo(self) -> str:
+        return _TEXTOS[self.mensajes[4]]
+
+    @property
+    def reflexion(self) -> str:
+        return _TEXTOS[self.mensajes[5]]
+
+    @property
+    def narrativa(self) -> dict[str, str]:
+        return {modo: _TEXTOS[identificador]
+                for modo, identificador in zip(MODOS_NARRATIVA, self.mensajes[_NARRATIVA:_OPCIONES])
+                if identificador != SIN_TEXTO}
+
+    @property
+    def opciones(self) -> list[str]:
+        return [_TEXTOS[identificador] for identificador in self.mensajes[_OPCIONES:]]
+
+
+def crear_capitulo(titulo: str, narrativa: Mapping[str, str], pregunta: str,
+                   opciones: Iterable[str], respuesta: str, pista: str, explicacion: str,
+                   obstaculo: str, reflexion: str, recompensa: Recompensa) -> Capitulo:
+    """Registra los textos de un capítulo en la tabla base y lo construye."""
+    if MODO_CUENTO not in narrativa or not narrativa.keys() <= _CONJUNTO_MODOS:
+        raise ValueError(f"La narrativa necesita el modo '{MODO_CUENTO}' y solo admite "
+                         f"{', '.join(MODOS_NARRATIVA)}.")
+    textos = [titulo, pregunta, pista, explicacion, obstaculo, reflexion, recompensa.recuerdo]
+    textos.extend(narrativa.get(modo) for modo in MODOS_NARRATIVA)
+    textos.extend(opciones)
+    mensajes = array("I", map(id_texto, textos))
+    return Capitulo(mensajes=mensajes, respuesta=respuesta, recompensa=recompensa)
+
+
 class Camino:
-    nombre: str
-    descripcion: str
-    capitulos: list[Capitulo]
+    __slots__ = _campos = ("nombre", "descripcion", "capitulos")
+
+    def __init__(self, nombre: str, descripcion: str, capitulos: Sequence[Capitulo]) -> None:
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.capitulos = capitulos
+
+    __eq__ = _igual
+    __repr__ = _repr
+
+
+class Virtudes(MutableMapping):
+    """Contadores de virtudes guardados en un arreglo compacto.
+
+    Cada posición corresponde a una virtud de ``VIRTUDES``; se comporta
+    como el diccionario que reemplaza, pero ocupa una fracción de memoria.
+    """
+
+    __slots__ = ("_cuentas",)
+
+    def __init__(self, valores: Mapping[str, int] | None = None) -> None:
+        if valores is None:
+            self._cuentas = array("i", _CUENTAS_BASE)
+            return
+        self._cuentas = array("i", bytes(_CUENTAS_BASE.itemsize * len(VIRTUDES)))
+        for virtud, cantidad in valores.items():
+            self[virtud] = cantidad
+
+    def __getitem__(self, virtud: str) -> int:
+        return self._cuentas[INDICE_VIRTUD[virtud]]
+
+    def __setitem__(self, virtud: str, cantidad: int) -> None:
+        self._cuentas[INDICE_VIRTUD[virtud]] = cantidad
+
+    def __delitem__(self, virtud: str) -> None:
+        raise TypeError("Las virtudes forman una tabla fija; no se pueden eliminar.")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(VIRTUDES)
+
+    def __len__(self) -> int:
+        return len(VIRTUDES)
+
+    def __repr__(self) -> str:
+        return f"Virtudes({dict(self)!r})"
+
+
+# Tabla de capítulos internados: cada par (camino, capítulo) recibe un
+# entero y los testimonios guardan solo ese número.
+_IDS_CAPITULO: dict[tuple[str, str], int] = {}
+_CAPITULOS_POR_ID: list[tuple[str, str]] = []
+
+
+def id_capitulo(camino: str, capitulo: str) -> int:
+    """Devuelve el identificador compacto de un capítulo, creándolo si falta."""
+    clave = (camino, capitulo)
+    identificador = _IDS_CAPITULO.get(clave)
+    if identificador is None:
+        identificador = _IDS_CAPITULO[clave] = len(_CAPITULOS_POR_ID)
+        _CAPITULOS_POR_ID.append((sys.intern(camino), sys.intern(capitulo)))
+    return identificador
+
+
+def nombre_capitulo(identificador: int) -> tuple[str, str]:
+    """Devuelve ``(camino, capitulo)`` para un identificador de capítulo."""
+    return _CAPITULOS_POR_ID[identificador]
+
+
+_FECHAS: dict[int, int] = {}
+
+
+def fecha_compartida(ordinal: int) -> int:
+    """Devuelve un único objeto ``int`` por día para no repetirlo en cada testimonio."""
+    return _FECHAS.setdefault(ordinal, ordinal)
+
+
+class Testimonio:
+    __slots__ = _campos = ("capitulo_id", "texto", "fecha")
+
+    def __init__(self, capitulo_id: int, texto: str, fecha: int = 0) -> None:
+        self.capitulo_id = capitulo_id
+        self.texto = texto
+        # Día en que se escribió, como ordinal de ``datetime.date`` (0 si se desconoce).
+        self.fecha = fecha
+
+    __eq__ = _igual
+    __repr__ = _repr
+
+    @property
+    def camino(self) -> str:
+        return _CAPITULOS_POR_ID[self.capitulo_id][0]
+
+    @property
+    def capitulo(self) -> str:
+        return _CAPITULOS_POR_ID[self.capitulo_id][1]
 
 
-@dataclass
 class Jugador:
-    nombre: str
-    grupo_edad: str
-    modo: str
-    gemas: int = 0
-    virtudes: dict[str, int] = field(default_factory=lambda: VIRTUDES_BASE.copy())
-    testimonios: list[dict[str, str]] = field(default_factory=list)
-
-    def ganar_gemas(self, cantidad: int) -> None:
+    __slots__ = ("nombre", "grupo_edad", "modo", "gemas", "virtudes", "testimonios",
+                 "completados", "misiones_vistas", "idioma", "equipo", "id")
+    # ``id`` no se compara: dos copias del mismo estado son el mismo jugador.
+    _campos = __slots__[:-1]
+
+    def __init__(self, nombre: str, grupo_edad: str, modo: str, gemas: int = 0,
+                 virtudes: Mapping[str, int] | None = None,
+                 testimonios: list[Testimonio] | None = None, completados: int = 0,
+                 misiones_vistas: int = 0, idioma: str = IDIOMA_BASE, equipo: str = "",
+                 id: str | None = None) -> None:
+        self.nombre = nombre
+        self.grupo_edad = grupo_edad
+        self.modo = modo
+        self.gemas = gemas
+        self.virtudes = virtudes if isinstance(virtudes, Virtudes) else Virtudes(virtudes)
+        self.testimonios = [] if testimonios is None else testimonios
+        # Mapa de bits: el bit ``id_capitulo(...)`` indica un capítulo completado.
+        self.completados = completados
+        # Mapa de bits de las misiones ya mostradas (ver ``senderos_misiones``).
+        self.misiones_vistas = misiones_vistas
+        # Idioma en que se muestran los capítulos.
+        self.idioma = idioma
+        # Equipo cooperativo; con uno, las virtudes salen del pozo del equipo.
+        self.equipo = equipo
+        # Identificador estable (el nombre puede repetirse, como "Peregrino").
+        self.id = os.urandom(8).hex() if id is None else id
+
+    __eq__ = _igual
+    __repr__ = _repr
+
+    def ganar_gemas(self, cantidad: int, motivo: str = "") -> None:
         self.gemas += cantidad
+        if TABLERO is not None:
+            TABLERO.actualizar(self)
+        if LIBRO is not None:
+            LIBRO.anotar(self, "gemas", "", cantidad, motivo)
+
+    def ganar_virtud(self, virtud: str, motivo: str = "") -> None:
+        if self.equipo and POZO_EQUIPOS is not None:
+            POZO_EQUIPOS.ganar(self.equipo, virtud)
+        else:
+            self.virtudes[virtud] = self.virtudes.get(virtud, 0) + 1
+        if MEDIDOR is not None:
+            MEDIDOR.contar_virtud(virtud, 1)
+        if LIBRO is not None:
+            LIBRO.anotar(self, "virtud", virtud, 1, motivo)
+
+    def usar_virtud(self, virtud: str, motivo: str = "") -> bool | None:
+        """Gasta una virtud; ``False`` si no queda, ``None`` si el pozo del equipo está ocupado."""
+        if self.equipo and POZO_EQUIPOS is not None:
+            usada = POZO_EQUIPOS.usar(self.equipo, virtud)
+        else:
+            disponible = self.virtudes.get(virtud, 0)
+            usada = disponible > 0
+            if usada:
+                self.virtudes[virtud] = disponible - 1
+        if usada and MEDIDOR is not None:
+            MEDIDOR.contar_virtud(virtud, -1)
+        if usada and LIBRO is not None:
+            LIBRO.anotar(self, "virtud", virtud, -1, motivo)
+        return usada
+
+    def virtudes_disponibles(self) -> Mapping[str, int]:
+        """Las virtudes que puede usar: las del pozo de su equipo o las propias."""
+        if self.equipo and POZO_EQUIPOS is not None:
+            return POZO_EQUIPOS.virtudes(self.equipo)
+        return self.virtudes
 
-    def ganar_virtud(self, virtud: str) -> None:
-        self.virtudes[virtud] = self.virtudes.get(virtud, 0) + 1
+    def registrar_testimonio(self, camino: str, capitulo: str, texto: str) -> None:
+        from datetime import date
 
-    def usar_virtud(self, virtud: str) -> bool:
-        disponible = self.virtudes.get(virtud, 0)
-        if disponible > 0:
-            self.virtudes[virtud] = disponible - 1
-            return True
-        return False
+        self.testimonios.append(Testimonio(id_capitulo(camino, capitulo), texto.strip(),
+                                           fecha_compartida(date.today().toordinal())))
 
-    def registrar_testimonio(self, camino: str, capitulo: str, texto: str) -> None:
-        self.testimonios.append({
-            "camino": camino,
-            "capitulo": capitulo,
-            "texto": texto.strip(),
-        })
+    def completar_capitulo(self, camino: str, capitulo: str) -> None:
+        self.completados |= 1 << id_capitulo(camino, capitulo)
+
+    def capitulos_completados(self) -> list[tuple[str, str]]:
+        """Devuelve ``(camino, capitulo)`` de cada capítulo completado."""
+        return [_CAPITULOS_POR_ID[identificador]
+                for identificador in range(self.completados.bit_length())
+                if self.completados >> identificador & 1]
 
 
 def crear_camino_patriarcas() -> Camino:
     capitulos = [
-        Capitulo(
+        crear_capitulo(
             titulo="El llamado de Abram",
             narrativa={
                 MODO_CUENTO: (
@@ -127,7 +588,7 @@ def crear_camino_patriarcas() -> Camino:
             recompensa=Recompensa(gemas=3, virtud="Discernimiento",
                                   recuerdo="Ilustración del viaje de Abram"),
         ),
-        Capitulo(
+        crear_capitulo(
             titulo="El sueño de Jacob",
             narrativa={
                 MODO_CUENTO: (
@@ -172,7 +633,7 @@ def crear_camino_patriarcas() -> Camino:
 
 def crear_camino_profetas() -> Camino:
     capitulos = [
-        Capitulo(
+        crear_capitulo(
             titulo="Isaías anuncia consuelo",
             narrativa={
                 MODO_CUENTO: (
@@ -206,7 +667,7 @@ def crear_camino_profetas() -> Camino:
             recompensa=Recompensa(gemas=3, virtud=None,
                                   recuerdo="Mini video: Voz de esperanza en el exilio"),
         ),
-        Capitulo(
+        crear_capitulo(
             titulo="Miqueas y la justicia",
             narrativa={
                 MODO_CUENTO: (
@@ -251,7 +712,7 @@ def crear_camino_profetas() -> Camino:
 
 def crear_camino_evangelios() -> Camino:
     capitulos = [
-        Capitulo(
+        crear_capitulo(
             titulo="El llamado de los discípulos",
             narrativa={
                 MODO_CUENTO: (
@@ -285,7 +746,7 @@ def crear_camino_evangelios() -> Camino:
             recompensa=Recompensa(gemas=3, virtud=None,
                                   recuerdo="Audio: Voces junto al mar de Galilea"),
         ),
-        Capitulo(
+        crear_capitulo(
             titulo="La multiplicación de los panes",
             narrativa={
                 MODO_CUENTO: (
@@ -329,7 +790,7 @@ def crear_camino_evangelios() -> Camino:
 
 def crear_camino_comunidad() -> Camino:
     capitulos = [
-        Capitulo(
+        crear_capitulo(
             titulo="Pentecostés y nueva comunidad",
             narrativa={
                 MODO_CUENTO: (
@@ -363,7 +824,7 @@ def crear_camino_comunidad() -> Camino:
             recompensa=Recompensa(gemas=4, virtud="Paciencia",
                                   recuerdo="Postal: Icono de Pentecostés comunitario"),
         ),
-        Capitulo(
+        crear_capitulo(
             titulo="Cartas que animan",
             narrativa={
                 MODO_CUENTO: (
@@ -405,12 +866,38 @@ def crear_camino_comunidad() -> Camino:
     )
 
 
-CAMINOS = [
-    crear_camino_patriarcas(),
-    crear_camino_profetas(),
-    crear_camino_evangelios(),
-    crear_camino_comunidad(),
-]
+class CaminosIncorporados(Sequence):
+    """Caminos del juego, construidos la primera vez que se consulta cada uno."""
+
+    def __init__(self, creadores: Sequence[Callable[[], Camino]]) -> None:
+        self._creadores = creadores
+        self._caminos: list[Camino | None] = [None] * len(creadores)
+
+    def __len__(self) -> int:
+        return len(self._creadores)
+
+    @overload
+    def __getitem__(self, indice: int) -> Camino: ...
+    @overload
+    def __getitem__(self, indice: slice) -> list[Camino]: ...
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        camino = self._caminos[indice]
+        if camino is None:
+            camino = self._caminos[indice] = self._creadores[indice]()
+        return camino
+
+
+CAMINOS = CaminosIncorporados([
+    crear_camino_patriarcas,
+    crear_camino_profetas,
+    crear_camino_evangelios,
+    crear_camino_comunidad,
+])
 
 MISIONES_COMUNIDAD = [
     "Llama o envía un mensaje para animar a alguien que necesite compañía.",
@@ -419,224 +906,607 @@ MISIONES_COMUNIDAD = [
     "Dedica 10 minutos a orar por una persona mayor o un niño de tu entorno.",
 ]
 
+# Planificador de misiones en uso; se crea con ``MISIONES_COMUNIDAD`` la
+# primera vez que se necesita (ver ``senderos_misiones``).
+PLANIFICADOR_MISIONES = None
 
-def elegir_camino(disponibles: list[Camino]) -> Camino | None:
-    print("\n=== Caminos disponibles ===")
-    for idx, camino in enumerate(disponibles, start=1):
-        print(f"{idx}. {camino.nombre} - {camino.descripcion}")
-    print("0. Volver al menú principal")
-
-    while True:
-        eleccion = input("Elige un camino: ").strip()
-        if eleccion == "0":
-            return None
-        if eleccion.isdigit():
-            indice = int(eleccion) - 1
-            if 0 <= indice < len(disponibles):
-                return disponibles[indice]
-        print("Opción no válida. Intenta nuevamente.")
 
+def planificador_misiones() -> PlanificadorMisiones:
+    global PLANIFICADOR_MISIONES
+    if PLANIFICADOR_MISIONES is None:
+        from senderos_misiones import PlanificadorMisiones
 
-def mostrar_virtudes(jugador: Jugador) -> None:
-    print("\n=== Virtudes disponibles ===")
-    for virtud, cantidad in jugador.virtudes.items():
-        print(f"- {virtud}: {cantidad}")
-    print("============================")
+        PLANIFICADOR_MISIONES = PlanificadorMisiones(MISIONES_COMUNIDAD)
+    return PLANIFICADOR_MISIONES
 
 
-def aplicar_puerta_de_sabiduria(jugador: Jugador, capitulo: Capitulo) -> bool:
-    print("\n" + capitulo.obstaculo)
-    print("Responde la siguiente pregunta para avanzar.\n")
-    print(envolver(capitulo.pregunta))
-    for opcion in capitulo.opciones:
-        print(opcion)
+def buscar_lecturas(caminos: Sequence[Camino]) -> Flujo[None]:
+    """Busca palabras o citas (``Miqueas 6:8``) en los textos de todos los caminos."""
+    from senderos_busqueda import fragmento, indice_lecturas
 
+    indice = indice_lecturas(caminos)
+    while True:
+        consulta = (yield Solicitar("\n¿Qué quieres buscar? (Enter para volver): ",
+                                    "busqueda")).strip()
+        if not consulta:
+            return
+        resultados = indice.buscar(consulta)
+        if not resultados:
+            yield Mostrar("No encontramos esa lectura. Prueba con otras palabras.")
+            continue
+        yield Mostrar(f"\n=== Lecturas sobre «{consulta}» ===")
+        for resultado in resultados:
+            camino = caminos[resultado.camino]
+            capitulo = camino.capitulos[resultado.capitulo]
+            yield Mostrar(f"- {camino.nombre}: {capitulo.titulo}")
+            texto = fragmento(capitulo, consulta)
+            if texto:
+                yield Mostrar(texto, ajustar=True, sangria="  ")
+
+
+def elegir_camino(disponibles: Sequence[Camino]) -> Flujo[Camino | None]:
+    """Lista los caminos por páginas y permite buscarlos por palabras.
+
+    Un número abre el camino con ese número en la lista actual; cualquier
+    otro texto se busca en nombres, descripciones y títulos de capítulo
+    (ver ``senderos_explorador``).
+    """
+    from senderos_explorador import indice_caminos
+
+    indice = indice_caminos(disponibles)
+    consulta = ""
+    resultados = indice.buscar(consulta)
+    inicio = 0
+    mostrar_pagina = True
+    while True:
+        if mostrar_pagina:
+            titulo = f" (búsqueda: {consulta})" if consulta else ""
+            yield Mostrar(f"\n=== Caminos disponibles{titulo} ===")
+            if not resultados:
+                yield Mostrar("Ningún camino coincide con tu búsqueda.")
+            for numero in range(inicio, min(inicio + TAMANO_PAGINA, len(resultados))):
+                posicion = resultados[numero]
+                yield Mostrar(f"{numero + 1}. {indice.nombres[posicion]} - "
+                              f"{indice.descripciones[posicion]}")
+            if len(resultados) > TAMANO_PAGINA:
+                yield Mostrar(f"(Página {inicio // TAMANO_PAGINA + 1} de "
+                              f"{-(-len(resultados) // TAMANO_PAGINA)}; Enter para ver más)")
+            yield Mostrar("0. Volver al menú principal")
+            mostrar_pagina = False
+
+        eleccion = (yield Solicitar("Elige un camino o escribe para buscar: ",
+                                    "camino")).strip()
+        if eleccion == "0":
+            return None
+        if eleccion.isdigit():
+            numero = int(eleccion) - 1
+            if 0 <= numero < len(resultados):
+                return disponibles[resultados[numero]]
+            yield Mostrar("Opción no válida. Intenta nuevamente.")
+        elif eleccion:
+            consulta = eleccion
+            resultados = indice.buscar(consulta)
+            inicio = 0
+            mostrar_pagina = True
+        elif len(resultados) > TAMANO_PAGINA:
+            inicio = inicio + TAMANO_PAGINA if inicio + TAMANO_PAGINA < len(resultados) else 0
+            mostrar_pagina = True
+
+
+def mostrar_virtudes(jugador: Jugador) -> Flujo[None]:
+    equipo = f" (equipo {jugador.equipo})" if jugador.equipo and POZO_EQUIPOS is not None else ""
+    yield Mostrar(f"\n=== Virtudes disponibles{equipo} ===")
+    for virtud, cantidad in jugador.virtudes_disponibles().items():
+        yield Mostrar(f"- {virtud}: {cantidad}")
+    yield Mostrar("============================")
+
+
+@instrumentado
+def aplicar_puerta_de_sabiduria(jugador: Jugador, capitulo: Capitulo,
+                                camino: str = "") -> Flujo[bool]:
+    idioma = jugador.idioma
+    yield Mostrar("\n" + capitulo.texto("obstaculo", idioma))
+    yield Mostrar("Responde la siguiente pregunta para avanzar.\n")
+    yield Mostrar(capitulo.texto("pregunta", idioma), ajustar=True)
+    for opcion in capitulo.opciones_en(idioma):
+        yield Mostrar(opcion)
+
+    letras = tuple(opcion[:1].upper() for opcion in capitulo.opciones)
     intentos = 0
     while True:
-        respuesta = input("Tu respuesta (letra): ").strip().upper()
+        respuesta = (yield Solicitar("Tu respuesta (letra): ", "respuesta", letras)).strip().upper()
         if not respuesta:
-            print("Ingresa una letra.")
+            yield Mostrar("Ingresa una letra.")
             continue
         intentos += 1
-        if respuesta == capitulo.respuesta.upper():
-            print("\n¡Correcto! " + capitulo.explicacion)
+        correcta = respuesta == capitulo.respuesta.upper()
+        anotar("respuesta", jugador, camino=camino, capitulo=capitulo.titulo,
+               respuesta=respuesta, correcta=correcta, intento=intentos)
+        if correcta:
+            yield Mostrar("\n¡Correcto! " + capitulo.texto("explicacion", idioma))
             return True
 
-        print("\nRespuesta incorrecta.")
+        yield Mostrar("\nRespuesta incorrecta.")
         if intentos >= 2:
-            print("Puedes usar una virtud para obtener ayuda:")
-            mostrar_virtudes(jugador)
-            decision = input("¿Deseas usar 'Discernimiento' o 'Paciencia'? (s/n): ").strip().lower()
+            yield Mostrar("Puedes usar una virtud para obtener ayuda:")
+            yield from mostrar_virtudes(jugador)
+            decision = (yield Solicitar("¿Deseas usar 'Discernimiento' o 'Paciencia'? (s/n): ",
+                                        "usar_virtud", ("s", "n"))).strip().lower()
             if decision == "s":
-                eleccion = input("Elige la virtud: ").strip().capitalize()
-                if eleccion == "Discernimiento" and jugador.usar_virtud("Discernimiento"):
-                    print("\nDiscernimiento activado. Pista:", capitulo.pista)
-                elif eleccion == "Paciencia" and jugador.usar_virtud("Paciencia"):
-                    print("\nPaciencia activada. Tómate tu tiempo para pensar otra vez.")
+                eleccion = (yield Solicitar("Elige la virtud: ", "virtud",
+                                            ("Discernimiento", "Paciencia"))).strip().capitalize()
+                usada = (eleccion in ("Discernimiento", "Paciencia")
+                         and jugador.usar_virtud(eleccion, capitulo.titulo))
+                anotar("virtud", jugador, camino=camino, capitulo=capitulo.titulo,
+                       virtud=eleccion, usada=bool(usada))
+                if usada and eleccion == "Discernimiento":
+                    yield Mostrar("\nDiscernimiento activado. Pista: "
+                                  f"{capitulo.texto('pista', idioma)}")
+                elif usada:
+                    yield Mostrar("\nPaciencia activada. Tómate tu tiempo para pensar otra vez.")
+                elif usada is None:
+                    yield Mostrar("El pozo de tu equipo está ocupado; inténtalo otra vez.")
                 else:
-                    print("No puedes usar esa virtud ahora.")
+                    yield Mostrar("No puedes usar esa virtud ahora.")
             else:
-                print("Respira hondo y vuelve a intentarlo.")
+                yield Mostrar("Respira hondo y vuelve a intentarlo.")
         else:
-            print("Intenta nuevamente. Confía, puedes lograrlo.")
+            yield Mostrar("Intenta nuevamente. Confía, puedes lograrlo.")
 
 
-def entregar_recompensas(jugador: Jugador, capitulo: Capitulo) -> None:
+@instrumentado
+def entregar_recompensas(jugador: Jugador, capitulo: Capitulo) -> Flujo[None]:
     recompensa = capitulo.recompensa
+    anotar("recompensa", jugador, capitulo=capitulo.titulo, gemas=recompensa.gemas,
+           virtud=recompensa.virtud, recuerdo=recompensa.recuerdo)
+    # Toda la recompensa se entrega antes de mostrarla, en una sola operación del libro.
+    with operacion_libro():
+        if recompensa.gemas:
+            jugador.ganar_gemas(recompensa.gemas, capitulo.titulo)
+        if recompensa.virtud:
+            jugador.ganar_virtud(recompensa.virtud, capitulo.titulo)
+        if recompensa.recuerdo and LIBRO is not None:
+            LIBRO.anotar(jugador, "recuerdo", recompensa.recuerdo, 1, capitulo.titulo)
     if recompensa.gemas:
-        jugador.ganar_gemas(recompensa.gemas)
-        print(f"\nHas ganado {recompensa.gemas} Gemas de Esperanza. "
-              f"Total actual: {jugador.gemas}.")
+        yield Mostrar(f"\nHas ganado {recompensa.gemas} Gemas de Esperanza. "
+                      f"Total actual: {jugador.gemas}.")
     if recompensa.virtud:
-        jugador.ganar_virtud(recompensa.virtud)
-        print(f"Recibiste la virtud '{recompensa.virtud}' para apoyar a otros caminos.")
+        yield Mostrar(f"Recibiste la virtud '{recompensa.virtud}' para apoyar a otros caminos.")
     if recompensa.recuerdo:
-        print("\nCofre de Recuerdos abierto:")
-        print(envolver(recompensa.recuerdo))
-
-
-def registrar_reflexion(jugador: Jugador, camino: Camino, capitulo: Capitulo) -> None:
-    print("\nÁrbol de Testimonios - Comparte algo breve.")
-    print(envolver(capitulo.reflexion))
-    reflexion = input("Escribe tu respuesta (o pulsa Enter para omitir): ").strip()
+        yield Mostrar("\nCofre de Recuerdos abierto:")
+        yield Mostrar(capitulo.texto("recuerdo", jugador.idioma), ajustar=True)
+        if RECUERDOS is not None:
+            try:
+                ruta = RECUERDOS.abrir(recompensa.recuerdo)
+            except (OSError, ValueError):  # ``ErrorRecuerdos`` es un ``ValueError``
+                # Un paquete dañado o una caché sin permisos: basta el texto.
+                ruta = None
+            if ruta is not None:
+                yield Mostrar(f"Archivo del recuerdo: {ruta}")
+
+
+@instrumentado
+def registrar_reflexion(jugador: Jugador, camino: Camino, capitulo: Capitulo) -> Flujo[None]:
+    yield Mostrar("\nÁrbol de Testimonios - Comparte algo breve.")
+    yield Mostrar(capitulo.texto("reflexion", jugador.idioma), ajustar=True)
+    reflexion = (yield Solicitar("Escribe tu respuesta (o pulsa Enter para omitir): ",
+                                 "reflexion")).strip()
     if reflexion:
         jugador.registrar_testimonio(camino.nombre, capitulo.titulo, reflexion)
-        print("Tu testimonio ha sido añadido al Árbol de Testimonios.")
+        anotar("testimonio", jugador, camino=camino.nombre, capitulo=capitulo.titulo,
+               caracteres=len(reflexion))
+        yield Mostrar("Tu testimonio ha sido añadido al Árbol de Testimonios.")
     else:
-        print("Tal vez más adelante quieras dejar un testimonio.")
+        yield Mostrar("Tal vez más adelante quieras dejar un testimonio.")
 
 
-def recorrer_camino(jugador: Jugador, camino: Camino) -> None:
-    print(f"\n*** Inicias el camino de {camino.nombre} ***")
+@instrumentado
+def recorrer_camino(jugador: Jugador, camino: Camino) -> Flujo[None]:
+    yield Mostrar(f"\n*** Inicias el camino de {camino.nombre} ***")
     for capitulo in camino.capitulos:
-        print(f"\n--- {capitulo.titulo} ---")
-        relato = capitulo.narrativa.get(jugador.modo, capitulo.narrativa[MODO_CUENTO])
-        print(envolver(relato))
+        yield Mostrar(f"\n--- {capitulo.texto('titulo', jugador.idioma)} ---")
+        yield Mostrar(capitulo.relato(jugador.modo, jugador.idioma), ajustar=True)
 
-        if not aplicar_puerta_de_sabiduria(jugador, capitulo):
+        if not (yield from aplicar_puerta_de_sabiduria(jugador, capitulo, camino.nombre)):
             # La función siempre retorna True, pero dejamos el bloque por claridad.
             break
 
-        entregar_recompensas(jugador, capitulo)
-        registrar_reflexion(jugador, camino, capitulo)
+        yield from entregar_recompensas(jugador, capitulo)
+        jugador.completar_capitulo(camino.nombre, capitulo.titulo)
+        yield from registrar_reflexion(jugador, camino, capitulo)
+
+    yield Mostrar(f"\nCamino {camino.nombre} completado. Respira y celebra lo aprendido.")
+
 
-    print(f"\nCamino {camino.nombre} completado. Respira y celebra lo aprendido.")
+def mostrar_arbol_testimonios(jugador: Jugador,
+                              arbol: ArbolTestimonios | None = None) -> Flujo[None]:
+    from datetime import date
 
+    from senderos_testimonios import ArbolTestimonios, paginar
 
-def mostrar_arbol_testimonios(jugador: Jugador) -> None:
-    print("\n=== Árbol de Testimonios Familiar ===")
+    yield Mostrar("\n=== Árbol de Testimonios Familiar ===")
     if not jugador.testimonios:
-        print("Todavía no hay testimonios. Cada capítulo ofrece la oportunidad de añadir uno.")
+        yield Mostrar("Todavía no hay testimonios. "
+                      "Cada capítulo ofrece la oportunidad de añadir uno.")
         return
-    for idx, registro in enumerate(jugador.testimonios, start=1):
-        print(f"{idx}. {registro['camino']} / {registro['capitulo']}")
-        print("   " + envolver(registro["texto"]))
-    print("=====================================")
+    arbol = arbol or ArbolTestimonios(jugador.testimonios)
+    consulta = yield Solicitar(
+        "Filtra por camino, capítulo, palabras o fecha AAAA-MM (Enter para ver todos): ", "filtro")
+    paginas = paginar(arbol.filtrar(consulta), TAMANO_PAGINA)
+    pagina = next(paginas, None)
+    if pagina is None:
+        yield Mostrar("No hay testimonios que coincidan con tu búsqueda.")
+    numero = 0
+    while pagina:
+        for registro in pagina:
+            numero += 1
+            fecha = f" ({date.fromordinal(registro.fecha):%d/%m/%Y})" if registro.fecha else ""
+            yield Mostrar(f"{numero}. {registro.camino} / {registro.capitulo}{fecha}")
+            yield Mostrar(registro.texto, ajustar=True, sangria="   ")
+        pagina = next(paginas, None)
+        if pagina:
+            seguir = yield Solicitar("Enter para ver más, 0 para volver: ", "pagina", ("", "0"))
+            if seguir.strip() == "0":
+                break
+    yield Mostrar("=====================================")
 
 
-def activar_mision_comunidad(jugador: Jugador) -> None:
-    mision = random.choice(MISIONES_COMUNIDAD)
-    print("\n=== Misión de Comunidad ===")
-    print(envolver(mision))
-    decision = input("¿Te comprometes a intentarlo hoy? (s/n): ").strip().lower()
+@instrumentado
+def activar_mision_comunidad(jugador: Jugador) -> Flujo[None]:
+    mision = planificador_misiones().elegir(jugador).texto
+    yield Mostrar("\n=== Misión de Comunidad ===")
+    yield Mostrar(mision, ajustar=True)
+    decision = (yield Solicitar("¿Te comprometes a intentarlo hoy? (s/n): ",
+                                "mision", ("s", "n"))).strip().lower()
+    anotar("mision", jugador, mision=mision, aceptada=decision == "s")
     if decision == "s":
-        jugador.ganar_gemas(2)
-        if jugador.usar_virtud("Servicio"):
-            print("\nHas usado la virtud 'Servicio' para animar a otros.")
+        with operacion_libro():
+            jugador.ganar_gemas(2, "mision")
+            usada = jugador.usar_virtud("Servicio", "mision")
+            if usada is None:
+                # El pozo del equipo está ocupado: se reintenta una vez y, si
+                # sigue ocupado, no se gasta ni se regala Servicio.
+                usada = jugador.usar_virtud("Servicio", "mision")
+            if usada is False:
+                jugador.ganar_virtud("Servicio", "mision")
+        if usada:
+            yield Mostrar("\nHas usado la virtud 'Servicio' para animar a otros.")
+        elif usada is None:
+            yield Mostrar("\nEl pozo de tu equipo está ocupado; "
+                          "usarás 'Servicio' en otra misión.")
         else:
-            print("\nAún no tenías la virtud 'Servicio', ¡recibe una por tu disposición!")
-            jugador.ganar_virtud("Servicio")
-        print("Recibes 2 Gemas de Esperanza por tu compromiso. ¡Gracias por servir!")
+            yield Mostrar("\nAún no tenías la virtud 'Servicio', "
+                          "¡recibe una por tu disposición!")
+        yield Mostrar("Recibes 2 Gemas de Esperanza por tu compromiso. ¡Gracias por servir!")
     else:
-        print("Quizá otro día. La misión seguirá esperándote.")
+        yield Mostrar("Quizá otro día. La misión seguirá esperándote.")
+
 
+def mostrar_estado(jugador: Jugador) -> Flujo[None]:
+    yield Mostrar("\n=== Estado Actual ===")
+    yield Mostrar(f"Jugador: {jugador.nombre} | Grupo: {jugador.grupo_edad} | Modo: {jugador.modo}")
+    yield Mostrar(f"Gemas de Esperanza: {jugador.gemas}")
+    if TABLERO is not None and jugador in TABLERO.general:
+        yield Mostrar(f"Posición: {TABLERO.posicion(jugador)} de {len(TABLERO)} | "
+                      f"En {jugador.grupo_edad}: {TABLERO.posicion(jugador, jugador.grupo_edad)}")
+    yield Mostrar("Virtudes del equipo:" if jugador.equipo and POZO_EQUIPOS is not None
+                  else "Virtudes:")
+    for virtud, cantidad in jugador.virtudes_disponibles().items():
+        yield Mostrar(f"  - {virtud}: {cantidad}")
+    yield Mostrar("======================")
 
-def mostrar_estado(jugador: Jugador) -> None:
-    print("\n=== Estado Actual ===")
-    print(f"Jugador: {jugador.nombre} | Grupo: {jugador.grupo_edad} | Modo: {jugador.modo}")
-    print(f"Gemas de Esperanza: {jugador.gemas}")
-    print("Virtudes:")
-    for virtud, cantidad in jugador.virtudes.items():
-        print(f"  - {virtud}: {cantidad}")
-    print("======================")
 
+GRUPOS_EDAD = ["Niño", "Adulto", "Anciano"]
 
-def solicitar_datos_jugador() -> Jugador:
-    print("Bienvenido a Senderos de Luz 🌟")
-    nombre = input("¿Cómo te llamas? ").strip() or "Peregrino"
+MODOS = [
+    (MODO_CUENTO, "Modo cuento ilustrado (lectura breve y lenguaje sencillo)."),
+    (MODO_ESTRATEGIA, "Modo estrategia ligera (más detalles y retos)."),
+    (MODO_REFLEXION, "Modo reflexión profunda (enfoque contemplativo)."),
+]
+
+
+def solicitar_datos_jugador(idioma: str = IDIOMA_BASE, equipo: str = "") -> Flujo[Jugador]:
+    yield Mostrar("Bienvenido a Senderos de Luz 🌟")
+    nombre = (yield Solicitar("¿Cómo te llamas? ", "nombre")).strip() or "Peregrino"
 
-    print("\nElige tu grupo de edad (esto ajusta el acompañamiento):")
-    grupos = ["Niño", "Adulto", "Anciano"]
-    for idx, grupo in enumerate(grupos, start=1):
-        print(f"{idx}. {grupo}")
+    yield Mostrar("\nElige tu grupo de edad (esto ajusta el acompañamiento):")
+    for idx, grupo in enumerate(GRUPOS_EDAD, start=1):
+        yield Mostrar(f"{idx}. {grupo}")
+    validas = tuple(str(idx) for idx in range(1, len(GRUPOS_EDAD) + 1))
     while True:
-        eleccion = input("Tu opción: ").strip()
+        eleccion = (yield Solicitar("Tu opción: ", "grupo", validas)).strip()
         if eleccion.isdigit():
             indice = int(eleccion) - 1
-            if 0 <= indice < len(grupos):
-                grupo_edad = grupos[indice]
+            if 0 <= indice < len(GRUPOS_EDAD):
+                grupo_edad = GRUPOS_EDAD[indice]
                 break
-        print("Selecciona una opción válida (1-3).")
+        yield Mostrar("Selecciona una opción válida (1-3).")
 
-    print("\nElige tu modo de viaje espiritual:")
-    modos = [
-        (MODO_CUENTO, "Modo cuento ilustrado (lectura breve y lenguaje sencillo)."),
-        (MODO_ESTRATEGIA, "Modo estrategia ligera (más detalles y retos)."),
-        (MODO_REFLEXION, "Modo reflexión profunda (enfoque contemplativo)."),
-    ]
-    for idx, (_, descripcion) in enumerate(modos, start=1):
-        print(f"{idx}. {descripcion}")
+    yield Mostrar("\nElige tu modo de viaje espiritual:")
+    for idx, (_, descripcion) in enumerate(MODOS, start=1):
+        yield Mostrar(f"{idx}. {descripcion}")
 
+    validas = tuple(str(idx) for idx in range(1, len(MODOS) + 1))
     while True:
-        eleccion = input("Tu opción: ").strip()
+        eleccion = (yield Solicitar("Tu opción: ", "modo", validas)).strip()
         if eleccion.isdigit():
             indice = int(eleccion) - 1
-            if 0 <= indice < len(modos):
-                modo = modos[indice][0]
+            if 0 <= indice < len(MODOS):
+                modo = MODOS[indice][0]
                 break
-        print("Selecciona una opción válida (1-3).")
-
-    print("\nRecibes un mazo inicial de virtudes y 1 Gema de Esperanza por tu valentía.")
-    jugador = Jugador(nombre=nombre, grupo_edad=grupo_edad, modo=modo)
-    jugador.ganar_gemas(1)
+        yield Mostrar("Selecciona una opción válida (1-3).")
+
+    yield Mostrar("\nRecibes un mazo inicial de virtudes y 1 Gema de Esperanza por tu valentía.")
+    jugador = Jugador(nombre=nombre, grupo_edad=grupo_edad, modo=modo, idioma=idioma,
+                      equipo=equipo)
+    if equipo:
+        yield Mostrar(f"Juegas con el equipo '{equipo}': sus virtudes son de todos.")
+    jugador.ganar_gemas(1, "bienvenida")
     return jugador
 
 
-def menu_principal(jugador: Jugador) -> None:
+def menu_principal(jugador: Jugador, caminos: Sequence[Camino] | None = None) -> Flujo[None]:
+    from senderos_testimonios import ArbolTestimonios
+
+    caminos = CAMINOS if caminos is None else caminos
+    arbol = ArbolTestimonios(jugador.testimonios)
     while True:
-        print("\n=== Menú Principal ===")
-        print("1. Recorrer un camino bíblico")
-        print("2. Ver Árbol de Testimonios")
-        print("3. Activar una Misión de Comunidad")
-        print("4. Mostrar estado actual")
-        print("5. Salir del juego")
-
-        opcion = input("Elige una opción: ").strip()
+        yield Mostrar("\n=== Menú Principal ===")
+        yield Mostrar("1. Recorrer un camino bíblico")
+        yield Mostrar("2. Ver Árbol de Testimonios")
+        yield Mostrar("3. Activar una Misión de Comunidad")
+        yield Mostrar("4. Mostrar estado actual")
+        yield Mostrar("5. Salir del juego")
+        yield Mostrar("6. Buscar en las lecturas")
+
+        opcion = (yield Solicitar("Elige una opción: ", "menu",
+                                  ("1", "2", "3", "4", "5", "6"))).strip()
         if opcion == "1":
-            camino = elegir_camino(CAMINOS)
+            camino = yield from elegir_camino(caminos)
             if camino:
-                recorrer_camino(jugador, camino)
+                yield from recorrer_camino(jugador, camino)
         elif opcion == "2":
-            mostrar_arbol_testimonios(jugador)
+            yield from mostrar_arbol_testimonios(jugador, arbol)
         elif opcion == "3":
-            activar_mision_comunidad(jugador)
+            yield from activar_mision_comunidad(jugador)
         elif opcion == "4":
-            mostrar_estado(jugador)
+            yield from mostrar_estado(jugador)
         elif opcion == "5":
-            print("\nGracias por caminar por Senderos de Luz. ¡Hasta pronto!")
+            yield Mostrar("\nGracias por caminar por Senderos de Luz. ¡Hasta pronto!")
             break
+        elif opcion == "6":
+            yield from buscar_lecturas(caminos)
         else:
-            print("Opción no reconocida. Intenta de nuevo.")
+            yield Mostrar("Opción no reconocida. Intenta de nuevo.")
+
+
+def partida(caminos: Sequence[Camino] | None = None, idioma: str = IDIOMA_BASE,
+            equipo: str = "") -> Flujo[Jugador]:
+    """Flujo completo: registro del jugador y menú principal hasta salir."""
+    jugador = yield from solicitar_datos_jugador(idioma, equipo)
+    yield from menu_principal(jugador, caminos)
+    return jugador
+
+
+class MotorSesion:
+    """Avanza un flujo de juego sin terminal.
+
+    Cada llamada devuelve los textos producidos hasta la siguiente
+    solicitud de respuesta (o hasta el final del flujo), de modo que el
+    mismo recorrido puede conducirse desde la consola, un simulador o un
+    servidor. Los textos marcados con ``ajustar`` se envuelven a ``ancho``
+    columnas; con ``ancho=None`` se entregan sin formato.
+    """
+
+    def __init__(self, flujo: Flujo[Any], ancho: int | None = ANCHO_TEXTO) -> None:
+        self._flujo = flujo
+        self.ancho = ancho
+        self.solicitud: Solicitar | None = None
+        self.terminado = False
+        self.resultado: Any = None
+
+    def iniciar(self) -> list[str]:
+        return self._avanzar(None)
+
+    def enviar(self, respuesta: str) -> list[str]:
+        if self.solicitud is None:
+            raise RuntimeError("La sesión no está esperando ninguna respuesta.")
+        return self._avanzar(respuesta)
+
+    def _avanzar(self, valor: str | None) -> list[str]:
+        salida: list[str] = []
+        try:
+            evento = self._flujo.send(valor)
+            while isinstance(evento, Mostrar):
+                if evento.ajustar and self.ancho:
+                    salida.append(evento.sangria + envolver(evento.texto, self.ancho))
+                else:
+                    salida.append(evento.sangria + evento.texto)
+                evento = self._flujo.send(None)
+        except StopIteration as fin:
+            self.solicitud = None
+            self.terminado = True
+            self.resultado = fin.value
+            return salida
+        self.solicitud = evento
+        return salida
+
+
+def jugar_en_terminal(flujo: Flujo[T], tras_respuesta: Callable[[], None] | None = None,
+                      pantalla: Pantalla | None = None) -> T:
+    """Conduce un flujo usando ``input`` y una ``Pantalla``.
+
+    Cada pantalla, con el mensaje de la solicitud, se escribe de una vez
+    (ver ``senderos_pantalla``). ``tras_respuesta`` se llama después de
+    procesar cada respuesta, por ejemplo para guardar el progreso.
+    """
+    if pantalla is None:
+        from senderos_pantalla import Pantalla
+
+        pantalla = Pantalla()
+    motor = MotorSesion(flujo, ancho_terminal())
+    salida = motor.iniciar()
+    while True:
+        if motor.terminado:
+            pantalla.dibujar(salida)
+            return motor.resultado
+        pantalla.dibujar(salida, motor.solicitud.mensaje)
+        salida = motor.enviar(input())
+        if tras_respuesta:
+            tras_respuesta()
+
+
+def leer_opciones(argumentos: Sequence[str]) -> SimpleNamespace:
+    """Opciones de la línea de órdenes.
+
+    Sin argumentos se devuelven los valores por omisión sin cargar
+    ``argparse``, que retrasaría el primer mensaje.
+    """
+    if not argumentos:
+        return SimpleNamespace(catalogo=None, progreso=None, metricas=None, bitacora=None,
+                               idioma=IDIOMA_BASE, redibujar=False, equipo=None,
+                               pozo=POZO_PREDETERMINADO, recuerdos=None, libro=None)
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Senderos de Luz en la consola.")
+    parser.add_argument("--catalogo", nargs="+", metavar="RUTA",
+                        help="archivos o carpetas JSON con caminos (ver senderos_catalogo.py)")
+    parser.add_argument("--progreso", metavar="ARCHIVO",
+                        help="guarda el progreso en ARCHIVO y lo retoma si ya existe")
+    parser.add_argument("--metricas", metavar="ARCHIVO",
+                        help="mide los pasos del juego y los exporta a ARCHIVO (Prometheus)")
+    parser.add_argument("--bitacora", metavar="ARCHIVO",
+                        help="añade los eventos del juego a ARCHIVO (JSON por línea)")
+    parser.add_argument("--idioma", default=IDIOMA_BASE, metavar="CODIGO",
+                        help="idioma de los capítulos (ver senderos_idiomas.py)")
+    parser.add_argument("--equipo", metavar="NOMBRE",
+                        help="juega en un equipo cooperativo que comparte sus virtudes")
+    parser.add_argument("--pozo", default=POZO_PREDETERMINADO, metavar="ARCHIVO",
+                        help=f"base SQLite de las virtudes de los equipos ({POZO_PREDETERMINADO})")
+    parser.add_argument("--recuerdos", metavar="PAQUETE",
+                        help="abre los archivos de los recuerdos (ver senderos_recuerdos.py)")
+    parser.add_argument("--libro", metavar="ARCHIVO",
+                        help="anota cada recompensa ganada o gastada en ARCHIVO (SQLite)")
+    parser.add_argument("--redibujar", action="store_true",
+                        help="dibuja cada pantalla desde arriba y reescribe solo lo que cambia")
+    return parser.parse_args(argumentos, namespace=SimpleNamespace())
+
+
+def comprobar_idioma(idioma: str) -> str:
+    """El idioma en que se jugará: el español si la tabla de ``idioma`` está dañada."""
+    if idioma == IDIOMA_BASE:
+        return idioma
+    from senderos_idiomas import ErrorIdioma, tabla_idioma
+    try:
+        tabla = tabla_idioma(idioma)
+    except ErrorIdioma as error:
+        print(f"No se pueden leer los textos en '{idioma}' ({error}); "
+              "los capítulos se mostrarán en español.")
+        return IDIOMA_BASE
+    if tabla is None:
+        print(f"No hay textos en '{idioma}'; los capítulos se mostrarán en español.")
+    return idioma
 
 
 def main() -> None:
-    jugador = solicitar_datos_jugador()
-    menu_principal(jugador)
+    args = leer_opciones(sys.argv[1:])
+
+    if args.metricas:
+        from senderos_metricas import activar
+        metricas = activar(args.metricas)
+        atexit.register(metricas.exportar)
+    if args.bitacora:
+        from senderos_bitacora import activar as activar_bitacora
+        atexit.register(activar_bitacora(args.bitacora).cerrar)
+
+    if args.equipo:
+        from senderos_equipos import activar as activar_equipos
+        atexit.register(activar_equipos(args.pozo).cerrar)
+
+    if args.recuerdos:
+        from senderos_recuerdos import ErrorRecuerdos, activar as activar_recuerdos
+        try:
+            activar_recuerdos(args.recuerdos)
+        except (OSError, ErrorRecuerdos) as error:
+            raise SystemExit(f"Paquete de recuerdos inválido: {error}") from None
+
+    if args.libro:
+        from senderos_libro import activar as activar_libro
+        atexit.register(activar_libro(args.libro).cerrar)
+
+    ancho = ancho_terminal()
+    caminos = None
+    if args.catalogo:
+        from senderos_catalogo import ErrorCatalogo, cargar_catalogo
+        try:
+            caminos = cargar_catalogo(args.catalogo, ancho=ancho)
+        except ErrorCatalogo as error:
+            raise SystemExit(f"Catálogo inválido: {error}") from None
+
+    args.idioma = comprobar_idioma(args.idioma)
+
+    from senderos_pantalla import Pantalla
+    pantalla = Pantalla(redibujar=args.redibujar)
+
+    # El catálogo envuelve cada capítulo al materializarlo; los caminos
+    # incorporados se envuelven tras la primera respuesta, no antes del
+    # primer mensaje.
+    preparados = caminos is not None
+
+    def preparar_textos() -> None:
+        nonlocal preparados
+        if not preparados:
+            preparados = True
+            prerenderizar((capitulo for camino in CAMINOS for capitulo in camino.capitulos),
+                          ancho)
+
+    if not args.progreso:
+        jugar_en_terminal(partida(caminos, args.idioma, args.equipo or ""), preparar_textos,
+                          pantalla)
+        return
 
+    from senderos_progreso import ErrorProgreso, RegistroProgreso
+    if os.path.exists(args.progreso):
+        try:
+            registro = RegistroProgreso.abrir(args.progreso)
+        except ErrorProgreso as error:
+            raise SystemExit(f"Progreso inválido: {error}") from None
+        if args.idioma != IDIOMA_BASE:
+            registro.jugador.idioma = args.idioma
+        else:
+            registro.jugador.idioma = comprobar_idioma(registro.jugador.idioma)
+        if args.equipo:
+            registro.jugador.equipo = args.equipo
+        print(f"Bienvenido de nuevo, {registro.jugador.nombre}. "
+              f"Llevas {registro.jugador.gemas} Gemas de Esperanza.")
+    else:
+        registro = RegistroProgreso(
+            jugar_en_terminal(solicitar_datos_jugador(args.idioma, args.equipo or ""),
+                              preparar_textos, pantalla),
+            args.progreso)
 
-if __name__ == "__main__":
+    def tras_respuesta() -> None:
+        preparar_textos()
+        registro.actualizar()
+
+    try:
+        jugar_en_terminal(menu_principal(registro.jugador, caminos), tras_respuesta, pantalla)
+    finally:
+        registro.compactar()
+
+
+def ejecutar() -> None:
+    """Punto de entrada de la consola (ver ``senderos.py``)."""
     try:
         main()
     except KeyboardInterrupt:
         print("\nJuego interrumpido. Que la paz te acompañe.")
         sys.exit(0)
+
+
+if __name__ == "__main__":
+    # Los módulos auxiliares importan ``senderos_de_luz`` por nombre: que
+    # reciban esta misma copia y compartan sus tablas en lugar de otra.
+    sys.modules.setdefault("senderos_de_luz", sys.modules[__name__])
+    ejecutar()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Simulación Monte Carlo de la economía de gemas y virtudes.
+
+Juega, con arreglos de NumPy, los caminos de millones de jugadores
+virtuales a la vez para ver cómo se reparten las gemas y las virtudes con
+las ``Recompensa`` del catálogo (las mismas que usa el juego) y cuántos
+jugadores se quedan sin Discernimiento cuando lo necesitan.
+
+Cada jugador empieza con 1 gema y el mazo ``VIRTUDES_BASE`` y recorre los
+caminos en orden. En cada Puerta de Sabiduría acierta cada intento con
+probabilidad ``acierto``; desde el segundo fallo pide ayuda con
+probabilidad ``ayuda`` y usa Discernimiento (la pista sube su acierto a
+``acierto_pista`` en ese capítulo) o, si no le queda, Paciencia. Tras
+cada camino acepta la Misión de Comunidad con probabilidad ``mision`` (2
+gemas y usa Servicio, o lo recibe si no tenía) y sigue al siguiente con
+probabilidad ``continuar``. Quien no acierta una Puerta en ``max_rondas``
+intentos la abandona y deja de jugar; el resumen cuenta cuántos fueron.
+
+Los jugadores se simulan por bloques y los resultados se guardan como
+histogramas, así que la memoria no crece con la cantidad de jugadores.
+
+Requiere NumPy (``pip install numpy``).
+
+    python3 senderos_economia.py --jugadores 1000000
+    python3 senderos_economia.py --acierto 0.3 --ayuda 0.9 --mision 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from senderos_de_luz import CAMINOS, INDICE_VIRTUD, VIRTUDES, VIRTUDES_BASE, Camino
+
+# Jugadores que se simulan juntos en cada bloque.
+BLOQUE = 1_000_000
+
+# Recompensa de la Misión de Comunidad (ver ``activar_mision_comunidad``).
+GEMAS_MISION = 2
+# Intentos fallidos a partir de los cuales se ofrece una virtud.
+FALLOS_AYUDA = 2
+
+_DISCERNIMIENTO = INDICE_VIRTUD["Discernimiento"]
+_PACIENCIA = INDICE_VIRTUD["Paciencia"]
+_SERVICIO = INDICE_VIRTUD["Servicio"]
+
+
+@dataclass(slots=True)
+class Parametros:
+    acierto: float = 0.5        # probabilidad de acertar un intento sin pista
+    acierto_pista: float = 0.9  # tras usar Discernimiento en el capítulo
+    ayuda: float = 0.7          # de pedir una virtud tras cada fallo desde el segundo
+    mision: float = 0.5         # de aceptar la misión al terminar un camino
+    continuar: float = 1.0      # de seguir con el camino siguiente
+    max_rondas: int = 100       # intentos por Puerta antes de abandonar
+
+
+def _sumar(histograma: np.ndarray, valores: np.ndarray) -> np.ndarray:
+    cuentas = np.bincount(valores, minlength=len(histograma))
+    cuentas[:len(histograma)] += histograma
+    return cuentas
+
+
+def _percentil(histograma: np.ndarray, fraccion: float) -> int:
+    acumulado = np.cumsum(histograma)
+    return int(np.searchsorted(acumulado, fraccion * acumulado[-1]))
+
+
+@dataclass(slots=True)
+class Economia:
+    """Resultados de una simulación, como histogramas (índice = cantidad)."""
+
+    jugadores: int = 0
+    gemas: np.ndarray = field(default_factory=lambda: np.zeros(1, np.int64))
+    virtudes: dict[str, np.ndarray] = field(
+        default_factory=lambda: {virtud: np.zeros(1, np.int64) for virtud in VIRTUDES})
+    # Jugadores que pidieron ayuda alguna vez sin tener Discernimiento.
+    sin_discernimiento: int = 0
+    caminos: int = 0
+    capitulos: int = 0
+    intentos: int = 0
+    misiones: int = 0
+    # Jugadores que abandonaron una Puerta tras ``max_rondas`` intentos.
+    atascados: int = 0
+
+    def agregar(self, gemas: np.ndarray, virtudes: np.ndarray, sin_discernimiento: np.ndarray,
+                caminos: int, capitulos: int, intentos: int, misiones: int,
+                atascados: int) -> None:
+        self.jugadores += len(gemas)
+        self.gemas = _sumar(self.gemas, gemas)
+        for virtud, indice in INDICE_VIRTUD.items():
+            self.virtudes[virtud] = _sumar(self.virtudes[virtud], virtudes[:, indice])
+        self.sin_discernimiento += int(sin_discernimiento.sum())
+        self.caminos += caminos
+        self.capitulos += capitulos
+        self.intentos += intentos
+        self.misiones += misiones
+        self.atascados += atascados
+
+    @staticmethod
+    def resumen(histograma: np.ndarray) -> dict[str, float]:
+        """Media, percentiles 10/50/90, máximo y fracción de jugadores con 0."""
+        total = histograma.sum()
+        return {
+            "media": float(np.arange(len(histograma)) @ histograma / total),
+            "p10": _percentil(histograma, 0.1),
+            "p50": _percentil(histograma, 0.5),
+            "p90": _percentil(histograma, 0.9),
+            "max": int(np.flatnonzero(histograma)[-1]),
+            "ceros": float(histograma[0] / total),
+        }
+
+    @property
+    def tasa_sin_discernimiento(self) -> float:
+        return self.sin_discernimiento / self.jugadores if self.jugadores else 0.0
+
+
+def _simular_bloque(jugadores: int, caminos: Sequence[Camino], parametros: Parametros,
+                    azar: np.random.Generator, economia: Economia) -> None:
+    gemas = np.ones(jugadores, np.int32)
+    virtudes = np.tile(np.array([VIRTUDES_BASE[virtud] for virtud in VIRTUDES], np.int32),
+                       (jugadores, 1))
+    sin_discernimiento = np.zeros(jugadores, bool)
+    # Índices de los jugadores que siguen jugando.
+    jugando = np.arange(jugadores)
+    recorridos = capitulos_jugados = intentos = misiones = atascados = 0
+    abandonan = np.zeros(jugadores, bool)
+
+    for camino in caminos:
+        if not jugando.size:
+            break
+        for capitulo in camino.capitulos:
+            # La Puerta de Sabiduría: se repite con quienes todavía no acertaron.
+            en_puerta = jugando
+            con_pista = np.zeros(jugadores, bool)
+            fallos = 0
+            while en_puerta.size and fallos < parametros.max_rondas:
+                intentos += en_puerta.size
+                probabilidad = np.where(con_pista[en_puerta], parametros.acierto_pista,
+                                        parametros.acierto)
+                en_puerta = en_puerta[azar.random(en_puerta.size) >= probabilidad]
+                fallos += 1
+                if fallos < FALLOS_AYUDA or not en_puerta.size:
+                    continue
+                piden = en_puerta[azar.random(en_puerta.size) < parametros.ayuda]
+                tiene = virtudes[piden, _DISCERNIMIENTO] > 0
+                usan = piden[tiene]
+                virtudes[usan, _DISCERNIMIENTO] -= 1
+                con_pista[usan] = True
+                sin = piden[~tiene]
+                sin_discernimiento[sin] = True
+                paciencia = sin[virtudes[sin, _PACIENCIA] > 0]
+                virtudes[paciencia, _PACIENCIA] -= 1
+            if en_puerta.size:
+                # Sin acertar tras ``max_rondas`` intentos: abandonan el juego.
+                atascados += en_puerta.size
+                abandonan[en_puerta] = True
+                jugando = jugando[~abandonan[jugando]]
+
+            recompensa = capitulo.recompensa
+            gemas[jugando] += recompensa.gemas
+            if recompensa.virtud:
+                virtudes[jugando, INDICE_VIRTUD[recompensa.virtud]] += 1
+            capitulos_jugados += jugando.size
+
+        recorridos += jugando.size
+        aceptan = jugando[azar.random(jugando.size) < parametros.mision]
+        misiones += aceptan.size
+        gemas[aceptan] += GEMAS_MISION
+        # Quien tenía Servicio lo usa; quien no, recibe uno.
+        virtudes[aceptan, _SERVICIO] += np.where(virtudes[aceptan, _SERVICIO] > 0, -1, 1)
+        jugando = jugando[azar.random(jugando.size) < parametros.continuar]
+
+    economia.agregar(gemas, virtudes, sin_discernimiento, recorridos, capitulos_jugados,
+                     intentos, misiones, atascados)
+
+
+def simular(jugadores: int, parametros: Parametros | None = None,
+            caminos: Sequence[Camino] | None = None, semilla: int = 0,
+            bloque: int = BLOQUE) -> Economia:
+    """Simula ``jugadores`` con los caminos del catálogo (``CAMINOS`` por omisión)."""
+    parametros = parametros or Parametros()
+    caminos = CAMINOS if caminos is None else caminos
+    economia = Economia()
+    for numero, inicio in enumerate(range(0, jugadores, bloque)):
+        # Cada bloque tiene su propio generador, reproducible con ``semilla``.
+        azar = np.random.default_rng([semilla, numero])
+        _simular_bloque(min(bloque, jugadores - inicio), caminos, parametros, azar, economia)
+    return economia
+
+
+def _linea(nombre: str, histograma: np.ndarray) -> str:
+    datos = Economia.resumen(histograma)
+    return (f"{nombre:<15} media {datos['media']:6.2f}  p10 {datos['p10']:>3}  "
+            f"p50 {datos['p50']:>3}  p90 {datos['p90']:>3}  máx {datos['max']:>3}  "
+            f"sin ninguna {datos['ceros']:6.1%}")
+
+
+def main() -> None:
+    predeterminados = Parametros()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jugadores", type=int, default=1_000_000)
+    parser.add_argument("--acierto", type=float, default=predeterminados.acierto,
+                        help="probabilidad de acertar cada intento sin pista")
+    parser.add_argument("--acierto-pista", type=float, default=predeterminados.acierto_pista,
+                        help="probabilidad de acertar después de usar Discernimiento")
+    parser.add_argument("--ayuda", type=float, default=predeterminados.ayuda,
+                        help="probabilidad de pedir una virtud desde el segundo fallo")
+    parser.add_argument("--mision", type=float, default=predeterminados.mision,
+                        help="probabilidad de aceptar la misión tras cada camino")
+    parser.add_argument("--continuar", type=float, default=predeterminados.continuar,
+                        help="probabilidad de seguir con el camino siguiente")
+    parser.add_argument("--max-rondas", type=int, default=predeterminados.max_rondas,
+                        help="intentos por Puerta de Sabiduría antes de abandonar el juego")
+    parser.add_argument("--catalogo", nargs="+", metavar="RUTA",
+                        help="usa los caminos de estos archivos JSON en vez de los incorporados")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    if not 0 < args.acierto <= 1:
+        parser.error("--acierto debe estar en (0, 1]")
+    for opcion in ("acierto_pista", "ayuda", "mision", "continuar"):
+        if not 0 <= getattr(args, opcion) <= 1:
+            parser.error(f"--{opcion.replace('_', '-')} debe estar en [0, 1]")
+    if args.max_rondas < 1:
+        parser.error("--max-rondas debe ser al menos 1")
+    if args.jugadores < 1:
+        parser.error("--jugadores debe ser al menos 1")
+
+    caminos = None
+    if args.catalogo:
+        from senderos_catalogo import ErrorCatalogo, cargar_catalogo
+        try:
+            caminos = cargar_catalogo(args.catalogo)
+        except ErrorCatalogo as error:
+            raise SystemExit(f"Catálogo inválido: {error}") from None
+    parametros = Parametros(args.acierto, args.acierto_pista, args.ayuda, args.mision,
+                            args.continuar, args.max_rondas)
+
+    inicio = time.perf_counter()
+    economia = simular(args.jugadores, parametros, caminos, args.semilla)
+    duracion = time.perf_counter() - inicio
+
+    print(f"{economia.jugadores:,} jugadores en {duracion:.2f} s "
+          f"({economia.caminos / economia.jugadores:.2f} caminos, "
+          f"{economia.intentos / max(economia.capitulos, 1):.2f} intentos por capítulo, "
+          f"{economia.misiones / economia.jugadores:.2f} misiones por jugador)")
+    print(_linea("Gemas", economia.gemas))
+    for virtud in VIRTUDES:
+        print(_linea(virtud, economia.virtudes[virtud]))
+    print(f"Pidieron ayuda sin Discernimiento: {economia.tasa_sin_discernimiento:.1%} "
+          "de los jugadores")
+    print(f"Abandonaron una Puerta tras {parametros.max_rondas} intentos: "
+          f"{economia.atascados / economia.jugadores:.1%} de los jugadores")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Pozo de virtudes compartido por los equipos del modo cooperativo.
+
+Un ``Jugador`` con ``equipo`` no usa sus propias virtudes: ``usar_virtud``
+y ``ganar_virtud`` gastan y aportan al pozo de su equipo, guardado en una
+base SQLite local (en modo WAL) que pueden compartir varios procesos del
+mismo equipo, por ejemplo las computadoras de un salón o un servidor
+(ver ``senderos_servidor.py servir --equipo``).
+
+* Gastar es un único ``UPDATE ... WHERE cantidad > 0`` en su propia
+  transacción: dos jugadores que gastan la última virtud a la vez no
+  pueden obtenerla los dos.
+* Las virtudes ganadas se acumulan en memoria y se escriben juntas en una
+  transacción corta al llegar a ``lote`` o, como mucho, ``intervalo``
+  segundos después; ninguna suma se pierde. El bloqueo de escritura solo
+  se toma durante esa escritura, nunca mientras se espera a completar el
+  lote, y los demás procesos leen sin esperar. Un corte de luz puede
+  perder, a lo sumo, las virtudes ganadas y aún no escritas.
+* Si otro proceso retiene el pozo más de ``ESPERA_BLOQUEO`` milisegundos,
+  gastar devuelve ``None`` (la virtud no se gasta; ``False`` es que no
+  quedaba) y las ganadas esperan a la siguiente escritura: el juego nunca
+  se detiene por el pozo.
+
+Cada equipo empieza con el mazo ``VIRTUDES_BASE``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+import senderos_de_luz
+from senderos_de_luz import VIRTUDES, VIRTUDES_BASE
+
+# Virtudes ganadas que se escriben juntas y espera máxima antes de escribirlas.
+LOTE = 64
+INTERVALO = 0.05
+# Milisegundos que se espera a que otro proceso termine de escribir.
+ESPERA_BLOQUEO = 250
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pozo (
+    equipo TEXT NOT NULL,
+    virtud TEXT NOT NULL,
+    cantidad INTEGER NOT NULL CHECK (cantidad >= 0),
+    PRIMARY KEY (equipo, virtud)
+) WITHOUT ROWID
+"""
+
+
+class PozoVirtudes:
+    """Virtudes de todos los equipos en una base SQLite."""
+
+    def __init__(self, ruta: str | Path, lote: int = LOTE, intervalo: float = INTERVALO) -> None:
+        self.ruta = Path(ruta)
+        self.lote = lote
+        self.intervalo = intervalo
+        # Las escrituras diferidas se hacen desde un temporizador: la conexión
+        # se comparte entre hilos, siempre bajo ``_cerrojo``. Las ganancias
+        # pendientes tienen su propio cerrojo, para que ganar una virtud no
+        # espere nunca a la base; ``vaciar`` las retira bajo los dos, así que
+        # quien lee la base nunca ve una escritura a medias.
+        self._conexion = sqlite3.connect(self.ruta, isolation_level=None,
+                                         check_same_thread=False,
+                                         timeout=ESPERA_BLOQUEO / 1000)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute(_ESQUEMA)
+        self._cerrojo = threading.Lock()
+        self._cerrojo_pendientes = threading.Lock()
+        # (equipo, virtud) → virtudes ganadas aún no escritas.
+        self._pendientes: dict[tuple[str, str], int] = {}
+        self._operaciones = 0
+        self._temporizador: threading.Timer | None = None
+        self._equipos: set[str] = set()
+        # Últimas cantidades leídas de cada equipo, por si la base está ocupada.
+        self._ultimas: dict[str, dict[str, int]] = {}
+        self.confirmaciones = 0
+
+    def _mazo(self, equipos: set[str]) -> list[tuple[str, str, int]]:
+        return [(equipo, virtud, cantidad) for equipo in equipos
+                for virtud, cantidad in VIRTUDES_BASE.items()]
+
+    def crear_equipo(self, equipo: str) -> None:
+        """Da al equipo el mazo inicial si todavía no existe."""
+        if equipo in self._equipos:
+            return
+        with self._cerrojo:
+            self._conexion.execute("BEGIN IMMEDIATE")
+            try:
+                self._conexion.executemany("INSERT OR IGNORE INTO pozo VALUES (?, ?, ?)",
+                                           self._mazo({equipo}))
+            except BaseException:
+                self._conexion.execute("ROLLBACK")
+                raise
+            self._conexion.execute("COMMIT")
+        self._equipos.add(equipo)
+
+    def ganar(self, equipo: str, virtud: str, cantidad: int = 1) -> None:
+        with self._cerrojo_pendientes:
+            clave = (equipo, virtud)
+            self._pendientes[clave] = self._pendientes.get(clave, 0) + cantidad
+            self._operaciones += 1
+            if self._temporizador is None:
+                self._temporizador = threading.Timer(self.intervalo, self._vaciar_diferido)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+            lleno = self._operaciones >= self.lote
+        if lleno:
+            self._vaciar_diferido()
+
+    def usar(self, equipo: str, virtud: str) -> bool | None:
+        """Gasta una virtud del equipo: ``False`` si no queda, ``None`` si el pozo está ocupado."""
+        with self._cerrojo_pendientes:
+            # Una virtud ganada y aún no escrita se gasta sin tocar la base.
+            clave = (equipo, virtud)
+            if self._pendientes.get(clave, 0) > 0:
+                self._pendientes[clave] -= 1
+                return True
+        try:
+            self.crear_equipo(equipo)
+            with self._cerrojo:
+                return self._conexion.execute(
+                    "UPDATE pozo SET cantidad = cantidad - 1 "
+                    "WHERE equipo = ? AND virtud = ? AND cantidad > 0",
+                    (equipo, virtud)).rowcount == 1
+        except sqlite3.OperationalError:
+            return None
+
+    def virtudes(self, equipo: str) -> dict[str, int]:
+        """Cantidad de cada virtud del equipo, en el orden de ``VIRTUDES``."""
+        try:
+            self.crear_equipo(equipo)
+            with self._cerrojo:
+                filas = dict(self._conexion.execute(
+                    "SELECT virtud, cantidad FROM pozo WHERE equipo = ?", (equipo,)))
+            self._ultimas[equipo] = filas
+        except sqlite3.OperationalError:
+            filas = self._ultimas.get(equipo, VIRTUDES_BASE)
+        with self._cerrojo_pendientes:
+            return {virtud: filas.get(virtud, 0) + self._pendientes.get((equipo, virtud), 0)
+                    for virtud in VIRTUDES}
+
+    def vaciar(self) -> None:
+        """Escribe las virtudes ganadas pendientes en una transacción corta."""
+        with self._cerrojo:
+            with self._cerrojo_pendientes:
+                pendientes = {clave: cantidad for clave, cantidad in self._pendientes.items()
+                              if cantidad}
+                self._pendientes = {}
+                self._operaciones = 0
+                if self._temporizador is not None:
+                    self._temporizador.cancel()
+                    self._temporizador = None
+            if not pendientes:
+                return
+            equipos = {equipo for equipo, _ in pendientes}
+            try:
+                self._conexion.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conexion.executemany("INSERT OR IGNORE INTO pozo VALUES (?, ?, ?)",
+                                               self._mazo(equipos - self._equipos))
+                    self._conexion.executemany(
+                        "INSERT INTO pozo VALUES (?, ?, ?) ON CONFLICT (equipo, virtud) "
+                        "DO UPDATE SET cantidad = cantidad + excluded.cantidad",
+                        [(equipo, virtud, cantidad)
+                         for (equipo, virtud), cantidad in pendientes.items()])
+                except BaseException:
+                    self._conexion.execute("ROLLBACK")
+                    raise
+                self._conexion.execute("COMMIT")
+            except BaseException:
+                # Se devuelven a la cola para la siguiente escritura.
+                with self._cerrojo_pendientes:
+                    for clave, cantidad in pendientes.items():
+                        self._pendientes[clave] = self._pendientes.get(clave, 0) + cantidad
+                raise
+        self._equipos |= equipos
+        self.confirmaciones += 1
+
+    def _vaciar_diferido(self) -> None:
+        try:
+            self.vaciar()
+        except sqlite3.OperationalError:
+            # Otro proceso retiene el pozo: se reintenta pasado ``intervalo``.
+            with self._cerrojo_pendientes:
+                if self._temporizador is None and self._pendientes:
+                    self._temporizador = threading.Timer(self.intervalo,
+                                                         self._vaciar_diferido)
+                    self._temporizador.daemon = True
+                    self._temporizador.start()
+
+    def cerrar(self) -> None:
+        self.vaciar()
+        self._conexion.close()
+
+
+def activar(ruta: str | Path, lote: int = LOTE, intervalo: float = INTERVALO) -> PozoVirtudes:
+    """Abre el pozo de ``ruta`` y hace que los equipos lo usen."""
+    pozo = PozoVirtudes(ruta, lote, intervalo)
+    senderos_de_luz.POZO_EQUIPOS = pozo
+    return pozo
+
+
+def desactivar() -> None:
+    if senderos_de_luz.POZO_EQUIPOS is not None:
+        senderos_de_luz.POZO_EQUIPOS.cerrar()
+    senderos_de_luz.POZO_EQUIPOS = None
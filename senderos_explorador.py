@@ -0,0 +1,95 @@
+"""Índice de búsqueda para elegir un camino en catálogos grandes.
+
+``IndiceCaminos`` guarda un índice invertido de las palabras (sin tildes ni
+mayúsculas) del nombre, la descripción y los títulos de capítulo de cada
+camino. El vocabulario está ordenado, así que buscar por prefijo es una
+búsqueda binaria seguida de un recorrido por las palabras que comparten
+ese prefijo; cada término de la consulta debe coincidir (``"pro esp"``
+encuentra caminos con alguna palabra que empiece por "pro" y otra por
+"esp").
+
+Los catálogos compilados entregan nombre, descripción y títulos desde su
+índice (``Catalogo.resumenes``), sin leer los capítulos.
+"""
+
+from __future__ import annotations
+
+import weakref
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from contextlib import suppress
+
+from senderos_testimonios import normalizar, tokenizar
+
+# Un camino se resume como (nombre, descripción, títulos de sus capítulos).
+Resumen = tuple[str, str, Sequence[str]]
+
+# Índices ya construidos por catálogo; se liberan junto con el catálogo.
+_INDICES: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def resumenes(caminos: Sequence) -> list[Resumen]:
+    if hasattr(caminos, "resumenes"):
+        return caminos.resumenes()
+    return [(camino.nombre, camino.descripcion,
+             [capitulo.titulo for capitulo in camino.capitulos]) for camino in caminos]
+
+
+class IndiceCaminos:
+    def __init__(self, caminos: Sequence) -> None:
+        self.nombres: list[str] = []
+        self.descripciones: list[str] = []
+        apariciones: dict[str, array] = {}
+        for posicion, (nombre, descripcion, titulos) in enumerate(resumenes(caminos)):
+            self.nombres.append(nombre)
+            self.descripciones.append(descripcion)
+            palabras = set(tokenizar(nombre))
+            palabras.update(tokenizar(descripcion))
+            for titulo in titulos:
+                palabras.update(tokenizar(titulo))
+            for palabra in palabras:
+                apariciones.setdefault(palabra, array("I")).append(posicion)
+        self._palabras = sorted(apariciones)
+        self._caminos = [apariciones[palabra] for palabra in self._palabras]
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    def _con_prefijo(self, prefijo: str) -> set[int]:
+        encontrados: set[int] = set()
+        inicio = bisect_left(self._palabras, prefijo)
+        for indice in range(inicio, len(self._palabras)):
+            if not self._palabras[indice].startswith(prefijo):
+                break
+            encontrados.update(self._caminos[indice])
+        return encontrados
+
+    def buscar(self, consulta: str) -> Sequence[int]:
+        """Posiciones, en el orden del catálogo, de los caminos que coinciden.
+
+        Una consulta vacía devuelve todos los caminos.
+        """
+        terminos = sorted(set(tokenizar(consulta)), key=len, reverse=True)
+        if not terminos:
+            if normalizar(consulta).strip():
+                return []
+            return range(len(self.nombres))
+        # Los términos largos suelen ser los más selectivos: se intersectan primero.
+        encontrados = self._con_prefijo(terminos[0])
+        for termino in terminos[1:]:
+            if not encontrados:
+                break
+            encontrados &= self._con_prefijo(termino)
+        return sorted(encontrados)
+
+
+def indice_caminos(caminos: Sequence) -> IndiceCaminos:
+    """Índice de ``caminos``, construido una sola vez por catálogo."""
+    with suppress(KeyError, TypeError):
+        return _INDICES[caminos]
+    indice = IndiceCaminos(caminos)
+    # Las listas no admiten referencias débiles: su índice no se conserva.
+    with suppress(TypeError):
+        _INDICES[caminos] = indice
+    return indice
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Exporta el Árbol de Testimonios a HTML, Markdown o CSV.
+
+Los testimonios pasan por una cadena de generadores (testimonios → filas
+→ trozos de texto → archivo), así que exportar un árbol comunitario de un
+millón de entradas ocupa la misma memoria que uno de diez. Pueden venir de
+un ``Jugador`` o directamente de un archivo de progreso
+(``senderos_progreso.leer_testimonios``), sin cargarlo completo.
+
+Con ``ancho``, cada texto se envuelve con ``envolver`` antes de escribirlo
+(en CSV, dentro de la celda). Los caminos aparecen como encabezados cada
+vez que cambian, sin reordenar las entradas.
+
+    python3 senderos_exportar.py partida.sav arbol.html
+    python3 senderos_exportar.py partida.sav arbol.md --ancho 72
+    python3 senderos_exportar.py partida.sav arbol.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+from collections.abc import Iterable, Iterator
+from datetime import date
+from html import escape
+from pathlib import Path
+from typing import NamedTuple, TextIO
+
+from senderos_de_luz import Testimonio, envolver
+
+# Filas que el CSV acumula antes de entregar un trozo de texto.
+FILAS_POR_TROZO = 512
+# Caracteres que se acumulan antes de escribir al archivo.
+TAMANO_ESCRITURA = 256 * 1024
+
+TITULO = "Árbol de Testimonios"
+
+
+class Fila(NamedTuple):
+    numero: int
+    camino: str
+    capitulo: str
+    fecha: str
+    texto: str
+
+
+def filas(testimonios: Iterable[Testimonio], ancho: int | None = None) -> Iterator[Fila]:
+    """Numera los testimonios y les da fecha ISO (vacía si se desconoce)."""
+    for numero, registro in enumerate(testimonios, start=1):
+        fecha = date.fromordinal(registro.fecha).isoformat() if registro.fecha else ""
+        texto = envolver(registro.texto, ancho) if ancho else registro.texto
+        yield Fila(numero, registro.camino, registro.capitulo, fecha, texto)
+
+
+def a_csv(entradas: Iterable[Fila]) -> Iterator[str]:
+    memoria = io.StringIO()
+    escritor = csv.writer(memoria)
+    escritor.writerow(Fila._fields)
+    for fila in entradas:
+        escritor.writerow(fila)
+        if fila.numero % FILAS_POR_TROZO == 0:
+            yield memoria.getvalue()
+            memoria.seek(0)
+            memoria.truncate()
+    yield memoria.getvalue()
+
+
+def a_markdown(entradas: Iterable[Fila], titulo: str = TITULO) -> Iterator[str]:
+    yield f"# {titulo}\n"
+    camino = None
+    for fila in entradas:
+        if fila.camino != camino:
+            camino = fila.camino
+            yield f"\n## {camino}\n"
+        fecha = f" ({fila.fecha})" if fila.fecha else ""
+        # Cada línea del texto va citada, para que los saltos del envoltorio se respeten.
+        cita = "\n".join(f"> {linea}" if linea else ">" for linea in fila.texto.split("\n"))
+        yield f"\n**{fila.numero}. {fila.capitulo}**{fecha}\n\n{cita}\n"
+
+
+def a_html(entradas: Iterable[Fila], titulo: str = TITULO) -> Iterator[str]:
+    yield (f'<!DOCTYPE html>\n<html lang="es">\n<head>\n<meta charset="utf-8">\n'
+           f"<title>{escape(titulo)}</title>\n"
+           "<style>body{font-family:serif;max-width:42em;margin:auto;padding:1em}"
+           "blockquote{white-space:pre-wrap;margin:.3em 0 1em 1.5em}</style>\n"
+           f"</head>\n<body>\n<h1>{escape(titulo)}</h1>\n")
+    camino = None
+    for fila in entradas:
+        if fila.camino != camino:
+            if camino is not None:
+                yield "</section>\n"
+            camino = fila.camino
+            yield f"<section>\n<h2>{escape(camino)}</h2>\n"
+        fecha = f' <time datetime="{fila.fecha}">{fila.fecha}</time>' if fila.fecha else ""
+        yield (f"<h3>{fila.numero}. {escape(fila.capitulo)}{fecha}</h3>\n"
+               f"<blockquote>{escape(fila.texto)}</blockquote>\n")
+    if camino is not None:
+        yield "</section>\n"
+    yield "</body>\n</html>\n"
+
+
+FORMATOS = {"csv": a_csv, "md": a_markdown, "html": a_html}
+
+
+def escribir(trozos: Iterable[str], destino: TextIO, tamano: int = TAMANO_ESCRITURA) -> int:
+    """Escribe los trozos agrupados en bloques de ``tamano``; devuelve los caracteres."""
+    pendientes: list[str] = []
+    acumulado = total = 0
+    for trozo in trozos:
+        pendientes.append(trozo)
+        acumulado += len(trozo)
+        if acumulado >= tamano:
+            destino.write("".join(pendientes))
+            total += acumulado
+            pendientes.clear()
+            acumulado = 0
+    destino.write("".join(pendientes))
+    return total + acumulado
+
+
+def exportar(testimonios: Iterable[Testimonio], ruta: str | Path, formato: str | None = None,
+             ancho: int | None = None) -> int:
+    """Exporta los testimonios a ``ruta``; el formato sale de la extensión si no se indica."""
+    ruta = Path(ruta)
+    formato = formato or ruta.suffix.lstrip(".").lower()
+    if formato == "markdown":
+        formato = "md"
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido '{formato}' (usa csv, md o html).")
+    # ``newline=""`` deja al módulo csv elegir los finales de línea.
+    with open(ruta, "w", encoding="utf-8", newline="" if formato == "csv" else None) as archivo:
+        return escribir(FORMATOS[formato](filas(testimonios, ancho)), archivo)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("progreso", help="archivo de progreso (ver --progreso del juego)")
+    parser.add_argument("destino", help="archivo .html, .md o .csv")
+    parser.add_argument("--formato", choices=sorted(FORMATOS))
+    parser.add_argument("--ancho", type=int, help="envuelve los textos a este ancho")
+    args = parser.parse_args()
+
+    from senderos_progreso import leer_testimonios
+
+    caracteres = exportar(leer_testimonios(args.progreso), args.destino, args.formato, args.ancho)
+    print(f"Árbol exportado a {args.destino} ({caracteres} caracteres).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Tablas de textos traducidos de los capítulos.
+
+Los capítulos guardan números de mensaje que apuntan a la tabla de textos
+base (en ``IDIOMA_BASE``). Cada idioma adicional es un único archivo
+``<codigo>.sdli`` en ``DIRECTORIO_IDIOMAS`` que se abre con ``mmap`` la
+primera vez que un jugador lo usa; la memoria crece en una tabla por
+idioma y no en un diccionario por capítulo.
+
+Las traducciones se indexan por una clave de 64 bits del texto base, así
+una tabla sirve para el catálogo incluido y para catálogos externos; si un
+texto cambia, su traducción deja de encontrarse y se muestra el original.
+
+Formato del archivo: cabecera ``<4sHI`` (mágico, versión, cantidad), las
+claves ``uint64`` ordenadas, ``cantidad + 1`` desplazamientos ``uint32`` y
+los textos en UTF-8 uno tras otro.
+
+    python3 senderos_idiomas.py plantilla en.json                  # textos por traducir
+    python3 senderos_idiomas.py compilar en.json                   # escribe idiomas/en.sdli
+    python3 senderos.py --idioma en
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from senderos_de_luz import CAMINOS, SIN_TEXTO, Camino, texto_base
+
+VERSION_IDIOMA = 1
+_MAGICO = b"SDLI"
+_CABECERA = struct.Struct("<4sHI")  # mágico, versión, cantidad de textos
+
+DIRECTORIO_IDIOMAS = Path(__file__).resolve().parent / "idiomas"
+
+
+class ErrorIdioma(ValueError):
+    """El archivo no contiene una tabla de idioma válida."""
+
+
+def clave_texto(texto: str) -> int:
+    """Clave estable (entre ejecuciones) de un texto base."""
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(),
+                          "little")
+
+
+class TablaIdioma:
+    """Tabla de traducciones de un idioma, leída del disco bajo demanda."""
+
+    def __init__(self, ruta: str | Path) -> None:
+        self.ruta = Path(ruta)
+        with open(self.ruta, "rb") as archivo:
+            try:
+                self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:  # archivo vacío
+                raise ErrorIdioma(f"{ruta}: archivo vacío.") from error
+        if len(self._mapa) < _CABECERA.size:
+            raise ErrorIdioma(f"{ruta}: archivo incompleto.")
+        magico, version, cantidad = _CABECERA.unpack_from(self._mapa)
+        if magico != _MAGICO or version != VERSION_IDIOMA:
+            raise ErrorIdioma(f"{ruta}: tabla de idioma incompatible.")
+        inicio_claves = _CABECERA.size
+        inicio_desplazamientos = inicio_claves + 8 * cantidad
+        self._inicio_textos = inicio_desplazamientos + 4 * (cantidad + 1)
+        if len(self._mapa) < self._inicio_textos:
+            raise ErrorIdioma(f"{ruta}: archivo incompleto.")
+        vista = memoryview(self._mapa)
+        self._claves = vista[inicio_claves:inicio_desplazamientos].cast("Q")
+        self._desplazamientos = vista[inicio_desplazamientos:self._inicio_textos].cast("I")
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def buscar(self, clave: int) -> str | None:
+        posicion = bisect_left(self._claves, clave)
+        if posicion == len(self._claves) or self._claves[posicion] != clave:
+            return None
+        inicio = self._inicio_textos + self._desplazamientos[posicion]
+        fin = self._inicio_textos + self._desplazamientos[posicion + 1]
+        return self._mapa[inicio:fin].decode("utf-8")
+
+
+_TABLAS: dict[str, TablaIdioma | None] = {}
+
+
+def tabla_idioma(idioma: str, directorio: Path | None = None) -> TablaIdioma | None:
+    """Tabla de ``idioma`` (se abre una sola vez), o ``None`` si no existe."""
+    if idioma not in _TABLAS:
+        ruta = (directorio or DIRECTORIO_IDIOMAS) / f"{idioma}.sdli"
+        _TABLAS[idioma] = TablaIdioma(ruta) if ruta.exists() else None
+    return _TABLAS[idioma]
+
+
+def traducir(idioma: str, texto: str) -> str | None:
+    """Traducción de un texto base a ``idioma``, o ``None`` si no la hay."""
+    tabla = tabla_idioma(idioma)
+    return None if tabla is None else tabla.buscar(clave_texto(texto))
+
+
+def compilar(traducciones: Mapping[str, str], destino: Path) -> int:
+    """Escribe la tabla de ``traducciones`` (texto base → traducción).
+
+    Las traducciones vacías se omiten. Devuelve cuántos textos se escribieron.
+    """
+    entradas: dict[int, bytes] = {}
+    for original, traducido in traducciones.items():
+        if not traducido.strip():
+            continue
+        clave = clave_texto(original)
+        if clave in entradas:
+            raise ErrorIdioma(f"Dos textos distintos comparten la clave {clave:016x}.")
+        entradas[clave] = traducido.encode("utf-8")
+
+    claves = sorted(entradas)
+    desplazamientos = [0]
+    for clave in claves:
+        desplazamientos.append(desplazamientos[-1] + len(entradas[clave]))
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_name(destino.name + ".tmp")
+    with open(temporal, "wb") as archivo:
+        archivo.write(_CABECERA.pack(_MAGICO, VERSION_IDIOMA, len(claves)))
+        archivo.write(struct.pack(f"<{len(claves)}Q", *claves))
+        archivo.write(struct.pack(f"<{len(desplazamientos)}I", *desplazamientos))
+        for clave in claves:
+            archivo.write(entradas[clave])
+    os.replace(temporal, destino)
+    return len(claves)
+
+
+def textos_caminos(caminos: Iterable[Camino]) -> list[str]:
+    """Textos base de los capítulos de ``caminos``, sin repetir y en orden."""
+    textos: dict[str, None] = {}
+    for camino in caminos:
+        for capitulo in camino.capitulos:
+            for identificador in capitulo.mensajes:
+                if identificador != SIN_TEXTO:
+                    textos[texto_base(identificador)] = None
+    return list(textos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tablas de idioma de los capítulos.")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+    plantilla = ordenes.add_parser(
+        "plantilla", help="escribe (o completa) un JSON con los textos por traducir")
+    plantilla.add_argument("destino")
+    plantilla.add_argument("--catalogo", nargs="+", metavar="RUTA",
+                           help="usa los caminos de estos archivos JSON")
+    compilar_ = ordenes.add_parser("compilar", help="compila un JSON de traducciones")
+    compilar_.add_argument("origen")
+    compilar_.add_argument("--idioma",
+                           help="código del idioma (por defecto, el nombre del archivo)")
+    compilar_.add_argument("--directorio", type=Path, default=DIRECTORIO_IDIOMAS)
+    args = parser.parse_args()
+
+    if args.orden == "plantilla":
+        caminos = CAMINOS
+        if args.catalogo:
+            from senderos_catalogo import ErrorCatalogo, cargar_catalogo
+            try:
+                caminos = cargar_catalogo(args.catalogo)
+            except ErrorCatalogo as error:
+                raise SystemExit(f"Catálogo inválido: {error}") from None
+        destino = Path(args.destino)
+        existentes = json.loads(destino.read_text(encoding="utf-8")) if destino.exists() else {}
+        textos = {texto: existentes.get(texto, "") for texto in textos_caminos(caminos)}
+        destino.write_text(json.dumps(textos, ensure_ascii=False, indent=2), encoding="utf-8")
+        pendientes = sum(1 for traducido in textos.values() if not traducido)
+        print(f"{len(textos)} textos en {destino} ({pendientes} sin traducir).")
+    else:
+        origen = Path(args.origen)
+        with open(origen, encoding="utf-8") as archivo:
+            traducciones = json.load(archivo)
+        destino = args.directorio / f"{args.idioma or origen.stem}.sdli"
+        cantidad = compilar(traducciones, destino)
+        print(f"{cantidad} textos compilados en {destino}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Libro de recompensas: cada gema, virtud y recuerdo ganado o gastado.
+
+Después de ``activar``, cada cambio en las gemas o las virtudes de un
+``Jugador`` y cada recuerdo recibido se anota como un asiento en una base
+SQLite local. Los saldos se reconstruyen sumando los asientos, así que el
+libro sirve para auditar una partida o rehacerla tras un corte de luz.
+
+* Cada asiento cambia una *cuenta*: la del jugador, por su identificador
+  (``jugador:3f9a...``, así dos "Peregrino" no comparten cuenta), o, para
+  las virtudes del modo cooperativo, la de su equipo (``equipo:Lirios``).
+  El nombre del jugador se guarda junto a la cuenta y en cada asiento.
+  La primera vez que el libro ve una cuenta anota su saldo de ese momento
+  con el motivo ``apertura``; así también cuadran las partidas retomadas.
+* Los asientos se confirman en grupo: se acumulan en memoria y se escriben
+  en una sola transacción al llegar a ``lote`` o, como mucho, ``intervalo``
+  segundos después. Con ``synchronous=FULL`` cada grupo queda en disco al
+  confirmarse, y un corte de luz pierde, a lo sumo, el grupo en curso.
+* Los asientos de una misma recompensa se anotan dentro de ``operacion()``
+  y se confirman juntos, aunque el grupo llegue a ``lote`` a mitad de la
+  operación: nunca queda en el libro media recompensa.
+* Cada ``corte`` asientos se guarda un corte con los saldos de todas las
+  cuentas, para que reconstruirlos nunca sume más de ``corte`` asientos.
+
+    python3 senderos_libro.py recompensas.db                # saldos de todas las cuentas
+    python3 senderos_libro.py recompensas.db --cuenta Ana   # cuentas de Ana y sus asientos
+    python3 senderos_libro.py recompensas.db --verificar    # compara cortes y asientos
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import senderos_de_luz
+from senderos_de_luz import Jugador
+
+# Asientos por grupo y espera máxima antes de confirmarlos.
+LOTE = 512
+INTERVALO = 0.05
+# Asientos entre un corte de saldos y el siguiente.
+CORTE = 50_000
+# Milisegundos que se espera a que otro proceso confirme su grupo.
+ESPERA_BLOQUEO = 5000
+
+GEMAS = "gemas"
+VIRTUD = "virtud"
+RECUERDO = "recuerdo"
+APERTURA = "apertura"
+
+LIBRO_PREDETERMINADO = "recompensas.db"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS asientos (
+    id INTEGER PRIMARY KEY,
+    t REAL NOT NULL,
+    jugador TEXT NOT NULL,
+    cuenta TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    concepto TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    motivo TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS asientos_cuenta ON asientos (cuenta, id);
+CREATE TABLE IF NOT EXISTS cuentas (
+    cuenta TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cortes (
+    asiento INTEGER PRIMARY KEY,
+    t REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS saldos (
+    corte INTEGER NOT NULL,
+    cuenta TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    concepto TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    PRIMARY KEY (corte, cuenta, tipo, concepto)
+) WITHOUT ROWID;
+"""
+
+_INSERTAR = "INSERT INTO asientos (t, jugador, cuenta, tipo, concepto, cantidad, motivo) " \
+            "VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+@dataclass(slots=True)
+class Saldo:
+    gemas: int = 0
+    virtudes: dict[str, int] = field(default_factory=dict)
+    recuerdos: dict[str, int] = field(default_factory=dict)
+
+
+def cuenta_de(jugador: Jugador, tipo: str) -> str:
+    """La cuenta que cambia: la del equipo para las virtudes de su pozo."""
+    if tipo == VIRTUD and jugador.equipo and senderos_de_luz.POZO_EQUIPOS is not None:
+        return f"equipo:{jugador.equipo}"
+    return f"jugador:{jugador.id}"
+
+
+class LibroRecompensas:
+    """Asientos de recompensas en una base SQLite."""
+
+    def __init__(self, ruta: str | Path, lote: int = LOTE, intervalo: float = INTERVALO,
+                 corte: int = CORTE) -> None:
+        self.ruta = Path(ruta)
+        self.lote = lote
+        self.intervalo = intervalo
+        self.corte = corte
+        # La confirmación diferida se hace desde un temporizador: la conexión
+        # se comparte entre hilos, siempre bajo ``_cerrojo``. Es reentrante
+        # para que ``operacion`` lo retenga mientras se anotan sus asientos.
+        self._conexion = sqlite3.connect(self.ruta, isolation_level=None,
+                                         check_same_thread=False,
+                                         timeout=ESPERA_BLOQUEO / 1000)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=FULL")
+        self._conexion.executescript(_ESQUEMA)
+        self._cerrojo = threading.RLock()
+        self._pendientes: list[tuple] = []
+        self._cuentas_nuevas: list[tuple[str, str]] = []
+        # ``operacion`` anidadas en curso: mientras haya alguna no se confirma.
+        self._profundidad = 0
+        self._temporizador: threading.Timer | None = None
+        # Cuentas que ya tienen asientos (en la base o pendientes).
+        self._cuentas: set[str] = set()
+        previo, ultimo = self._conexion.execute(
+            "SELECT (SELECT COALESCE(MAX(asiento), 0) FROM cortes), "
+            "COALESCE(MAX(id), 0) FROM asientos").fetchone()
+        self._desde_corte = ultimo - previo
+        self.asientos = 0
+        self.confirmaciones = 0
+        self.cortes = 0
+
+    # --- Anotar -----------------------------------------------------------
+
+    @contextmanager
+    def operacion(self) -> Iterator[None]:
+        """Los asientos anotados dentro del bloque se confirman en el mismo grupo."""
+        with self._cerrojo:
+            self._profundidad += 1
+            try:
+                yield
+            finally:
+                self._profundidad -= 1
+                if not self._profundidad and len(self._pendientes) >= self.lote:
+                    self._confirmar()
+
+    def anotar(self, jugador: Jugador, tipo: str, concepto: str, cantidad: int,
+               motivo: str = "") -> None:
+        """Anota un cambio ya aplicado al jugador (o al pozo de su equipo)."""
+        cuenta = cuenta_de(jugador, tipo)
+        with self._cerrojo:
+            if cuenta not in self._cuentas:
+                self._abrir_cuenta(jugador, cuenta, tipo, concepto, cantidad)
+            self._agregar((time.time(), jugador.nombre, cuenta, tipo, concepto, cantidad, motivo))
+
+    def _agregar(self, asiento: tuple) -> None:
+        if not self._pendientes:
+            self._temporizador = threading.Timer(self.intervalo, self.vaciar)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+        self._pendientes.append(asiento)
+        if len(self._pendientes) >= self.lote and not self._profundidad:
+            self._confirmar()
+
+    def _abrir_cuenta(self, jugador: Jugador, cuenta: str, tipo: str, concepto: str,
+                      cantidad: int) -> None:
+        """Anota el saldo que tenía la cuenta antes de su primer asiento en este libro."""
+        self._cuentas.add(cuenta)
+        if self._conexion.execute("SELECT 1 FROM asientos WHERE cuenta = ? LIMIT 1",
+                                  (cuenta,)).fetchone():
+            return
+        self._cuentas_nuevas.append(
+            (cuenta, jugador.equipo if cuenta.startswith("equipo:") else jugador.nombre))
+        saldo: dict[tuple[str, str], int] = {}
+        if cuenta == cuenta_de(jugador, GEMAS):
+            saldo[GEMAS, ""] = jugador.gemas
+        if cuenta == cuenta_de(jugador, VIRTUD):
+            for virtud, disponible in jugador.virtudes_disponibles().items():
+                saldo[VIRTUD, virtud] = disponible
+        # El cambio ya está aplicado: la apertura es el saldo de antes.
+        if (tipo, concepto) in saldo:
+            saldo[tipo, concepto] -= cantidad
+        ahora = time.time()
+        for (tipo_saldo, concepto_saldo), valor in saldo.items():
+            if valor:
+                self._agregar((ahora, jugador.nombre, cuenta, tipo_saldo, concepto_saldo,
+                               valor, APERTURA))
+
+    def _confirmar(self) -> None:
+        if self._pendientes:
+            conexion = self._conexion
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                conexion.executemany(_INSERTAR, self._pendientes)
+                conexion.executemany("INSERT OR IGNORE INTO cuentas VALUES (?, ?)",
+                                     self._cuentas_nuevas)
+                self._desde_corte += len(self._pendientes)
+                if self._desde_corte >= self.corte:
+                    self._cortar()
+                conexion.execute("COMMIT")
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            self.asientos += len(self._pendientes)
+            self.confirmaciones += 1
+            self._pendientes.clear()
+            self._cuentas_nuevas.clear()
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+    def _cortar(self) -> None:
+        """Guarda los saldos hasta el último asiento (dentro de la transacción en curso)."""
+        conexion = self._conexion
+        previo, ultimo = conexion.execute(
+            "SELECT (SELECT COALESCE(MAX(asiento), 0) FROM cortes), "
+            "COALESCE(MAX(id), 0) FROM asientos").fetchone()
+        conexion.execute(
+            "INSERT INTO saldos SELECT ?, cuenta, tipo, concepto, SUM(cantidad) FROM ("
+            " SELECT cuenta, tipo, concepto, cantidad FROM saldos WHERE corte = ?"
+            " UNION ALL"
+            " SELECT cuenta, tipo, concepto, cantidad FROM asientos WHERE id > ?"
+            ") GROUP BY cuenta, tipo, concepto",
+            (ultimo, previo, previo))
+        conexion.execute("INSERT INTO cortes VALUES (?, ?)", (ultimo, time.time()))
+        # Solo hace falta el último corte; los asientos se conservan.
+        conexion.execute("DELETE FROM saldos WHERE corte = ?", (previo,))
+        self._desde_corte = 0
+        self.cortes += 1
+
+    def vaciar(self) -> None:
+        """Confirma el grupo en curso (al salir de la ``operacion`` en curso, si la hay)."""
+        with self._cerrojo:
+            if not self._profundidad:
+                self._confirmar()
+
+    def cerrar(self) -> None:
+        self.vaciar()
+        self._conexion.close()
+
+    # --- Consultar --------------------------------------------------------
+
+    def saldos(self, cuenta: str | None = None, desde_cero: bool = False) -> dict[str, Saldo]:
+        """Saldos de las cuentas: el último corte más los asientos posteriores.
+
+        Con ``desde_cero`` se suman todos los asientos, sin usar los cortes.
+        """
+        self.vaciar()
+        filtro, parametros = ("AND cuenta = ?", (cuenta,)) if cuenta is not None else ("", ())
+        with self._cerrojo:
+            previo = 0 if desde_cero else self._conexion.execute(
+                "SELECT COALESCE(MAX(asiento), 0) FROM cortes").fetchone()[0]
+            filas = self._conexion.execute(
+                "SELECT cuenta, tipo, concepto, SUM(cantidad) FROM ("
+                f" SELECT cuenta, tipo, concepto, cantidad FROM saldos WHERE corte = ? {filtro}"
+                " UNION ALL"
+                f" SELECT cuenta, tipo, concepto, cantidad FROM asientos WHERE id > ? {filtro}"
+                ") GROUP BY cuenta, tipo, concepto",
+                (previo, *parametros, previo, *parametros)).fetchall()
+        saldos: dict[str, Saldo] = {}
+        for nombre, tipo, concepto, cantidad in filas:
+            saldo = saldos.setdefault(nombre, Saldo())
+            if tipo == GEMAS:
+                saldo.gemas = cantidad
+            elif tipo == VIRTUD:
+                saldo.virtudes[concepto] = cantidad
+            elif tipo == RECUERDO:
+                saldo.recuerdos[concepto] = cantidad
+        return saldos
+
+    def cuentas(self, nombre: str | None = None) -> dict[str, str]:
+        """Nombre de cada cuenta; con ``nombre``, solo las suyas (o la cuenta así llamada)."""
+        self.vaciar()
+        filtro, parametros = ("WHERE nombre = ? OR cuenta = ?", (nombre, nombre)) \
+            if nombre is not None else ("", ())
+        with self._cerrojo:
+            return dict(self._conexion.execute(
+                f"SELECT cuenta, nombre FROM cuentas {filtro}", parametros).fetchall())
+
+    def historial(self, cuenta: str, limite: int = 20) -> list[tuple]:
+        """Últimos asientos de la cuenta: ``(t, jugador, tipo, concepto, cantidad, motivo)``."""
+        self.vaciar()
+        with self._cerrojo:
+            filas = self._conexion.execute(
+                "SELECT t, jugador, tipo, concepto, cantidad, motivo FROM asientos "
+                "WHERE cuenta = ? ORDER BY id DESC LIMIT ?", (cuenta, limite)).fetchall()
+        return filas[::-1]
+
+
+def activar(ruta: str | Path, lote: int = LOTE, intervalo: float = INTERVALO,
+            corte: int = CORTE) -> LibroRecompensas:
+    """Abre el libro de ``ruta`` y anota en él las recompensas del juego."""
+    libro = LibroRecompensas(ruta, lote, intervalo, corte)
+    senderos_de_luz.LIBRO = libro
+    return libro
+
+
+def desactivar() -> None:
+    if senderos_de_luz.LIBRO is not None:
+        senderos_de_luz.LIBRO.cerrar()
+    senderos_de_luz.LIBRO = None
+
+
+def _describir(saldo: Saldo) -> str:
+    partes = [f"{saldo.gemas} gemas"]
+    partes += [f"{virtud} {cantidad}" for virtud, cantidad in saldo.virtudes.items() if cantidad]
+    if saldo.recuerdos:
+        partes.append(f"{sum(saldo.recuerdos.values())} recuerdos")
+    return ", ".join(partes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("libro", nargs="?", default=LIBRO_PREDETERMINADO,
+                        help=f"base SQLite del libro ({LIBRO_PREDETERMINADO})")
+    parser.add_argument("--cuenta",
+                        help="muestra solo esta cuenta (o las de este jugador) y sus últimos "
+                             "asientos")
+    parser.add_argument("--verificar", action="store_true",
+                        help="comprueba que los cortes coinciden con la suma de los asientos")
+    args = parser.parse_args()
+
+    libro = LibroRecompensas(args.libro)
+    try:
+        # ``--cuenta`` acepta una cuenta o el nombre de sus jugadores.
+        nombres = libro.cuentas(args.cuenta)
+        elegidas: list[str | None] = [None]
+        if args.cuenta:
+            if not nombres:
+                raise SystemExit(f"No hay ninguna cuenta '{args.cuenta}' en el libro.")
+            elegidas = sorted(nombres)
+        inicio = time.perf_counter()
+        saldos = {cuenta: saldo for elegida in elegidas
+                  for cuenta, saldo in libro.saldos(elegida).items()}
+        segundos = time.perf_counter() - inicio
+        for cuenta, saldo in sorted(saldos.items()):
+            nombre = nombres.get(cuenta)
+            print(f"{cuenta}{f' ({nombre})' if nombre else ''}: {_describir(saldo)}")
+        print(f"{len(saldos)} cuentas reconstruidas en {segundos * 1000:.1f} ms.")
+        for cuenta in elegidas if args.cuenta else ():
+            if len(elegidas) > 1:
+                print(f"{cuenta}:")
+            for t, jugador, tipo, concepto, cantidad, motivo in libro.historial(cuenta):
+                detalle = f" {concepto}" if concepto else ""
+                print(f"  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))} "
+                      f"{jugador}: {cantidad:+d} {tipo}{detalle} ({motivo or '-'})")
+        if args.verificar:
+            completos = {cuenta: saldo for elegida in elegidas
+                         for cuenta, saldo in libro.saldos(elegida, desde_cero=True).items()}
+            distintas = sorted(cuenta for cuenta in saldos.keys() | completos.keys()
+                               if saldos.get(cuenta) != completos.get(cuenta))
+            if distintas:
+                raise SystemExit(f"Los cortes no cuadran en: {', '.join(distintas)}")
+            print("Los cortes cuadran con todos los asientos.")
+    finally:
+        libro.cerrar()
+
+
+if __name__ == "__main__":
+    main()
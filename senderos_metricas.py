@@ -0,0 +1,172 @@
+"""Métricas opcionales de los pasos del juego.
+
+Los pasos decorados con ``instrumentado`` en ``senderos_de_luz`` solo se
+miden después de ``activar``; mientras tanto el decorador devuelve el flujo
+original y el costo es una comprobación por llamada. Las métricas se
+exportan en el formato de texto de Prometheus.
+
+Por cada paso se registra:
+
+* ``senderos_paso_segundos``: duración total, incluida la espera del jugador.
+* ``senderos_paso_proceso_segundos``: tiempo de cálculo del motor, sin esperas.
+* ``senderos_intentos``: respuestas dadas en la Puerta de Sabiduría.
+* ``senderos_salida_eventos_total`` y ``senderos_salida_caracteres_total``.
+* ``senderos_virtudes_usadas_total`` y ``senderos_virtudes_ganadas_total``.
+
+Los pasos anidados (por ejemplo, la Puerta dentro de ``recorrer_camino``)
+también cuentan en el paso que los contiene. Las virtudes se cuentan una
+sola vez, al gastarlas o recibirlas (``Jugador.usar_virtud`` y
+``ganar_virtud``), también las del pozo de un equipo.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from bisect import bisect_left
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+import senderos_de_luz
+from senderos_de_luz import Flujo, Jugador, Solicitar
+
+LIMITES_SEGUNDOS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+                    30.0, 60.0, 300.0)
+LIMITES_INTENTOS = (1, 2, 3, 4, 5, 8)
+
+
+class Histograma:
+    def __init__(self, limites: tuple[float, ...]) -> None:
+        self.limites = limites
+        self.series: dict[str, list[float]] = {}
+
+    def observar(self, etiqueta: str, valor: float) -> None:
+        # Una serie guarda las cuentas por cubeta, seguidas de la suma y el total.
+        serie = self.series.get(etiqueta)
+        if serie is None:
+            serie = self.series[etiqueta] = [0] * (len(self.limites) + 2)
+        indice = bisect_left(self.limites, valor)
+        if indice < len(self.limites):
+            serie[indice] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+
+    def lineas(self, nombre: str, clave: str) -> list[str]:
+        lineas = []
+        for etiqueta, serie in sorted(self.series.items()):
+            acumulado = 0
+            for limite, cuenta in zip(self.limites, serie):
+                acumulado += cuenta
+                lineas.append(f'{nombre}_bucket{{{clave}="{etiqueta}",le="{limite:g}"}} '
+                              f"{acumulado}")
+            lineas.append(f'{nombre}_bucket{{{clave}="{etiqueta}",le="+Inf"}} {serie[-1]}')
+            lineas.append(f'{nombre}_sum{{{clave}="{etiqueta}"}} {serie[-2]:.6f}')
+            lineas.append(f'{nombre}_count{{{clave}="{etiqueta}"}} {serie[-1]}')
+        return lineas
+
+
+class Metricas:
+    """Acumula las mediciones y las escribe en ``ruta`` cada ``intervalo`` segundos."""
+
+    def __init__(self, ruta: str | Path | None = None, intervalo: float = 10.0) -> None:
+        self.ruta = Path(ruta) if ruta else None
+        self.intervalo = intervalo
+        self._ultima_exportacion = time.monotonic()
+        self.duracion = Histograma(LIMITES_SEGUNDOS)
+        self.proceso = Histograma(LIMITES_SEGUNDOS)
+        self.intentos = Histograma(LIMITES_INTENTOS)
+        self.eventos: dict[str, int] = {}
+        self.caracteres: dict[str, int] = {}
+        self.usadas: dict[str, int] = {}
+        self.ganadas: dict[str, int] = {}
+
+    def medir(self, paso: str, jugador: Jugador, flujo: Flujo[Any]) -> Generator:
+        """Reenvía los eventos de ``flujo`` tomando medidas por el camino."""
+        inicio = time.perf_counter()
+        proceso = 0.0
+        intentos = eventos = caracteres = 0
+        valor = None
+        try:
+            while True:
+                tramo = time.perf_counter()
+                try:
+                    evento = flujo.send(valor)
+                except StopIteration as fin:
+                    proceso += time.perf_counter() - tramo
+                    resultado = fin.value
+                    break
+                proceso += time.perf_counter() - tramo
+                if isinstance(evento, Solicitar):
+                    valor = yield evento
+                    if evento.clave == "respuesta" and valor and valor.strip():
+                        intentos += 1
+                else:
+                    eventos += 1
+                    caracteres += len(evento.texto)
+                    valor = yield evento
+        finally:
+            flujo.close()
+
+        self.duracion.observar(paso, time.perf_counter() - inicio)
+        self.proceso.observar(paso, proceso)
+        if intentos:
+            self.intentos.observar(paso, intentos)
+        self.eventos[paso] = self.eventos.get(paso, 0) + eventos
+        self.caracteres[paso] = self.caracteres.get(paso, 0) + caracteres
+        if self.ruta and time.monotonic() - self._ultima_exportacion >= self.intervalo:
+            self.exportar()
+        return resultado
+
+    def contar_virtud(self, virtud: str, cambio: int) -> None:
+        """Registra una virtud gastada (``cambio`` negativo) o recibida."""
+        if cambio < 0:
+            self.usadas[virtud] = self.usadas.get(virtud, 0) - cambio
+        else:
+            self.ganadas[virtud] = self.ganadas.get(virtud, 0) + cambio
+
+    def texto(self) -> str:
+        lineas: list[str] = []
+
+        def histograma(nombre: str, ayuda: str, datos: Histograma) -> None:
+            lineas.extend([f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} histogram"])
+            lineas.extend(datos.lineas(nombre, "paso"))
+
+        def contador(nombre: str, ayuda: str, clave: str, datos: dict[str, int]) -> None:
+            lineas.extend([f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} counter"])
+            lineas.extend(f'{nombre}{{{clave}="{etiqueta}"}} {valor}'
+                          for etiqueta, valor in sorted(datos.items()))
+
+        histograma("senderos_paso_segundos",
+                   "Duración de cada paso, incluida la espera del jugador.", self.duracion)
+        histograma("senderos_paso_proceso_segundos",
+                   "Tiempo de cálculo de cada paso, sin la espera del jugador.", self.proceso)
+        histograma("senderos_intentos", "Respuestas dadas hasta abrir la Puerta de Sabiduría.",
+                   self.intentos)
+        contador("senderos_salida_eventos_total", "Textos mostrados por paso.",
+                 "paso", self.eventos)
+        contador("senderos_salida_caracteres_total", "Caracteres mostrados por paso.",
+                 "paso", self.caracteres)
+        contador("senderos_virtudes_usadas_total", "Virtudes gastadas.", "virtud", self.usadas)
+        contador("senderos_virtudes_ganadas_total", "Virtudes recibidas.", "virtud", self.ganadas)
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, ruta: str | Path | None = None) -> None:
+        destino = Path(ruta) if ruta else self.ruta
+        if destino is None:
+            return
+        temporal = destino.with_name(destino.name + ".tmp")
+        temporal.write_text(self.texto(), encoding="utf-8")
+        os.replace(temporal, destino)
+        self._ultima_exportacion = time.monotonic()
+
+
+def activar(ruta: str | Path | None = None, intervalo: float = 10.0) -> Metricas:
+    """Empieza a medir los pasos instrumentados y devuelve el acumulador."""
+    metricas = Metricas(ruta, intervalo)
+    senderos_de_luz.MEDIDOR = metricas
+    return metricas
+
+
+def desactivar() -> None:
+    senderos_de_luz.MEDIDOR = None
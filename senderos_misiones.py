@@ -0,0 +1,140 @@
+"""Planificador de Misiones de Comunidad.
+
+Elige misiones de un conjunto que puede tener miles de ellas:
+
+* cada misión tiene un peso y puede limitarse a ciertos grupos de edad o
+  modos de viaje;
+* por cada combinación de grupo y modo se precalcula una tabla de alias
+  (método de Vose), así cada sorteo ponderado cuesta O(1);
+* las misiones ya vistas por un jugador se guardan en un mapa de bits
+  (``Jugador.misiones_vistas``) y no se repiten hasta que haya visto todas
+  las que le corresponden;
+* el generador de números aleatorios se puede sembrar para reproducir
+  simulaciones grandes.
+
+Para usar otro conjunto de misiones en el juego basta con reemplazar
+``senderos_de_luz.PLANIFICADOR_MISIONES``.
+"""
+
+from __future__ import annotations
+
+import random
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from senderos_de_luz import Jugador
+
+# Sorteos que se intentan antes de buscar entre las misiones pendientes.
+INTENTOS_SIN_REPETIR = 16
+
+
+@dataclass(slots=True)
+class Mision:
+    texto: str
+    peso: float = 1.0
+    # Vacío significa "para todos".
+    grupos_edad: tuple[str, ...] = ()
+    modos: tuple[str, ...] = ()
+
+    def corresponde(self, grupo_edad: str, modo: str) -> bool:
+        return ((not self.grupos_edad or grupo_edad in self.grupos_edad)
+                and (not self.modos or modo in self.modos))
+
+
+class TablaAlias:
+    """Muestreo ponderado en O(1) sobre un subconjunto fijo de misiones."""
+
+    def __init__(self, indices: Iterable[int], pesos: Iterable[float]) -> None:
+        self.indices = array("I", indices)
+        pesos = list(pesos)
+        cantidad = len(self.indices)
+        if cantidad == 0 or len(pesos) != cantidad:
+            raise ValueError("La tabla necesita un peso por cada misión.")
+        total = sum(pesos)
+        if total <= 0:
+            raise ValueError("Los pesos de las misiones deben sumar más que cero.")
+
+        escalados = [peso * cantidad / total for peso in pesos]
+        self.probabilidad = array("d", [1.0]) * cantidad
+        self.alias = array("I", range(cantidad))
+        pequenos = [i for i, valor in enumerate(escalados) if valor < 1.0]
+        grandes = [i for i, valor in enumerate(escalados) if valor >= 1.0]
+        while pequenos and grandes:
+            menor, mayor = pequenos.pop(), grandes[-1]
+            self.probabilidad[menor] = escalados[menor]
+            self.alias[menor] = mayor
+            escalados[mayor] -= 1.0 - escalados[menor]
+            if escalados[mayor] < 1.0:
+                pequenos.append(grandes.pop())
+        # Lo que queda tiene probabilidad 1 (salvo errores de redondeo).
+
+        self.mascara = 0
+        for indice in self.indices:
+            self.mascara |= 1 << indice
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def sortear(self, azar: random.Random) -> int:
+        # Un solo número al azar: la parte entera elige la columna y la
+        # fraccionaria decide entre ella y su alias.
+        valor = azar.random() * len(self.indices)
+        columna = int(valor)
+        if valor - columna >= self.probabilidad[columna]:
+            columna = self.alias[columna]
+        return self.indices[columna]
+
+
+class PlanificadorMisiones:
+    """Sortea misiones ponderadas y sin repetir para cada jugador."""
+
+    def __init__(self, misiones: Iterable[Mision | str],
+                 azar: random.Random | None = None) -> None:
+        self.misiones = [Mision(mision) if isinstance(mision, str) else mision
+                         for mision in misiones]
+        if not self.misiones:
+            raise ValueError("El planificador necesita al menos una misión.")
+        self.azar = azar or random.Random()
+        self._tablas: dict[tuple[str, str], TablaAlias] = {}
+
+    def sembrar(self, semilla: int) -> None:
+        self.azar.seed(semilla)
+
+    def tabla(self, grupo_edad: str, modo: str) -> TablaAlias:
+        """Tabla de alias de las misiones de un grupo y modo (se calcula una vez).
+
+        Si ninguna misión corresponde a la combinación, se usan todas.
+        """
+        clave = (grupo_edad, modo)
+        tabla = self._tablas.get(clave)
+        if tabla is None:
+            indices = [indice for indice, mision in enumerate(self.misiones)
+                       if mision.peso > 0 and mision.corresponde(grupo_edad, modo)]
+            if not indices:
+                indices = [indice for indice, mision in enumerate(self.misiones)
+                           if mision.peso > 0]
+            tabla = self._tablas[clave] = TablaAlias(
+                indices, (self.misiones[indice].peso for indice in indices))
+        return tabla
+
+    def elegir(self, jugador: Jugador) -> Mision:
+        """Sortea una misión que el jugador no haya visto y la marca como vista."""
+        tabla = self.tabla(jugador.grupo_edad, jugador.modo)
+        vistas = jugador.misiones_vistas
+        if vistas & tabla.mascara == tabla.mascara:
+            # Ya vio todas las suyas: empieza una vuelta nueva.
+            vistas &= ~tabla.mascara
+        for _ in range(INTENTOS_SIN_REPETIR):
+            indice = tabla.sortear(self.azar)
+            if not vistas >> indice & 1:
+                break
+        else:
+            # Quedan pocas pendientes: se sortea solo entre ellas.
+            pendientes = [indice for indice in tabla.indices if not vistas >> indice & 1]
+            indice = self.azar.choices(
+                pendientes, [self.misiones[pendiente].peso for pendiente in pendientes])[0]
+        jugador.misiones_vistas = vistas | 1 << indice
+        return self.misiones[indice]
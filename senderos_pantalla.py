@@ -0,0 +1,162 @@
+"""Dibujo de pantallas completas con una sola escritura.
+
+``MotorSesion`` entrega los textos de cada pantalla (relato, pregunta,
+opciones, tabla de virtudes...) como una lista. ``Pantalla`` los compone,
+junto con el mensaje de la solicitud, en un solo bloque de bytes y lo
+escribe con una llamada a ``os.write``, en lugar de un ``print`` por línea.
+Por SSH o en las terminales serie de los quioscos eso evita muchas
+escrituras pequeñas y el parpadeo.
+
+Hay dos modos:
+
+* continuo (el de siempre): cada pantalla se añade debajo de la anterior;
+* ``redibujar``: cada pantalla ocupa la terminal desde arriba y solo se
+  reescriben las filas que cambiaron respecto a la anterior (con
+  secuencias ANSI), así que una pregunta repetida o un menú que vuelve a
+  mostrarse casi no envía bytes. Cuando cambia casi todo, mover el cursor
+  a cada fila cuesta más que borrar y escribir la pantalla entera (se
+  comparan los bytes codificados, no los caracteres), y se hace esto
+  último. Las líneas más anchas que la terminal se parten en filas antes
+  de comparar, para que cada fila sea una fila real de la terminal.
+
+``escrituras`` y ``cuadros`` cuentan las llamadas al sistema y las
+pantallas dibujadas; ``escrituras / cuadros`` es 1 salvo que la terminal
+acepte solo parte de un bloque.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections.abc import Sequence
+from typing import TextIO
+
+INICIO = "\x1b[H"
+BORRAR_LINEA = "\x1b[K"
+BORRAR_DEBAJO = "\x1b[J"
+
+
+def _mover(fila: int, columna: int = 1) -> str:
+    return f"\x1b[{fila};{columna}H"
+
+
+def _columnas(texto: str) -> int:
+    """Columnas que ocupa ``texto``: los caracteres anchos (emoji, CJK) ocupan dos."""
+    if texto.isascii():
+        return len(texto)
+    from unicodedata import combining, east_asian_width
+
+    return sum(0 if combining(caracter) else 2 if east_asian_width(caracter) in "WF" else 1
+               for caracter in texto)
+
+
+def _partir(linea: str, ancho: int) -> list[str]:
+    """Filas de la terminal que ocupa ``linea`` con ``ancho`` columnas por fila."""
+    if 2 * len(linea) <= ancho or _columnas(linea) <= ancho:
+        return [linea]
+    filas = []
+    inicio = ocupadas = 0
+    for posicion, caracter in enumerate(linea):
+        columnas = _columnas(caracter)
+        if ocupadas + columnas > ancho:
+            filas.append(linea[inicio:posicion])
+            inicio, ocupadas = posicion, 0
+        ocupadas += columnas
+    filas.append(linea[inicio:])
+    return filas
+
+
+class Pantalla:
+    """Escribe cada pantalla del juego como un único bloque."""
+
+    def __init__(self, salida: TextIO | None = None, redibujar: bool = False,
+                 alto: int | None = None, ancho: int | None = None) -> None:
+        self.salida = salida if salida is not None else sys.stdout
+        self.redibujar = redibujar
+        self.alto = alto
+        self.ancho = ancho
+        self.codificacion = getattr(self.salida, "encoding", None) or "utf-8"
+        self.escrituras = 0
+        self.cuadros = 0
+        self.bytes_escritos = 0
+        # Filas visibles del último cuadro (``None`` si se desconoce su contenido).
+        self._filas: list[str | None] = []
+        self._limpiar = redibujar
+
+    def _alto(self) -> int:
+        if self.alto:
+            return self.alto
+        try:
+            return os.get_terminal_size(self.salida.fileno()).lines
+        except (AttributeError, ValueError, OSError):
+            return 24
+
+    def _ancho(self) -> int:
+        if self.ancho:
+            return self.ancho
+        try:
+            return os.get_terminal_size(self.salida.fileno()).columns
+        except (AttributeError, ValueError, OSError):
+            return 80
+
+    def _escribir(self, texto: str) -> None:
+        # Lo que otros hayan escrito con ``print`` debe salir antes.
+        self.salida.flush()
+        datos = texto.encode(self.codificacion, "replace")
+        descriptor = self.salida.fileno()
+        vista = memoryview(datos)
+        while vista:
+            escritos = os.write(descriptor, vista)
+            self.escrituras += 1
+            vista = vista[escritos:]
+        self.bytes_escritos += len(datos)
+
+    def componer(self, lineas: Sequence[str], mensaje: str = "") -> str:
+        """Texto del cuadro con ``lineas`` y el mensaje de la solicitud al final."""
+        if not self.redibujar:
+            return "".join(linea + "\n" for linea in lineas) + mensaje
+
+        # Una fila por debajo del ancho: escribir en la última columna deja
+        # el cursor pendiente de saltar y ``BORRAR_LINEA`` borraría ese carácter.
+        ancho = max(1, self._ancho() - 1)
+        filas = [fila for linea in "\n".join([*lineas, mensaje]).split("\n")
+                 for fila in _partir(linea, ancho)]
+        # Si no cabe, se muestran las últimas filas (las que llevan a la
+        # solicitud). Se deja libre la fila de abajo para que el Enter del
+        # jugador no desplace la terminal.
+        filas = filas[-max(1, self._alto() - 1):]
+        # Desde el principio, borrar hacia abajo limpia la pantalla entera
+        # con un byte menos que ``\x1b[2J``.
+        completo = INICIO + BORRAR_DEBAJO + "\n".join(filas)
+        anteriores = self._filas
+        # La respuesta y el salto de línea que escriba el jugador cambian la
+        # última fila y la siguiente: hay que volver a dibujarlas.
+        self._filas = [*filas[:-1], None]
+        if self._limpiar:
+            self._limpiar = False
+            return completo
+
+        partes: list[str] = []
+        for numero, fila in enumerate(filas):
+            if numero < len(anteriores) and anteriores[numero] == fila:
+                continue
+            partes.append(_mover(numero + 1) + fila + BORRAR_LINEA)
+        if len(filas) < len(anteriores):
+            partes.append(_mover(len(filas) + 1) + BORRAR_DEBAJO)
+        # El cursor queda al final del mensaje, donde el jugador escribe.
+        partes.append(_mover(len(filas), _columnas(filas[-1]) + 1))
+        cambios = "".join(partes)
+        # Se compara lo que viaja por la línea: las tildes ocupan dos bytes.
+        if self._bytes(completo) <= self._bytes(cambios):
+            return completo
+        return cambios
+
+    def _bytes(self, texto: str) -> int:
+        return len(texto.encode(self.codificacion, "replace"))
+
+    def dibujar(self, lineas: Sequence[str], mensaje: str = "") -> None:
+        """Escribe una pantalla completa con una sola llamada al sistema."""
+        texto = self.componer(lineas, mensaje)
+        self.cuadros += 1
+        if texto:
+            self._escribir(texto)
@@ -0,0 +1,205 @@
+"""Guardado y carga del progreso de un ``Jugador``.
+
+El archivo es un registro binario versionado: una cabecera seguida de
+entradas ``[tipo][longitud][crc32][datos]``. Hay tres tipos de entrada:
+
+* estado: nombre, grupo, modo, gemas, virtudes, capítulos completados,
+  misiones ya vistas, idioma, equipo e identificador del jugador.
+  Al cargar, el último estado es el válido.
+* testimonio: un testimonio nuevo. Se añaden al final sin reescribir los
+  anteriores.
+* bloque de testimonios: hasta ``TESTIMONIOS_POR_BLOQUE`` testimonios
+  juntos, como los deja la compactación, para cargar historias largas
+  de una sola vez (o recorrerlas por bloques, ver ``leer_testimonios``).
+
+Una entrada truncada o dañada al final (por ejemplo, tras un corte de luz)
+se descarta al cargar. ``guardar`` reescribe el archivo compactado de forma
+atómica; ``RegistroProgreso.actualizar`` solo añade lo que cambió.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import struct
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+
+from senderos_de_luz import Jugador, Testimonio, fecha_compartida, id_capitulo
+
+VERSION_PROGRESO = 6
+_MAGICO = b"SDLP"
+_CABECERA = struct.Struct("<4sH")
+_ENTRADA = struct.Struct("<BII")  # tipo, longitud, crc32
+
+# Testimonios por bloque al compactar: acota la memoria al recorrerlos.
+TESTIMONIOS_POR_BLOQUE = 4096
+
+_ESTADO = 1
+_TESTIMONIO = 2
+_BLOQUE = 3
+
+
+class ErrorProgreso(ValueError):
+    """El archivo no contiene un progreso que se pueda cargar."""
+
+
+def _entrada(tipo: int, valor: object) -> bytes:
+    datos = marshal.dumps(valor)
+    return _ENTRADA.pack(tipo, len(datos), zlib.crc32(datos)) + datos
+
+
+def _estado(jugador: Jugador) -> tuple:
+    return (jugador.nombre, jugador.grupo_edad, jugador.modo, jugador.gemas,
+            dict(jugador.virtudes),
+            tuple(sorted(jugador.capitulos_completados())), jugador.misiones_vistas,
+            jugador.idioma, jugador.equipo, jugador.id)
+
+
+def _testimonio(registro: Testimonio) -> tuple[str, str, str, int]:
+    return (registro.camino, registro.capitulo, registro.texto, registro.fecha)
+
+
+def _desde_tupla(valor: tuple) -> Testimonio:
+    camino, capitulo, texto, fecha = valor
+    return Testimonio(id_capitulo(camino, capitulo), texto, fecha_compartida(fecha))
+
+
+def _escribir_atomico(ruta: Path, contenido: bytes) -> None:
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    with open(temporal, "wb") as archivo:
+        archivo.write(contenido)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+
+def guardar(jugador: Jugador, ruta: str | Path) -> None:
+    """Escribe el progreso completo y compactado, reemplazando el anterior."""
+    partes = [_CABECERA.pack(_MAGICO, VERSION_PROGRESO)]
+    testimonios = jugador.testimonios
+    for inicio in range(0, len(testimonios), TESTIMONIOS_POR_BLOQUE):
+        partes.append(_entrada(_BLOQUE, [_testimonio(registro) for registro in
+                                         testimonios[inicio:inicio + TESTIMONIOS_POR_BLOQUE]]))
+    partes.append(_entrada(_ESTADO, _estado(jugador)))
+    _escribir_atomico(Path(ruta), b"".join(partes))
+
+
+def _leer(ruta: Path) -> tuple[Jugador, int]:
+    """Devuelve el jugador y la longitud válida del archivo."""
+    datos = ruta.read_bytes()
+    if len(datos) < _CABECERA.size:
+        raise ErrorProgreso(f"{ruta}: archivo incompleto.")
+    magico, version = _CABECERA.unpack_from(datos)
+    if magico != _MAGICO:
+        raise ErrorProgreso(f"{ruta}: no es un archivo de progreso.")
+    if version != VERSION_PROGRESO:
+        raise ErrorProgreso(f"{ruta}: versión {version} no soportada.")
+
+    estado = None
+    testimonios: list[Testimonio] = []
+    posicion = _CABECERA.size
+    while posicion + _ENTRADA.size <= len(datos):
+        tipo, longitud, crc = _ENTRADA.unpack_from(datos, posicion)
+        inicio = posicion + _ENTRADA.size
+        contenido = datos[inicio:inicio + longitud]
+        if len(contenido) < longitud or zlib.crc32(contenido) != crc:
+            break
+        valor = marshal.loads(contenido)
+        if tipo == _ESTADO:
+            estado = valor
+        elif tipo == _TESTIMONIO:
+            testimonios.append(_desde_tupla(valor))
+        elif tipo == _BLOQUE:
+            testimonios.extend(map(_desde_tupla, valor))
+        posicion = inicio + longitud
+
+    if estado is None:
+        raise ErrorProgreso(f"{ruta}: no contiene ningún estado guardado.")
+    (nombre, grupo_edad, modo, gemas, virtudes, completados, misiones_vistas, idioma,
+     equipo, identificador) = estado
+    jugador = Jugador(nombre=nombre, grupo_edad=grupo_edad, modo=modo, gemas=gemas,
+                      virtudes=virtudes, testimonios=testimonios,
+                      misiones_vistas=misiones_vistas, idioma=idioma, equipo=equipo,
+                      id=identificador)
+    for camino, capitulo in completados:
+        jugador.completar_capitulo(camino, capitulo)
+    return jugador, posicion
+
+
+def leer_testimonios(ruta: str | Path) -> Iterator[Testimonio]:
+    """Testimonios guardados, leídos entrada por entrada sin cargar el archivo.
+
+    Como al cargar, se detiene en la primera entrada truncada o dañada.
+    """
+    with open(ruta, "rb") as archivo:
+        cabecera = archivo.read(_CABECERA.size)
+        if len(cabecera) < _CABECERA.size:
+            raise ErrorProgreso(f"{ruta}: archivo incompleto.")
+        magico, version = _CABECERA.unpack(cabecera)
+        if magico != _MAGICO:
+            raise ErrorProgreso(f"{ruta}: no es un archivo de progreso.")
+        if version != VERSION_PROGRESO:
+            raise ErrorProgreso(f"{ruta}: versión {version} no soportada.")
+        while len(encabezado := archivo.read(_ENTRADA.size)) == _ENTRADA.size:
+            tipo, longitud, crc = _ENTRADA.unpack(encabezado)
+            contenido = archivo.read(longitud)
+            if len(contenido) < longitud or zlib.crc32(contenido) != crc:
+                return
+            if tipo == _TESTIMONIO:
+                yield _desde_tupla(marshal.loads(contenido))
+            elif tipo == _BLOQUE:
+                yield from map(_desde_tupla, marshal.loads(contenido))
+
+
+def cargar(ruta: str | Path) -> Jugador:
+    """Reconstruye un ``Jugador`` desde su archivo de progreso."""
+    return _leer(Path(ruta))[0]
+
+
+class RegistroProgreso:
+    """Mantiene al día el archivo de progreso de un jugador.
+
+    ``actualizar`` añade al final los testimonios nuevos y, si algo cambió,
+    un estado nuevo; nunca reescribe lo ya guardado.
+    """
+
+    def __init__(self, jugador: Jugador, ruta: str | Path) -> None:
+        self.jugador = jugador
+        self.ruta = Path(ruta)
+        guardar(jugador, self.ruta)
+        self._testimonios = len(jugador.testimonios)
+        self._ultimo = _estado(jugador)
+
+    @classmethod
+    def abrir(cls, ruta: str | Path) -> RegistroProgreso:
+        """Carga un progreso existente y descarta una cola dañada, si la hay."""
+        ruta = Path(ruta)
+        jugador, valido = _leer(ruta)
+        registro = cls.__new__(cls)
+        registro.jugador = jugador
+        registro.ruta = ruta
+        if valido < ruta.stat().st_size:
+            os.truncate(ruta, valido)
+        registro._testimonios = len(jugador.testimonios)
+        registro._ultimo = _estado(jugador)
+        return registro
+
+    def actualizar(self) -> None:
+        nuevos = self.jugador.testimonios[self._testimonios:]
+        estado = _estado(self.jugador)
+        if not nuevos and estado == self._ultimo:
+            return
+        partes = [_entrada(_TESTIMONIO, _testimonio(registro)) for registro in nuevos]
+        if estado != self._ultimo:
+            partes.append(_entrada(_ESTADO, estado))
+        with open(self.ruta, "ab") as archivo:
+            archivo.write(b"".join(partes))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        self._testimonios += len(nuevos)
+        self._ultimo = estado
+
+    def compactar(self) -> None:
+        guardar(self.jugador, self.ruta)
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""Paquete de archivos del Cofre de Recuerdos.
+
+Cada ``Recompensa.recuerdo`` ("Audio de Jacob...", "Mini video...") puede
+tener un archivo (audio, video, imagen) en un único paquete ``.sdlr`` para
+llevar a quioscos sin conexión:
+
+* el contenido se direcciona por su hash: dos recuerdos con el mismo
+  archivo comparten un solo bloque;
+* el paquete se abre con ``mmap`` la primera vez que se abre un cofre y
+  cada archivo se lee (o se transmite por bloques) en su desplazamiento,
+  sin desempaquetar nada más;
+* los archivos se guardan tal cual o, si así ocupan bastante menos, con
+  zlib; ``CacheRecuerdos`` guarda los ya decodificados en disco, hasta un
+  límite de bytes y descartando primero los usados hace más tiempo, así
+  que abrir otra vez el mismo cofre solo devuelve una ruta.
+
+Formato: cabecera ``<4sHII`` (mágico, versión, recuerdos, bloques), las
+claves ``uint64`` ordenadas de los recuerdos (ver
+``senderos_idiomas.clave_texto``), el bloque ``uint32`` de cada uno, un
+registro de ``_BLOQUE`` por bloque y los datos uno tras otro.
+
+    python3 senderos_recuerdos.py plantilla recuerdos.json    # recuerdo → archivo
+    python3 senderos_recuerdos.py empaquetar recuerdos.json recuerdos.sdlr
+    python3 senderos.py --recuerdos recuerdos.sdlr
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+import senderos_de_luz
+from senderos_de_luz import CAMINOS, Camino
+from senderos_idiomas import clave_texto
+
+VERSION_RECUERDOS = 1
+_MAGICO = b"SDLR"
+_CABECERA = struct.Struct("<4sHII")  # mágico, versión, recuerdos, bloques
+# hash, desplazamiento, longitud guardada, longitud decodificada, códec, extensión
+_BLOQUE = struct.Struct("<16sQQQB7s")
+
+CRUDO = 0
+ZLIB = 1
+
+# Se comprime solo si así ocupa, como mucho, esta fracción del original.
+AHORRO_MINIMO = 0.9
+TAMANO_TRANSMISION = 64 * 1024
+# Bytes de archivos decodificados que se conservan en disco.
+LIMITE_CACHE = 256 * 1024 * 1024
+
+
+class ErrorRecuerdos(ValueError):
+    """El archivo no contiene un paquete de recuerdos válido."""
+
+
+@dataclass(frozen=True, slots=True)
+class Recurso:
+    hash: str
+    extension: str
+    inicio: int
+    longitud: int
+    tamano: int
+    codec: int
+
+
+class PaqueteRecuerdos:
+    """Paquete de recuerdos abierto con ``mmap``."""
+
+    def __init__(self, ruta: str | Path) -> None:
+        self.ruta = Path(ruta)
+        with open(self.ruta, "rb") as archivo:
+            try:
+                self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:  # archivo vacío
+                raise ErrorRecuerdos(f"{ruta}: archivo vacío.") from error
+        if len(self._mapa) < _CABECERA.size:
+            raise ErrorRecuerdos(f"{ruta}: archivo incompleto.")
+        magico, version, recuerdos, bloques = _CABECERA.unpack_from(self._mapa)
+        if magico != _MAGICO or version != VERSION_RECUERDOS:
+            raise ErrorRecuerdos(f"{ruta}: paquete de recuerdos incompatible.")
+        inicio_claves = _CABECERA.size
+        inicio_bloques_recuerdo = inicio_claves + 8 * recuerdos
+        self._inicio_registros = inicio_bloques_recuerdo + 4 * recuerdos
+        self._inicio_datos = self._inicio_registros + _BLOQUE.size * bloques
+        if len(self._mapa) < self._inicio_datos:
+            raise ErrorRecuerdos(f"{ruta}: archivo incompleto.")
+        vista = memoryview(self._mapa)
+        self._claves = vista[inicio_claves:inicio_bloques_recuerdo].cast("Q")
+        self._bloques = vista[inicio_bloques_recuerdo:self._inicio_registros].cast("I")
+        self.bloques = bloques
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def buscar(self, recuerdo: str) -> Recurso | None:
+        """El archivo del recuerdo, o ``None`` si el paquete no lo tiene."""
+        clave = clave_texto(recuerdo)
+        posicion = bisect_left(self._claves, clave)
+        if posicion == len(self._claves) or self._claves[posicion] != clave:
+            return None
+        registro = self._inicio_registros + _BLOQUE.size * self._bloques[posicion]
+        digesto, inicio, longitud, tamano, codec, extension = _BLOQUE.unpack_from(
+            self._mapa, registro)
+        return Recurso(digesto.hex(), extension.rstrip(b"\0").decode("ascii"),
+                       self._inicio_datos + inicio, longitud, tamano, codec)
+
+    def datos(self, recurso: Recurso) -> memoryview:
+        """Los bytes guardados del recurso, sin copiarlos."""
+        return memoryview(self._mapa)[recurso.inicio:recurso.inicio + recurso.longitud]
+
+    def transmitir(self, recurso: Recurso,
+                   tamano: int = TAMANO_TRANSMISION) -> Iterator[bytes | memoryview]:
+        """El contenido decodificado del recurso, por bloques de ``tamano``."""
+        datos = self.datos(recurso)
+        if recurso.codec == CRUDO:
+            for inicio in range(0, len(datos), tamano):
+                yield datos[inicio:inicio + tamano]
+            return
+        descompresor = zlib.decompressobj()
+        for inicio in range(0, len(datos), tamano):
+            parte = descompresor.decompress(datos[inicio:inicio + tamano])
+            if parte:
+                yield parte
+        resto = descompresor.flush()
+        if resto:
+            yield resto
+
+
+class CacheRecuerdos:
+    """Archivos decodificados en disco, con un límite de bytes (LRU por fecha de uso)."""
+
+    def __init__(self, directorio: Path, limite: int = LIMITE_CACHE) -> None:
+        self.directorio = directorio
+        self.limite = limite
+        directorio.mkdir(parents=True, exist_ok=True)
+        # nombre → tamaño; la fecha de modificación marca el último uso.
+        self._archivos = {entrada.name: entrada.stat().st_size
+                          for entrada in os.scandir(directorio)
+                          if entrada.is_file() and not entrada.name.endswith(".tmp")}
+        self.ocupado = sum(self._archivos.values())
+
+    def obtener(self, paquete: PaqueteRecuerdos, recurso: Recurso) -> Path:
+        """Ruta del archivo decodificado; lo escribe si todavía no está."""
+        nombre = recurso.hash + recurso.extension
+        ruta = self.directorio / nombre
+        if nombre in self._archivos:
+            try:
+                os.utime(ruta)
+                return ruta
+            except FileNotFoundError:
+                self.ocupado -= self._archivos.pop(nombre)
+        temporal = ruta.with_name(nombre + ".tmp")
+        with open(temporal, "wb") as archivo:
+            for parte in paquete.transmitir(recurso):
+                archivo.write(parte)
+        os.replace(temporal, ruta)
+        self._archivos[nombre] = recurso.tamano
+        self.ocupado += recurso.tamano
+        self._liberar(conservar=nombre)
+        return ruta
+
+    def _liberar(self, conservar: str) -> None:
+        if self.ocupado <= self.limite:
+            return
+        antiguos = sorted(
+            (nombre for nombre in self._archivos if nombre != conservar),
+            key=lambda nombre: _fecha_uso(self.directorio / nombre))
+        for nombre in antiguos:
+            if self.ocupado <= self.limite:
+                break
+            try:
+                (self.directorio / nombre).unlink()
+            except FileNotFoundError:
+                pass
+            self.ocupado -= self._archivos.pop(nombre)
+
+
+def _fecha_uso(ruta: Path) -> float:
+    try:
+        return ruta.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+class CofreRecuerdos:
+    """Abre los recuerdos del juego: el paquete se carga al abrir el primer cofre."""
+
+    def __init__(self, ruta: str | Path, cache: Path | None = None,
+                 limite: int = LIMITE_CACHE) -> None:
+        self.ruta = Path(ruta)
+        self._directorio_cache = cache
+        self.limite = limite
+        self._paquete: PaqueteRecuerdos | None = None
+        self._cache: CacheRecuerdos | None = None
+
+    @property
+    def paquete(self) -> PaqueteRecuerdos:
+        if self._paquete is None:
+            self._paquete = PaqueteRecuerdos(self.ruta)
+        return self._paquete
+
+    @property
+    def cache(self) -> CacheRecuerdos:
+        if self._cache is None:
+            directorio = self._directorio_cache
+            if directorio is None:
+                from senderos_catalogo import directorio_cache
+                directorio = directorio_cache() / "recuerdos"
+            self._cache = CacheRecuerdos(directorio, self.limite)
+        return self._cache
+
+    def abrir(self, recuerdo: str) -> Path | None:
+        """Ruta del archivo del recuerdo, o ``None`` si el paquete no lo tiene."""
+        recurso = self.paquete.buscar(recuerdo)
+        if recurso is None:
+            return None
+        return self.cache.obtener(self.paquete, recurso)
+
+
+def empaquetar(archivos: Mapping[str, Path], destino: Path) -> tuple[int, int]:
+    """Escribe el paquete de ``archivos`` (recuerdo → archivo).
+
+    Devuelve cuántos recuerdos y cuántos bloques distintos se guardaron.
+    """
+    claves: dict[int, str] = {}
+    por_hash: dict[bytes, int] = {}
+    registros: list[bytes] = []
+    bloque_de: dict[int, int] = {}
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_name(destino.name + ".tmp")
+    # Los datos se escriben primero aparte: el índice va delante y depende de ellos.
+    temporal_datos = destino.with_name(destino.name + ".datos.tmp")
+    with open(temporal_datos, "w+b") as datos:
+        for recuerdo, ruta in archivos.items():
+            clave = clave_texto(recuerdo)
+            if clave in claves and claves[clave] != recuerdo:
+                raise ErrorRecuerdos(f"Dos recuerdos distintos comparten la clave {clave:016x}.")
+            claves[clave] = recuerdo
+            contenido = Path(ruta).read_bytes()
+            digesto = hashlib.blake2b(contenido, digest_size=16).digest()
+            if digesto not in por_hash:
+                comprimido = zlib.compress(contenido, 9)
+                codec = ZLIB if len(comprimido) <= AHORRO_MINIMO * len(contenido) else CRUDO
+                guardado = comprimido if codec == ZLIB else contenido
+                extension = Path(ruta).suffix.lower().encode("ascii", "ignore")[:7]
+                registros.append(_BLOQUE.pack(digesto, datos.tell(), len(guardado),
+                                              len(contenido), codec, extension))
+                datos.write(guardado)
+                por_hash[digesto] = len(registros) - 1
+            bloque_de[clave] = por_hash[digesto]
+
+        orden = sorted(claves)
+        with open(temporal, "wb") as archivo:
+            archivo.write(_CABECERA.pack(_MAGICO, VERSION_RECUERDOS, len(orden), len(registros)))
+            archivo.write(struct.pack(f"<{len(orden)}Q", *orden))
+            archivo.write(struct.pack(f"<{len(orden)}I", *(bloque_de[clave] for clave in orden)))
+            archivo.write(b"".join(registros))
+            datos.seek(0)
+            while parte := datos.read(TAMANO_TRANSMISION):
+                archivo.write(parte)
+    temporal_datos.unlink()
+    os.replace(temporal, destino)
+    return len(orden), len(registros)
+
+
+def recuerdos_caminos(caminos: Iterable[Camino]) -> list[str]:
+    """Recuerdos de los capítulos de ``caminos``, sin repetir y en orden."""
+    recuerdos: dict[str, None] = {}
+    for camino in caminos:
+        for capitulo in camino.capitulos:
+            if capitulo.recompensa.recuerdo:
+                recuerdos[capitulo.recompensa.recuerdo] = None
+    return list(recuerdos)
+
+
+def activar(ruta: str | Path, cache: Path | None = None,
+            limite: int = LIMITE_CACHE) -> CofreRecuerdos:
+    """Hace que los cofres del juego abran los archivos del paquete de ``ruta``.
+
+    El paquete se abre (y se comprueba su cabecera) aquí y no en el primer
+    cofre, para que una ruta equivocada se avise al arrancar y no a mitad
+    de un capítulo. Lanza ``OSError`` o ``ErrorRecuerdos``.
+    """
+    cofre = CofreRecuerdos(ruta, cache, limite)
+    cofre.paquete
+    senderos_de_luz.RECUERDOS = cofre
+    return cofre
+
+
+def desactivar() -> None:
+    senderos_de_luz.RECUERDOS = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Paquete de archivos del Cofre de Recuerdos.")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+    plantilla = ordenes.add_parser(
+        "plantilla", help="escribe (o completa) un JSON recuerdo → archivo")
+    plantilla.add_argument("destino")
+    plantilla.add_argument("--catalogo", nargs="+", metavar="RUTA",
+                           help="usa los caminos de estos archivos JSON")
+    empaquetar_ = ordenes.add_parser("empaquetar", help="crea el paquete desde un JSON")
+    empaquetar_.add_argument("origen")
+    empaquetar_.add_argument("destino")
+    listar = ordenes.add_parser("listar", help="muestra el contenido de un paquete")
+    listar.add_argument("paquete")
+    listar.add_argument("--catalogo", nargs="+", metavar="RUTA")
+    args = parser.parse_args()
+
+    caminos = CAMINOS
+    if getattr(args, "catalogo", None):
+        from senderos_catalogo import ErrorCatalogo, cargar_catalogo
+        try:
+            caminos = cargar_catalogo(args.catalogo)
+        except ErrorCatalogo as error:
+            raise SystemExit(f"Catálogo inválido: {error}") from None
+
+    if args.orden == "plantilla":
+        destino = Path(args.destino)
+        existentes = json.loads(destino.read_text(encoding="utf-8")) if destino.exists() else {}
+        archivos = {recuerdo: existentes.get(recuerdo, "")
+                    for recuerdo in recuerdos_caminos(caminos)}
+        destino.write_text(json.dumps(archivos, ensure_ascii=False, indent=2), encoding="utf-8")
+        pendientes = sum(1 for ruta in archivos.values() if not ruta)
+        print(f"{len(archivos)} recuerdos en {destino} ({pendientes} sin archivo).")
+    elif args.orden == "empaquetar":
+        origen = Path(args.origen)
+        with open(origen, encoding="utf-8") as archivo:
+            manifiesto = json.load(archivo)
+        # Las rutas relativas se toman desde la carpeta del JSON.
+        archivos = {recuerdo: origen.parent / ruta
+                    for recuerdo, ruta in manifiesto.items() if ruta}
+        recuerdos, bloques = empaquetar(archivos, Path(args.destino))
+        print(f"{recuerdos} recuerdos ({bloques} archivos distintos) en {args.destino}.")
+    else:
+        paquete = PaqueteRecuerdos(args.paquete)
+        print(f"{len(paquete)} recuerdos, {paquete.bloques} archivos distintos.")
+        for recuerdo in recuerdos_caminos(caminos):
+            recurso = paquete.buscar(recuerdo)
+            estado = "(sin archivo)" if recurso is None else \
+                f"{recurso.tamano:>10} bytes {recurso.extension or '-':<6} {recurso.hash[:12]}"
+            print(f"{estado}  {recuerdo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Servidor asyncio para jugar Senderos de Luz en grupo.
+
+Cada conexión TCP es una partida conducida por ``MotorSesion`` dentro del
+mismo bucle de eventos, sin un hilo por jugador. El protocolo es de líneas
+JSON: el servidor envía ``{"salida": [...], "solicitud": {...} | null}`` y
+el cliente responde con una línea de texto por cada solicitud.
+
+Órdenes::
+
+    python3 senderos_servidor.py servir              # aloja las partidas
+    python3 senderos_servidor.py jugar               # cliente para una persona
+    python3 senderos_servidor.py carga --sesiones 2000 --concurrencia 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import atexit
+import json
+import random
+import socket
+import time
+from contextlib import suppress
+from functools import partial
+
+from senderos_bitacora import activar as activar_bitacora
+from senderos_equipos import activar as activar_equipos
+from senderos_libro import activar as activar_libro
+from senderos_tablero import activar as activar_tablero
+import senderos_de_luz
+from senderos_de_luz import (ANCHO_TEXTO, POZO_PREDETERMINADO, Flujo, Jugador, MotorSesion,
+                             Solicitar, menu_principal, solicitar_datos_jugador)
+from senderos_metricas import activar
+from senderos_pantalla import Pantalla
+from senderos_sesiones import INACTIVIDAD, GestorSesiones
+from senderos_simulador import LIMITE_RESPUESTAS, JugadorVirtual
+
+PUERTO = 7777
+# Segundos entre informes de sesiones residentes e hibernadas.
+INTERVALO_INFORME = 60
+
+
+def _mensaje(solicitud: Solicitar | None, salida: list[str]) -> bytes:
+    datos = {
+        "salida": salida,
+        "solicitud": None if solicitud is None else {
+            "mensaje": solicitud.mensaje,
+            "clave": solicitud.clave,
+            "opciones": list(solicitud.opciones),
+        },
+    }
+    return json.dumps(datos, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+async def atender(lector: asyncio.StreamReader, escritor: asyncio.StreamWriter,
+                  ancho: int = ANCHO_TEXTO, equipo: str = "",
+                  gestor: GestorSesiones | None = None) -> None:
+    """Conduce una partida completa sobre una conexión.
+
+    Con ``gestor``, la sesión puede hibernar mientras espera en el menú.
+    """
+    jugador: Jugador | None = None
+
+    def conducir() -> Flujo[None]:
+        nonlocal jugador
+        jugador = yield from solicitar_datos_jugador(equipo=equipo)
+        yield from menu_principal(jugador)
+
+    if gestor is None:
+        sesion = MotorSesion(conducir(), ancho)
+        salida = sesion.iniciar()
+        enviar = sesion.enviar
+    else:
+        sesion, salida = gestor.abrir(equipo=equipo)
+        enviar = partial(gestor.enviar, sesion)
+    try:
+        while True:
+            escritor.write(_mensaje(sesion.solicitud, salida))
+            await escritor.drain()
+            if sesion.terminado:
+                break
+            linea = await lector.readline()
+            if not linea:
+                break
+            salida = enviar(linea.decode("utf-8", "replace").rstrip("\r\n"))
+    except ConnectionError:
+        pass
+    finally:
+        # Quien se desconecta deja el tablero (con gestor, al cerrar la sesión).
+        if gestor is not None:
+            gestor.cerrar(sesion)
+        elif jugador is not None and senderos_de_luz.TABLERO is not None:
+            senderos_de_luz.TABLERO.quitar(jugador)
+        escritor.close()
+        with suppress(ConnectionError):
+            await escritor.wait_closed()
+
+
+async def _informar(gestor: GestorSesiones) -> None:
+    while True:
+        await asyncio.sleep(INTERVALO_INFORME)
+        print(gestor.informe(), flush=True)
+
+
+async def servir(anfitrion: str, puerto: int, ancho: int, equipo: str = "",
+                 gestor: GestorSesiones | None = None) -> None:
+    servidor = await asyncio.start_server(
+        lambda lector, escritor: atender(lector, escritor, ancho, equipo, gestor),
+        anfitrion, puerto)
+    print(f"Senderos de Luz escuchando en {anfitrion}:{puerto}")
+    if gestor is not None:
+        informe = asyncio.create_task(_informar(gestor))
+    async with servidor:
+        try:
+            await servidor.serve_forever()
+        finally:
+            if gestor is not None:
+                informe.cancel()
+                print(gestor.informe())
+
+
+def jugar(anfitrion: str, puerto: int) -> None:
+    """Cliente de consola para una persona."""
+    pantalla = Pantalla()
+    with socket.create_connection((anfitrion, puerto)) as conexion:
+        archivo = conexion.makefile("rwb")
+        for linea in archivo:
+            datos = json.loads(linea)
+            if datos["solicitud"] is None:
+                pantalla.dibujar(datos["salida"])
+                return
+            pantalla.dibujar(datos["salida"], datos["solicitud"]["mensaje"])
+            respuesta = input()
+            archivo.write(respuesta.encode("utf-8") + b"\n")
+            archivo.flush()
+
+
+async def _sesion_virtual(anfitrion: str, puerto: int, semilla: int,
+                          latencias: list[float]) -> None:
+    virtual = JugadorVirtual(random.Random(semilla))
+    lector, escritor = await asyncio.open_connection(anfitrion, puerto)
+    try:
+        datos = json.loads(await lector.readline())
+        for _ in range(LIMITE_RESPUESTAS):
+            if datos["solicitud"] is None:
+                return
+            solicitud = Solicitar(**{**datos["solicitud"],
+                                     "opciones": tuple(datos["solicitud"]["opciones"])})
+            inicio = time.perf_counter()
+            escritor.write(virtual.responder(solicitud).encode("utf-8") + b"\n")
+            linea = await lector.readline()
+            latencias.append(time.perf_counter() - inicio)
+            if not linea:
+                raise ConnectionError("El servidor cerró la conexión a mitad de partida.")
+            datos = json.loads(linea)
+        raise RuntimeError(f"La sesión {semilla} superó {LIMITE_RESPUESTAS} respuestas.")
+    finally:
+        escritor.close()
+        with suppress(ConnectionError):
+            await escritor.wait_closed()
+
+
+async def carga(anfitrion: str, puerto: int, sesiones: int, concurrencia: int) -> None:
+    """Lanza partidas virtuales simultáneas y mide la latencia por respuesta."""
+    limite = asyncio.Semaphore(concurrencia)
+    latencias: list[float] = []
+
+    async def una(semilla: int) -> None:
+        async with limite:
+            await _sesion_virtual(anfitrion, puerto, semilla, latencias)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(una(semilla) for semilla in range(sesiones)))
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+
+    def percentil(p: float) -> float:
+        return latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000
+
+    print(f"{sesiones} sesiones ({concurrencia} simultáneas) en {duracion:.2f} s: "
+          f"{sesiones / duracion:.0f} sesiones/s, {len(latencias) / duracion:.0f} respuestas/s")
+    print(f"Latencia por respuesta: p50 {percentil(0.50):.2f} ms, "
+          f"p99 {percentil(0.99):.2f} ms, máx {latencias[-1] * 1000:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--anfitrion", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+    servir_ = ordenes.add_parser("servir", help="aloja partidas simultáneas")
+    servir_.add_argument("--ancho", type=int, default=ANCHO_TEXTO)
+    servir_.add_argument("--metricas", metavar="ARCHIVO",
+                         help="exporta métricas de los pasos a ARCHIVO (Prometheus)")
+    servir_.add_argument("--bitacora", metavar="ARCHIVO",
+                         help="añade los eventos de todas las partidas a ARCHIVO (JSONL)")
+    servir_.add_argument("--tablero", action="store_true",
+                         help="clasifica por gemas a todos los jugadores conectados")
+    servir_.add_argument("--equipo", metavar="NOMBRE",
+                         help="todos los jugadores comparten las virtudes de este equipo")
+    servir_.add_argument("--pozo", default=POZO_PREDETERMINADO, metavar="ARCHIVO",
+                         help="base SQLite de las virtudes de los equipos")
+    servir_.add_argument("--libro", metavar="ARCHIVO",
+                         help="anota las recompensas de todas las partidas en ARCHIVO (SQLite)")
+    servir_.add_argument("--hibernar", metavar="CARPETA",
+                         help="guarda en CARPETA las sesiones inactivas cuando falta memoria")
+    servir_.add_argument("--memoria-sesiones", type=float, default=256, metavar="MB",
+                         help="memoria para sesiones residentes antes de hibernar (256)")
+    servir_.add_argument("--inactividad", type=float, default=INACTIVIDAD, metavar="S",
+                         help=f"segundos sin responder para poder hibernar ({INACTIVIDAD:g})")
+    ordenes.add_parser("jugar", help="se conecta como jugador")
+    carga_ = ordenes.add_parser("carga", help="prueba de carga con jugadores virtuales")
+    carga_.add_argument("--sesiones", type=int, default=1000)
+    carga_.add_argument("--concurrencia", type=int, default=100)
+    args = parser.parse_args()
+
+    try:
+        if args.orden == "servir":
+            if args.metricas:
+                atexit.register(activar(args.metricas).exportar)
+            if args.bitacora:
+                atexit.register(activar_bitacora(args.bitacora).cerrar)
+            if args.tablero:
+                activar_tablero()
+            if args.equipo:
+                atexit.register(activar_equipos(args.pozo).cerrar)
+            if args.libro:
+                atexit.register(activar_libro(args.libro).cerrar)
+            gestor = None
+            if args.hibernar:
+                gestor = GestorSesiones(args.hibernar, int(args.memoria_sesiones * 1024 * 1024),
+                                        args.inactividad, ancho=args.ancho)
+            asyncio.run(servir(args.anfitrion, args.puerto, args.ancho, args.equipo or "",
+                               gestor))
+        elif args.orden == "jugar":
+            jugar(args.anfitrion, args.puerto)
+        else:
+            asyncio.run(carga(args.anfitrion, args.puerto, args.sesiones, args.concurrencia))
+    except KeyboardInterrupt:
+        print("\nConexión terminada. Que la paz te acompañe.")
+
+
+if __name__ == "__main__":
+    main()
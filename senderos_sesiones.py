@@ -0,0 +1,230 @@
+"""Hibernación de sesiones inactivas en un anfitrión de larga duración.
+
+``GestorSesiones`` conduce cada partida en dos tramos (registro y menú
+principal) y lleva la hora de la última respuesta de cada sesión. Cuando
+la memoria estimada de las sesiones residentes supera ``presupuesto``, las
+inactivas que llevan más tiempo sin responder se guardan en disco con el
+formato de ``senderos_progreso`` y se sueltan de la memoria.
+
+Solo se hiberna una sesión que espera en el menú principal: ahí todo su
+estado está en el ``Jugador``, así que al llegar su siguiente respuesta
+se carga la instantánea, se crea otra vez el flujo del menú y se le pasa
+la respuesta, sin que el jugador note nada.
+
+Mientras una sesión hiberna, su jugador sigue en el tablero de gemas (si
+hay uno activo) con una copia mínima (nombre, grupo y gemas), que el
+jugador cargado sustituye al rehidratarse; al cerrar la sesión sale del
+tablero.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import senderos_de_luz
+from senderos_de_luz import (ANCHO_TEXTO, IDIOMA_BASE, Camino, Jugador, MotorSesion, Solicitar,
+                             menu_principal, solicitar_datos_jugador)
+from senderos_progreso import cargar, guardar
+
+# Bytes estimados de una sesión en el menú (motor, flujos y jugador) y de
+# cada testimonio además de su texto, medidos con ``tracemalloc``.
+MEMORIA_SESION = 1300
+MEMORIA_TESTIMONIO = 120
+
+# Segundos sin responder a partir de los cuales una sesión puede hibernar.
+INACTIVIDAD = 60.0
+
+# Rehidrataciones cuya latencia se conserva para el informe.
+MUESTRAS_LATENCIA = 1024
+
+
+@dataclass(slots=True)
+class Sesion:
+    numero: int
+    motor: MotorSesion | None
+    jugador: Jugador | None = None
+    ultima: float = 0.0
+    tamano: int = MEMORIA_SESION
+    # Testimonios ya sumados en ``tamano``.
+    contados: int = 0
+    instantanea: Path | None = None
+
+    @property
+    def hibernada(self) -> bool:
+        return self.motor is None
+
+    @property
+    def solicitud(self) -> Solicitar | None:
+        return None if self.motor is None else self.motor.solicitud
+
+    @property
+    def terminado(self) -> bool:
+        return self.motor is not None and self.motor.terminado
+
+
+class GestorSesiones:
+    """Sesiones residentes e hibernadas de un anfitrión."""
+
+    def __init__(self, directorio: str | Path, presupuesto: int,
+                 inactividad: float = INACTIVIDAD, caminos: Sequence[Camino] | None = None,
+                 ancho: int | None = ANCHO_TEXTO,
+                 reloj: Callable[[], float] = time.monotonic) -> None:
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.presupuesto = presupuesto
+        self.inactividad = inactividad
+        self.caminos = caminos
+        self.ancho = ancho
+        self.reloj = reloj
+        # Sesiones residentes de la menos a la más recientemente usada.
+        self._residentes: OrderedDict[int, Sesion] = OrderedDict()
+        self._hibernadas: dict[int, Sesion] = {}
+        self._numeros = itertools.count(1)
+        self.memoria = 0
+        self.hibernaciones = 0
+        self.rehidrataciones = 0
+        self._latencias: deque[float] = deque(maxlen=MUESTRAS_LATENCIA)
+
+    # --- Conducción de las partidas ---------------------------------------
+
+    def abrir(self, idioma: str = IDIOMA_BASE, equipo: str = "") -> tuple[Sesion, list[str]]:
+        """Empieza una partida nueva; devuelve la sesión y sus primeros textos."""
+        motor = MotorSesion(solicitar_datos_jugador(idioma, equipo), self.ancho)
+        sesion = Sesion(next(self._numeros), motor, ultima=self.reloj())
+        self._residentes[sesion.numero] = sesion
+        self.memoria += sesion.tamano
+        return sesion, self._seguir(sesion, motor.iniciar())
+
+    def enviar(self, sesion: Sesion, respuesta: str) -> list[str]:
+        """Pasa la respuesta a la sesión, rehidratándola si hace falta."""
+        if sesion.hibernada:
+            self._rehidratar(sesion)
+        sesion.ultima = self.reloj()
+        self._residentes.move_to_end(sesion.numero)
+        salida = self._seguir(sesion, sesion.motor.enviar(respuesta))
+        self._medir(sesion)
+        self.liberar()
+        return salida
+
+    def _seguir(self, sesion: Sesion, salida: list[str]) -> list[str]:
+        # Al terminar el registro empieza el menú principal, en la misma sesión.
+        if sesion.jugador is None and sesion.motor.terminado:
+            sesion.jugador = sesion.motor.resultado
+            sesion.motor = MotorSesion(menu_principal(sesion.jugador, self.caminos), self.ancho)
+            salida = salida + sesion.motor.iniciar()
+        return salida
+
+    def cerrar(self, sesion: Sesion) -> None:
+        """Olvida la sesión (p. ej., al desconectarse) y borra su instantánea."""
+        if sesion.jugador is not None and senderos_de_luz.TABLERO is not None:
+            senderos_de_luz.TABLERO.quitar(sesion.jugador)
+        if self._residentes.pop(sesion.numero, None) is not None:
+            self.memoria -= sesion.tamano
+        self._hibernadas.pop(sesion.numero, None)
+        if sesion.instantanea is not None:
+            sesion.instantanea.unlink(missing_ok=True)
+            sesion.instantanea = None
+
+    # --- Memoria ----------------------------------------------------------
+
+    def _medir(self, sesion: Sesion) -> None:
+        testimonios = sesion.jugador.testimonios if sesion.jugador else ()
+        nuevos = testimonios[sesion.contados:]
+        if nuevos:
+            crecimiento = sum(MEMORIA_TESTIMONIO + len(registro.texto) for registro in nuevos)
+            sesion.tamano += crecimiento
+            self.memoria += crecimiento
+            sesion.contados = len(testimonios)
+
+    def _puede_hibernar(self, sesion: Sesion, ahora: float) -> bool:
+        solicitud = sesion.solicitud
+        return (sesion.jugador is not None and solicitud is not None
+                and solicitud.clave == "menu" and ahora - sesion.ultima >= self.inactividad)
+
+    def liberar(self) -> int:
+        """Hiberna sesiones inactivas hasta volver al presupuesto; devuelve cuántas."""
+        if self.memoria <= self.presupuesto:
+            return 0
+        ahora = self.reloj()
+        candidatas = []
+        for sesion in self._residentes.values():
+            # El orden es por última actividad: las siguientes son más recientes.
+            if ahora - sesion.ultima < self.inactividad:
+                break
+            if self._puede_hibernar(sesion, ahora):
+                candidatas.append(sesion)
+        hibernadas = 0
+        for sesion in candidatas:
+            if self.memoria <= self.presupuesto:
+                break
+            self._hibernar(sesion)
+            hibernadas += 1
+        return hibernadas
+
+    def _hibernar(self, sesion: Sesion) -> None:
+        jugador = sesion.jugador
+        sesion.instantanea = self.directorio / f"sesion-{os.getpid()}-{sesion.numero}.sav"
+        guardar(jugador, sesion.instantanea)
+        # Sigue en el tablero, pero con una copia mínima: sin sus testimonios
+        # ni su flujo, que son lo que se suelta de la memoria.
+        resumen = Jugador(jugador.nombre, jugador.grupo_edad, jugador.modo,
+                          gemas=jugador.gemas, id=jugador.id)
+        tablero = senderos_de_luz.TABLERO
+        if tablero is not None and resumen in tablero.general:
+            tablero.actualizar(resumen)
+        sesion.motor = None
+        sesion.jugador = resumen
+        del self._residentes[sesion.numero]
+        self._hibernadas[sesion.numero] = sesion
+        self.memoria -= sesion.tamano
+        self.hibernaciones += 1
+
+    def _rehidratar(self, sesion: Sesion) -> None:
+        inicio = time.perf_counter()
+        jugador = cargar(sesion.instantanea)
+        motor = MotorSesion(menu_principal(jugador, self.caminos), self.ancho)
+        # El jugador ya vio el menú: se avanza hasta la solicitud sin mostrarlo.
+        motor.iniciar()
+        if senderos_de_luz.TABLERO is not None and jugador.gemas:
+            senderos_de_luz.TABLERO.actualizar(jugador)
+        sesion.instantanea.unlink(missing_ok=True)
+        sesion.instantanea = None
+        sesion.jugador = jugador
+        sesion.motor = motor
+        sesion.contados = len(jugador.testimonios)
+        del self._hibernadas[sesion.numero]
+        self._residentes[sesion.numero] = sesion
+        self.memoria += sesion.tamano
+        self.rehidrataciones += 1
+        self._latencias.append(time.perf_counter() - inicio)
+
+    # --- Informe ----------------------------------------------------------
+
+    def estadisticas(self) -> dict[str, float]:
+        latencias = sorted(self._latencias)
+
+        def percentil(p: float) -> float:
+            return latencias[min(len(latencias) - 1, int(p * len(latencias)))] if latencias else 0.0
+
+        return {
+            "residentes": len(self._residentes),
+            "hibernadas": len(self._hibernadas),
+            "memoria": self.memoria,
+            "hibernaciones": self.hibernaciones,
+            "rehidrataciones": self.rehidrataciones,
+            "rehidratacion_p50": percentil(0.5),
+            "rehidratacion_p99": percentil(0.99),
+        }
+
+    def informe(self) -> str:
+        datos = self.estadisticas()
+        return (f"Sesiones: {datos['residentes']} residentes, {datos['hibernadas']} hibernadas "
+                f"({datos['memoria'] / 1024:,.0f} KiB de {self.presupuesto / 1024:,.0f} KiB); "
+                f"rehidratación p50 {datos['rehidratacion_p50'] * 1000:.2f} ms, "
+                f"p99 {datos['rehidratacion_p99'] * 1000:.2f} ms")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Simulador por lotes de Senderos de Luz.
+
+Reproduce partidas completas sin terminal usando ``MotorSesion``: ya sea
+con un guion fijo de respuestas o con jugadores virtuales aleatorios que
+recorren todos los caminos. Las partidas se reparten entre varios procesos
+para pruebas de carga y de regresión.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+
+from senderos_bitacora import activar as activar_bitacora
+from senderos_bitacora import desactivar as desactivar_bitacora
+from senderos_de_luz import (CAMINOS, Jugador, MotorSesion, Solicitar, partida,
+                             planificador_misiones)
+
+# Tope de respuestas por partida para detectar flujos que no terminan.
+LIMITE_RESPUESTAS = 10_000
+
+
+@dataclass
+class ResumenPartida:
+    semilla: int
+    gemas: int
+    virtudes: dict[str, int]
+    testimonios: int
+    respuestas: int
+
+
+class JugadorVirtual:
+    """Responde a las solicitudes del motor recorriendo todos los caminos.
+
+    Elige respuestas al azar entre las opciones válidas, por lo que cada
+    Puerta de Sabiduría termina abriéndose tras algunos intentos.
+    """
+
+    def __init__(self, azar: random.Random, prob_mision: float = 0.5,
+                 prob_testimonio: float = 0.5) -> None:
+        self.azar = azar
+        self.prob_mision = prob_mision
+        self.prob_testimonio = prob_testimonio
+        self.pendientes = [str(idx) for idx in range(1, len(CAMINOS) + 1)]
+        self.mision_pendiente = False
+
+    def responder(self, solicitud: Solicitar) -> str:
+        clave = solicitud.clave
+        if clave == "nombre":
+            return f"Peregrino {self.azar.randrange(10_000)}"
+        if clave == "menu":
+            if self.mision_pendiente:
+                self.mision_pendiente = False
+                return "3"
+            if self.pendientes:
+                self.mision_pendiente = self.azar.random() < self.prob_mision
+                return "1"
+            return "5"
+        if clave == "camino":
+            return self.pendientes.pop(0)
+        if clave == "reflexion":
+            if self.azar.random() < self.prob_testimonio:
+                return "Hoy aprendí a confiar un poco más."
+            return ""
+        if solicitud.opciones:
+            return self.azar.choice(solicitud.opciones)
+        return ""
+
+
+def _resumir(motor: MotorSesion, semilla: int, respuestas: int) -> ResumenPartida:
+    jugador: Jugador = motor.resultado
+    return ResumenPartida(
+        semilla=semilla,
+        gemas=jugador.gemas,
+        virtudes=dict(jugador.virtudes),
+        testimonios=len(jugador.testimonios),
+        respuestas=respuestas,
+    )
+
+
+def simular_partida(semilla: int) -> ResumenPartida:
+    """Juega una partida completa con un jugador virtual reproducible."""
+    planificador_misiones().sembrar(semilla)
+    virtual = JugadorVirtual(random.Random(semilla))
+    motor = MotorSesion(partida(), ancho=None)
+    motor.iniciar()
+    respuestas = 0
+    while not motor.terminado:
+        respuestas += 1
+        if respuestas > LIMITE_RESPUESTAS:
+            raise RuntimeError(f"La partida {semilla} superó {LIMITE_RESPUESTAS} respuestas.")
+        motor.enviar(virtual.responder(motor.solicitud))
+    return _resumir(motor, semilla, respuestas)
+
+
+def ejecutar_guion(respuestas: list[str], semilla: int = 0) -> ResumenPartida:
+    """Reproduce una partida respondiendo en orden con ``respuestas``."""
+    planificador_misiones().sembrar(semilla)
+    motor = MotorSesion(partida(), ancho=None)
+    motor.iniciar()
+    for usadas, respuesta in enumerate(respuestas):
+        if motor.terminado:
+            raise ValueError(f"El guion tiene {len(respuestas) - usadas} respuestas de sobra.")
+        motor.enviar(respuesta)
+    if not motor.terminado:
+        raise ValueError(f"El guion terminó esperando: {motor.solicitud.mensaje!r}")
+    return _resumir(motor, semilla, len(respuestas))
+
+
+def _preparar_proceso(bitacora: str | None) -> None:
+    if bitacora:
+        # Los procesos del grupo terminan con ``os._exit`` y no ejecutan
+        # ``atexit``; ``Finalize`` sí se ejecuta al apagarse el proceso, y
+        # vacía la última tanda de eventos.
+        registro = activar_bitacora(bitacora)
+        Finalize(registro, registro.cerrar, exitpriority=10)
+
+
+def simular_lote(cantidad: int, procesos: int | None = None, semilla_base: int = 0,
+                 bitacora: str | None = None) -> list[ResumenPartida]:
+    """Simula ``cantidad`` partidas repartidas entre ``procesos`` procesos.
+
+    Con ``bitacora``, cada proceso añade los eventos de sus partidas a ese
+    archivo JSONL.
+    """
+    semillas = range(semilla_base, semilla_base + cantidad)
+    if procesos == 1:
+        _preparar_proceso(bitacora)
+        try:
+            return [simular_partida(semilla) for semilla in semillas]
+        finally:
+            desactivar_bitacora()
+    procesos = procesos or os.cpu_count() or 1
+    bloque = max(1, cantidad // (procesos * 4))
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_preparar_proceso,
+                             initargs=(bitacora,)) as grupo:
+        return list(grupo.map(simular_partida, semillas, chunksize=bloque))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partidas", type=int, default=1000)
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="procesos de trabajo (por defecto, uno por núcleo)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--guion", help="archivo con una respuesta por línea")
+    parser.add_argument("--bitacora", metavar="ARCHIVO",
+                        help="añade los eventos de las partidas a ARCHIVO (JSONL)")
+    args = parser.parse_args()
+
+    if args.guion:
+        with open(args.guion, encoding="utf-8") as archivo:
+            respuestas = archivo.read().splitlines()
+        print(ejecutar_guion(respuestas, args.semilla))
+        return
+
+    inicio = time.perf_counter()
+    resumenes = simular_lote(args.partidas, args.procesos, args.semilla, args.bitacora)
+    duracion = time.perf_counter() - inicio
+    gemas = sum(resumen.gemas for resumen in resumenes) / len(resumenes)
+    print(f"{len(resumenes)} partidas en {duracion:.2f} s "
+          f"({len(resumenes) / duracion:.0f} partidas/s)")
+    print(f"Gemas promedio por partida: {gemas:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Clasificación de gemas de todos los jugadores de un servidor o un salón.
+
+Después de ``activar``, cada ``Jugador.ganar_gemas`` actualiza el tablero,
+que lleva una clasificación general y una por grupo de edad.
+
+Cada ``Clasificacion`` cuenta cuántos jugadores tienen cada cantidad de
+gemas en un árbol de Fenwick (un ``array`` de enteros) y guarda a los
+jugadores agrupados por cantidad:
+
+* mover a un jugador de una cantidad a otra cuesta O(log G), donde G es la
+  mayor cantidad de gemas (no depende de cuántos jugadores haya);
+* su posición es 1 más los jugadores con más gemas que él: O(log G);
+* los ``k`` primeros se recorren de mayor a menor saltando las cantidades
+  que nadie tiene: O(k + d log G), con d cantidades distintas recorridas.
+
+Los empates comparten posición; dentro de un empate, ``primeros`` muestra
+antes a quien llegó primero a esa cantidad. Los jugadores se identifican por
+``Jugador.id``, así que la copia cargada de una partida sustituye a la
+anterior; quien se desconecta debe salir con ``quitar``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from itertools import islice
+
+import senderos_de_luz
+from senderos_de_luz import Jugador
+
+# Cantidades de gemas que se reservan al principio; el árbol se duplica si
+# alguien las supera.
+CAPACIDAD_INICIAL = 1024
+
+
+class Clasificacion:
+    """Jugadores ordenados por gemas."""
+
+    def __init__(self) -> None:
+        self._arbol = array("q", [0]) * (CAPACIDAD_INICIAL + 1)
+        # gemas → jugadores con esa cantidad, en orden de llegada.
+        self._por_gemas: dict[int, dict[str, Jugador]] = {}
+        # jugador.id → gemas con que figura en la clasificación.
+        self._gemas: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._gemas)
+
+    def __contains__(self, jugador: Jugador) -> bool:
+        return jugador.id in self._gemas
+
+    # --- Árbol de Fenwick: posición i (desde 1) = cantidad de gemas i - 1 ---
+
+    def _sumar(self, gemas: int, cambio: int) -> None:
+        arbol = self._arbol
+        indice = gemas + 1
+        tamano = len(arbol) - 1
+        while indice <= tamano:
+            arbol[indice] += cambio
+            indice += indice & -indice
+
+    def _hasta(self, gemas: int) -> int:
+        """Jugadores con ``gemas`` o menos."""
+        arbol = self._arbol
+        indice = min(gemas + 1, len(arbol) - 1)
+        total = 0
+        while indice > 0:
+            total += arbol[indice]
+            indice -= indice & -indice
+        return total
+
+    def _cantidad_del(self, orden: int) -> int:
+        """Gemas del jugador ``orden`` (desde 1) contando de menor a mayor."""
+        arbol = self._arbol
+        tamano = len(arbol) - 1
+        posicion = 0
+        paso = 1 << (tamano.bit_length() - 1)
+        while paso:
+            siguiente = posicion + paso
+            if siguiente <= tamano and arbol[siguiente] < orden:
+                posicion = siguiente
+                orden -= arbol[siguiente]
+            paso >>= 1
+        return posicion  # índice ``posicion + 1`` → ``posicion`` gemas
+
+    def _crecer(self, gemas: int) -> None:
+        capacidad = len(self._arbol) - 1
+        while capacidad <= gemas:
+            capacidad *= 2
+        self._arbol = array("q", [0]) * (capacidad + 1)
+        for cantidad, jugadores in self._por_gemas.items():
+            self._sumar(cantidad, len(jugadores))
+
+    # --- Operaciones ----------------------------------------------------------
+
+    def actualizar(self, jugador: Jugador, gemas: int | None = None) -> None:
+        """Registra al jugador con ``gemas`` (por defecto, las que tiene)."""
+        gemas = max(0, jugador.gemas if gemas is None else gemas)
+        clave = jugador.id
+        anterior = self._gemas.get(clave)
+        if anterior == gemas:
+            # Puede ser otra copia del mismo jugador: se guarda la más reciente.
+            self._por_gemas[gemas][clave] = jugador
+            return
+        if anterior is not None:
+            self._quitar(clave, anterior)
+        if gemas >= len(self._arbol) - 1:
+            self._crecer(gemas)
+        self._gemas[clave] = gemas
+        self._por_gemas.setdefault(gemas, {})[clave] = jugador
+        self._sumar(gemas, 1)
+
+    def _quitar(self, clave: str, gemas: int) -> None:
+        jugadores = self._por_gemas[gemas]
+        del jugadores[clave]
+        if not jugadores:
+            del self._por_gemas[gemas]
+        self._sumar(gemas, -1)
+
+    def quitar(self, jugador: Jugador) -> None:
+        gemas = self._gemas.pop(jugador.id, None)
+        if gemas is not None:
+            self._quitar(jugador.id, gemas)
+
+    def posicion(self, jugador: Jugador) -> int | None:
+        """Posición del jugador (1 es el primero), o ``None`` si no figura."""
+        gemas = self._gemas.get(jugador.id)
+        if gemas is None:
+            return None
+        return len(self._gemas) - self._hasta(gemas) + 1
+
+    def primeros(self, cantidad: int = 10) -> list[tuple[int, Jugador, int]]:
+        """``(posición, jugador, gemas)`` de los ``cantidad`` primeros."""
+        resultado: list[tuple[int, Jugador, int]] = []
+        # Jugadores por debajo de la última cantidad recorrida.
+        debajo = len(self._gemas)
+        while debajo and len(resultado) < cantidad:
+            gemas = self._cantidad_del(debajo)
+            jugadores = self._por_gemas[gemas]
+            posicion = len(self._gemas) - debajo + 1
+            for jugador in islice(jugadores.values(), cantidad - len(resultado)):
+                resultado.append((posicion, jugador, gemas))
+            debajo -= len(jugadores)
+        return resultado
+
+
+class TableroGemas:
+    """Clasificación general y una por grupo de edad."""
+
+    def __init__(self) -> None:
+        self.general = Clasificacion()
+        self.grupos: dict[str, Clasificacion] = {}
+
+    def __len__(self) -> int:
+        return len(self.general)
+
+    def clasificacion(self, grupo_edad: str | None = None) -> Clasificacion:
+        if grupo_edad is None:
+            return self.general
+        return self.grupos.setdefault(grupo_edad, Clasificacion())
+
+    def actualizar(self, jugador: Jugador) -> None:
+        self.general.actualizar(jugador)
+        self.clasificacion(jugador.grupo_edad).actualizar(jugador)
+
+    def quitar(self, jugador: Jugador) -> None:
+        self.general.quitar(jugador)
+        self.clasificacion(jugador.grupo_edad).quitar(jugador)
+
+    def posicion(self, jugador: Jugador, grupo_edad: str | None = None) -> int | None:
+        return self.clasificacion(grupo_edad).posicion(jugador)
+
+    def primeros(self, cantidad: int = 10,
+                 grupo_edad: str | None = None) -> list[tuple[int, Jugador, int]]:
+        return self.clasificacion(grupo_edad).primeros(cantidad)
+
+
+def activar() -> TableroGemas:
+    """Empieza a clasificar a los jugadores y devuelve el tablero."""
+    tablero = TableroGemas()
+    senderos_de_luz.TABLERO = tablero
+    return tablero
+
+
+def desactivar() -> None:
+    senderos_de_luz.TABLERO = None
@@ -0,0 +1,186 @@
+"""Índices para consultar el Árbol de Testimonios.
+
+``ArbolTestimonios`` indexa la lista de testimonios de un jugador por
+camino, capítulo, fecha y por las palabras de cada texto. Los índices se
+ponen al día de forma incremental (solo los testimonios nuevos) y las
+consultas devuelven un iterador, así que mostrar una página cuesta lo mismo
+con diez testimonios que con diez mil.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date
+from itertools import islice
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from senderos_de_luz import Testimonio
+
+_PALABRA = re.compile(r"\w+")
+
+T = TypeVar("T")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes: ``"Justicia"`` y ``"justícia"`` coinciden."""
+    descompuesto = unicodedata.normalize("NFD", texto.casefold())
+    return "".join(letra for letra in descompuesto if not unicodedata.combining(letra))
+
+
+def tokenizar(texto: str) -> list[str]:
+    return _PALABRA.findall(normalizar(texto))
+
+
+def paginar(elementos: Iterable[T], tamano: int) -> Iterator[list[T]]:
+    """Agrupa un iterador en páginas sin materializarlo completo."""
+    iterador = iter(elementos)
+    while pagina := list(islice(iterador, tamano)):
+        yield pagina
+
+
+def _frase(texto: str) -> str:
+    """Clave de un nombre de varias palabras, sin tildes ni puntuación."""
+    return " ".join(tokenizar(texto))
+
+
+def _contiene(ordenadas: Sequence[int], valor: int) -> bool:
+    indice = bisect_left(ordenadas, valor)
+    return indice < len(ordenadas) and ordenadas[indice] == valor
+
+
+class ArbolTestimonios:
+    """Índices sobre una lista de testimonios que solo crece.
+
+    La lista se comparte con el jugador: los testimonios nuevos se indexan
+    al hacer la siguiente consulta.
+    """
+
+    def __init__(self, testimonios: Sequence[Testimonio]) -> None:
+        self._testimonios = testimonios
+        self._indexados = 0
+        self._por_capitulo: dict[int, array] = {}
+        self._por_camino: dict[str, array] = {}
+        self._por_titulo: dict[str, array] = {}
+        self._palabras: dict[str, array] = {}
+        # Pares (fecha, posición) ordenados, para consultas por rango.
+        self._fechas: list[tuple[int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._testimonios)
+
+    def actualizar(self) -> None:
+        for posicion in range(self._indexados, len(self._testimonios)):
+            testimonio = self._testimonios[posicion]
+            self._por_capitulo.setdefault(testimonio.capitulo_id, array("I")).append(posicion)
+            self._por_camino.setdefault(_frase(testimonio.camino), array("I")).append(posicion)
+            self._por_titulo.setdefault(_frase(testimonio.capitulo), array("I")).append(posicion)
+            for palabra in set(tokenizar(testimonio.texto)):
+                self._palabras.setdefault(palabra, array("I")).append(posicion)
+            entrada = (testimonio.fecha, posicion)
+            if self._fechas and entrada < self._fechas[-1]:
+                self._fechas.insert(bisect_left(self._fechas, entrada), entrada)
+            else:
+                self._fechas.append(entrada)
+        self._indexados = len(self._testimonios)
+
+    def caminos(self) -> list[str]:
+        self.actualizar()
+        return list(self._por_camino)
+
+    def buscar(self, camino: str | None = None, capitulo_id: int | None = None,
+               desde: date | None = None, hasta: date | None = None,
+               palabras: Iterable[str] = (), titulo: str | None = None) -> Iterator[Testimonio]:
+        """Testimonios que cumplen todos los filtros.
+
+        ``titulo`` es el título de un capítulo; coincide en cualquier camino.
+
+        Se devuelven en orden de registro, salvo cuando el único filtro es
+        la fecha: entonces salen en orden cronológico.
+        """
+        self.actualizar()
+        candidatos: list[Sequence[int]] = []
+        if camino is not None:
+            candidatos.append(self._por_camino.get(_frase(camino), ()))
+        if capitulo_id is not None:
+            candidatos.append(self._por_capitulo.get(capitulo_id, ()))
+        if titulo is not None:
+            candidatos.append(self._por_titulo.get(_frase(titulo), ()))
+        for palabra in palabras:
+            for token in tokenizar(palabra):
+                candidatos.append(self._palabras.get(token, ()))
+        primero = desde.toordinal() if desde else 0
+        ultimo = hasta.toordinal() if hasta else date.max.toordinal()
+        por_fecha = desde is not None or hasta is not None
+
+        if not candidatos:
+            if not por_fecha:
+                return islice(self._testimonios, self._indexados)
+            inicio = bisect_left(self._fechas, (primero, -1))
+            fin = bisect_right(self._fechas, (ultimo + 1, -1))
+            return (self._testimonios[posicion]
+                    for _, posicion in islice(self._fechas, inicio, fin))
+
+        # Las listas de posiciones están ordenadas: se recorre la más corta y
+        # se comprueba el resto con búsqueda binaria.
+        candidatos.sort(key=len)
+        base, *resto = candidatos
+        if resto:
+            base = (posicion for posicion in base
+                    if all(_contiene(posiciones, posicion) for posiciones in resto))
+        encontrados = (self._testimonios[posicion] for posicion in base)
+        if por_fecha:
+            encontrados = (testimonio for testimonio in encontrados
+                           if primero <= testimonio.fecha <= ultimo)
+        return encontrados
+
+    def filtrar(self, consulta: str) -> Iterator[Testimonio]:
+        """Interpreta una consulta escrita por el jugador.
+
+        Reconoce nombres de camino y títulos de capítulo (aunque tengan
+        varias palabras), fechas ``AAAA-MM-DD`` o ``AAAA-MM`` y, para el
+        resto, busca palabras dentro de los testimonios. Todos los términos
+        deben cumplirse: ``Éxodo confianza`` busca «confianza» en el Éxodo.
+        """
+        self.actualizar()
+        terminos = consulta.split()
+        filtros: dict[str, str] = {}
+        desde = hasta = None
+        palabras = []
+        inicio = 0
+        while inicio < len(terminos):
+            termino = terminos[inicio]
+            try:
+                if re.fullmatch(r"\d{4}-\d{2}-\d{2}", termino):
+                    desde = hasta = date.fromisoformat(termino)
+                    inicio += 1
+                    continue
+                if re.fullmatch(r"\d{4}-\d{2}", termino):
+                    anio, mes = map(int, termino.split("-"))
+                    desde = date(anio, mes, 1)
+                    siguiente = date(anio + mes // 12, mes % 12 + 1, 1)
+                    hasta = date.fromordinal(siguiente.toordinal() - 1)
+                    inicio += 1
+                    continue
+            except ValueError:
+                pass
+            # Se prueba primero el nombre más largo que empiece en este término.
+            for fin in range(len(terminos), inicio, -1):
+                frase = _frase(" ".join(terminos[inicio:fin]))
+                clase = ("camino" if frase in self._por_camino else
+                         "titulo" if frase in self._por_titulo else None)
+                if frase and clase:
+                    if filtros.setdefault(clase, frase) != frase:
+                        # Dos caminos (o dos capítulos) a la vez: nada cumple ambos.
+                        return iter(())
+                    inicio = fin
+                    break
+            else:
+                palabras.append(termino)
+                inicio += 1
+        return self.buscar(camino=filtros.get("camino"), titulo=filtros.get("titulo"),
+                           desde=desde, hasta=hasta, palabras=palabras)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Paquete de datos de la versión web (``index.html``).
+
+La página ya no lleva su propia copia de los caminos: los lee del mismo
+catálogo que la versión de consola. ``construir`` escribe en
+``DIRECTORIO_WEB``:
+
+* ``caminos.json``: el manifiesto, pequeño y sin comprimir, con las virtudes
+  iniciales, las misiones y, por cada camino, su nombre, descripción y el
+  archivo con sus capítulos;
+* ``caminos/<nombre>.<huella>.json.gz``: un archivo por camino, comprimido y
+  nombrado por el hash de su contenido, que la página descarga al abrir ese
+  camino. Como el nombre cambia con el contenido, el navegador puede
+  guardarlo en caché para siempre.
+
+La construcción es incremental: un camino cuyo archivo ya existe no se
+vuelve a comprimir ni a escribir, y los archivos que ningún camino usa se
+borran.
+
+    python3 senderos_web.py                           # caminos incluidos
+    python3 senderos_web.py --catalogo caminos.json   # catálogo externo
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from senderos_catalogo import ErrorCatalogo, caminos_a_datos, cargar_catalogo
+from senderos_de_luz import CAMINOS, MISIONES_COMUNIDAD, VIRTUDES_BASE, Camino
+from senderos_testimonios import tokenizar
+
+# Cambia cuando se modifica la forma de los archivos; renombra todos los caminos.
+VERSION_PAQUETE = 1
+
+DIRECTORIO_WEB = Path(__file__).resolve().parent / "web"
+MANIFIESTO = "caminos.json"
+SUBDIRECTORIO_CAMINOS = "caminos"
+
+
+class Construccion(NamedTuple):
+    escritos: int
+    sin_cambios: int
+    eliminados: int
+    bytes_caminos: int
+
+
+def _opcion_web(opcion: str) -> dict[str, str]:
+    # "A) Texto" → {"clave": "A", "texto": "Texto"}, como las usa la página.
+    return {"clave": opcion[:1].upper(), "texto": opcion[1:].lstrip(")").strip()}
+
+
+def camino_web(datos: dict[str, Any]) -> dict[str, Any]:
+    """Un camino del formato de datos con las opciones como las usa la página."""
+    return {**datos, "capitulos": [
+        {**capitulo, "opciones": [_opcion_web(opcion) for opcion in capitulo["opciones"]]}
+        for capitulo in datos["capitulos"]
+    ]}
+
+
+def _serializar(datos: Any) -> bytes:
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _escribir(ruta: Path, contenido: bytes) -> None:
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    temporal.write_bytes(contenido)
+    os.replace(temporal, ruta)
+
+
+def _archivo_camino(nombre: str, contenido: bytes) -> str:
+    huella = hashlib.blake2b(contenido, digest_size=8,
+                             person=f"v{VERSION_PAQUETE}".encode()).hexdigest()
+    return f"{'-'.join(tokenizar(nombre)) or 'camino'}.{huella}.json.gz"
+
+
+def construir(caminos: Iterable[Camino], destino: Path = DIRECTORIO_WEB) -> Construccion:
+    """Escribe el manifiesto y los caminos que cambiaron desde la última vez."""
+    carpeta = destino / SUBDIRECTORIO_CAMINOS
+    carpeta.mkdir(parents=True, exist_ok=True)
+    resumenes = []
+    usados: set[str] = set()
+    escritos = bytes_caminos = 0
+    for datos in caminos_a_datos(caminos)["caminos"]:
+        contenido = _serializar(camino_web(datos))
+        nombre = _archivo_camino(datos["nombre"], contenido)
+        ruta = carpeta / nombre
+        if nombre not in usados and not ruta.exists():
+            # mtime=0: la misma entrada produce siempre los mismos bytes.
+            _escribir(ruta, gzip.compress(contenido, compresslevel=9, mtime=0))
+            escritos += 1
+        usados.add(nombre)
+        bytes_caminos += ruta.stat().st_size
+        resumenes.append({
+            "nombre": datos["nombre"],
+            "descripcion": datos["descripcion"],
+            "total_capitulos": len(datos["capitulos"]),
+            "archivo": f"{SUBDIRECTORIO_CAMINOS}/{nombre}",
+        })
+
+    eliminados = 0
+    for ruta in carpeta.glob("*.json.gz"):
+        if ruta.name not in usados:
+            ruta.unlink()
+            eliminados += 1
+
+    manifiesto = _serializar({
+        "version": VERSION_PAQUETE,
+        "virtudes": VIRTUDES_BASE,
+        "misiones": list(MISIONES_COMUNIDAD),
+        "caminos": resumenes,
+    })
+    ruta_manifiesto = destino / MANIFIESTO
+    if not ruta_manifiesto.exists() or ruta_manifiesto.read_bytes() != manifiesto:
+        _escribir(ruta_manifiesto, manifiesto)
+    return Construccion(escritos, len(usados) - escritos, eliminados, bytes_caminos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalogo", nargs="+", metavar="RUTA",
+                        help="usa los caminos de estos archivos JSON")
+    parser.add_argument("--destino", type=Path, default=DIRECTORIO_WEB)
+    args = parser.parse_args()
+
+    caminos = CAMINOS
+    if args.catalogo:
+        try:
+            caminos = cargar_catalogo(args.catalogo)
+        except ErrorCatalogo as error:
+            raise SystemExit(f"Catálogo inválido: {error}") from None
+    resultado = construir(caminos, args.destino)
+    print(f"{resultado.escritos} caminos escritos, {resultado.sin_cambios} sin cambios, "
+          f"{resultado.eliminados} archivos viejos eliminados "
+          f"({resultado.bytes_caminos / 1024:.1f} KiB comprimidos en {args.destino}).")
+
+
+if __name__ == "__main__":
+    main()